@@ -9,7 +9,6 @@ from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.DEBUG)
 
-background_render_jobs = {}
 render_executor = ThreadPoolExecutor(max_workers=3)
 
 from video_renderer import (
@@ -30,6 +29,9 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 @app.after_request
 def add_no_cache_headers(response):
+    if getattr(response, 'is_media', False):
+        # Render outputs/uploads set their own ETag + Cache-Control (media_serving.py)
+        return response
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
@@ -111,6 +113,42 @@ with app.app_context():
                     """))
                     conn.commit()
 
+                # HLS packaging state for hosted videos (services/hls_service.py)
+                result = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='hosted_videos' AND column_name='hls_status'"))
+                if not result.fetchone():
+                    conn.execute(text("ALTER TABLE hosted_videos ADD COLUMN hls_status VARCHAR(20)"))
+                    conn.execute(text("ALTER TABLE hosted_videos ADD COLUMN hls_master_path VARCHAR(500)"))
+                    conn.commit()
+                result = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='hosted_videos' AND column_name='hls_attempts'"))
+                if not result.fetchone():
+                    conn.execute(text("ALTER TABLE hosted_videos ADD COLUMN hls_started_at TIMESTAMP"))
+                    conn.execute(text("ALTER TABLE hosted_videos ADD COLUMN hls_attempts INTEGER DEFAULT 0"))
+                    conn.commit()
+
+                # Full-text index for community template matching (template_index.py)
+                result = conn.execute(text("SELECT indexname FROM pg_indexes WHERE indexname='ix_community_templates_search'"))
+                if not result.fetchone():
+                    from template_index import TEMPLATE_SEARCH_VECTOR
+                    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_community_templates_search ON community_templates USING GIN ({TEMPLATE_SEARCH_VECTOR})"))
+                    conn.commit()
+
+                # Orientation column and tag index for asset search (asset_index.py)
+                result = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='media_asset' AND column_name='orientation'"))
+                if not result.fetchone():
+                    conn.execute(text("ALTER TABLE media_asset ADD COLUMN orientation VARCHAR(10)"))
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_media_asset_orientation ON media_asset (orientation)"))
+                    conn.commit()
+                    from asset_index import reindex_assets
+                    reindex_assets()
+
+                # Indexes for the /feed/items anti-join and keyset pagination (routes/feed.py)
+                result = conn.execute(text("SELECT indexname FROM pg_indexes WHERE indexname='ix_swipe_feedback_user_item'"))
+                if not result.fetchone():
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_swipe_feedback_user_item ON swipe_feedback (user_id, feed_item_id)"))
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_feed_items_global_created ON feed_items (is_global, created_at DESC, id DESC)"))
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_feed_items_user_created ON feed_items (user_id, created_at DESC, id DESC)"))
+                    conn.commit()
+
                 # Add password_hash to users table for email/password auth
                 result = conn.execute(text("SELECT column_name FROM information_schema.columns WHERE table_name='users' AND column_name='password_hash'"))
                 if not result.fetchone():
@@ -137,6 +175,58 @@ with app.app_context():
                         )
                     """))
                     conn.commit()
+
+                # Create render_jobs table for background render status (render_jobs.py)
+                result = conn.execute(text("SELECT table_name FROM information_schema.tables WHERE table_name='render_jobs'"))
+                if not result.fetchone():
+                    conn.execute(text("""
+                        CREATE TABLE render_jobs (
+                            job_id VARCHAR PRIMARY KEY,
+                            user_id VARCHAR,
+                            status VARCHAR(32) DEFAULT 'queued',
+                            progress INTEGER DEFAULT 0,
+                            video_url TEXT,
+                            error TEXT,
+                            created_at TIMESTAMP DEFAULT NOW(),
+                            updated_at TIMESTAMP DEFAULT NOW(),
+                            expires_at TIMESTAMP NOT NULL
+                        )
+                    """))
+                    conn.execute(text("CREATE INDEX ix_render_jobs_user_created ON render_jobs (user_id, created_at DESC)"))
+                    conn.execute(text("CREATE INDEX ix_render_jobs_expires ON render_jobs (expires_at)"))
+                    conn.commit()
+
+                # Create rate_limit_counters table for the shared request limiter (rate_limiter.py)
+                result = conn.execute(text("SELECT table_name FROM information_schema.tables WHERE table_name='rate_limit_counters'"))
+                if not result.fetchone():
+                    conn.execute(text("""
+                        CREATE TABLE rate_limit_counters (
+                            client_key VARCHAR(255) NOT NULL,
+                            window_start BIGINT NOT NULL,
+                            hits INTEGER NOT NULL DEFAULT 0,
+                            expires_at BIGINT NOT NULL,
+                            PRIMARY KEY (client_key, window_start)
+                        )
+                    """))
+                    conn.execute(text("CREATE INDEX ix_rate_limit_counters_expires ON rate_limit_counters (expires_at)"))
+                    conn.commit()
+
+                # Create cache_entries table for the shared TTL cache tier (ttl_cache.py)
+                result = conn.execute(text("SELECT table_name FROM information_schema.tables WHERE table_name='cache_entries'"))
+                if not result.fetchone():
+                    conn.execute(text("""
+                        CREATE TABLE cache_entries (
+                            namespace VARCHAR(64) NOT NULL,
+                            cache_key TEXT NOT NULL,
+                            value JSONB NOT NULL,
+                            fresh_until TIMESTAMPTZ NOT NULL,
+                            expires_at TIMESTAMPTZ NOT NULL,
+                            updated_at TIMESTAMPTZ DEFAULT NOW(),
+                            PRIMARY KEY (namespace, cache_key)
+                        )
+                    """))
+                    conn.execute(text("CREATE INDEX ix_cache_entries_expires ON cache_entries (namespace, expires_at)"))
+                    conn.commit()
     except Exception as e:
         logging.warning(f"Schema migration check: {e}")
     
@@ -0,0 +1,181 @@
+"""
+Media Asset Search Index
+
+The local asset library (MediaAsset) used to be searched by loading a page
+of rows and matching tags in Python, so anything past the first 100 rows
+was invisible. Tags now live in a normalized table, media_asset_tags
+(asset_id, tag), with an index on tag, and every library lookup goes
+through search_assets():
+
+- Tags are lowercased and whitespace-collapsed; multi-word tags are also
+  indexed word by word, so "ocean waves" matches a search for "ocean"
+- Ranking: number of query tags an asset matches, then use_count, then
+  newest first
+- Filters: content_type, min duration, orientation (derived from
+  resolution and stored on MediaAsset.orientation), license flags
+  (commercial use, derivatives, no attribution required) and status
+- Offset pagination with has_more
+
+An asset's index terms are its tags plus its KeywordAssetCache keywords
+(except the stock search cache's own keys), so keyword links saved
+before the index existed are still found. The tag rows and orientation
+are kept in sync by mapper events on MediaAsset, so every writer
+(save-asset, save-to-cache, ingest, the stock search cache) is indexed
+without extra calls. reindex_assets() rebuilds the table for rows written
+before the index existed.
+
+Usage:
+    assets, has_more = search_assets(tags=["ocean", "sunset"], content_type="video",
+                                     min_duration=3, orientation="portrait", limit=20)
+"""
+
+import re
+from typing import Optional, List, Tuple, Iterable
+
+from sqlalchemy import event, func, select, or_, inspect as sa_inspect
+
+from extensions import db
+from models import MediaAsset, MediaAssetTag, KeywordAssetCache
+from stock_cache import CACHE_CONTEXT as STOCK_CACHE_CONTEXT
+
+
+MAX_QUERY_TAGS = 20
+MIN_WORD_LENGTH = 3
+ORIENTATIONS = ("landscape", "portrait", "square")
+
+
+def normalize_tag(tag) -> str:
+    return " ".join(str(tag or "").lower().split())[:100]
+
+
+def index_terms(tags: Optional[Iterable]) -> List[str]:
+    """Normalized tags plus the words of multi-word tags, de-duplicated in order."""
+    terms = []
+    seen = set()
+    for tag in tags or []:
+        if not isinstance(tag, str):
+            continue
+        tag = normalize_tag(tag)
+        if not tag:
+            continue
+        candidates = [tag]
+        if " " in tag:
+            candidates += [w for w in re.findall(r"[a-z0-9]+", tag) if len(w) >= MIN_WORD_LENGTH]
+        for term in candidates:
+            if term not in seen:
+                seen.add(term)
+                terms.append(term)
+    return terms
+
+
+def orientation_for(resolution: Optional[str]) -> Optional[str]:
+    """'1920x1080' -> 'landscape'; None when the resolution is unknown."""
+    match = re.match(r"^\s*(\d+)\s*[xX×]\s*(\d+)\s*$", resolution or "")
+    if not match:
+        return None
+    width, height = int(match.group(1)), int(match.group(2))
+    if not width or not height:
+        return None
+    if width == height:
+        return "square"
+    return "landscape" if width > height else "portrait"
+
+
+def _cached_keywords(connection, asset_id: str) -> List[str]:
+    """KeywordAssetCache keywords linked to an asset (stock search cache keys excluded)."""
+    table = KeywordAssetCache.__table__
+    rows = connection.execute(select(table.c.keyword).where(
+        table.c.asset_id == asset_id,
+        or_(table.c.context.is_(None), table.c.context != STOCK_CACHE_CONTEXT)
+    ))
+    return [row[0] for row in rows]
+
+
+def _write_tags(connection, asset_id: str, tags):
+    table = MediaAssetTag.__table__
+    connection.execute(table.delete().where(table.c.asset_id == asset_id))
+    terms = index_terms(list(tags or []) + _cached_keywords(connection, asset_id))
+    if terms:
+        connection.execute(table.insert(), [{"asset_id": asset_id, "tag": t} for t in terms])
+
+
+@event.listens_for(MediaAsset, "before_insert")
+@event.listens_for(MediaAsset, "before_update")
+def _set_orientation(mapper, connection, target):
+    target.orientation = orientation_for(target.resolution)
+
+
+@event.listens_for(MediaAsset, "after_insert")
+def _index_new_asset(mapper, connection, target):
+    _write_tags(connection, target.id, target.tags)
+
+
+@event.listens_for(MediaAsset, "after_update")
+def _reindex_asset(mapper, connection, target):
+    if sa_inspect(target).attrs.tags.history.has_changes():
+        _write_tags(connection, target.id, target.tags)
+
+
+def reindex_assets(batch_size: int = 500) -> int:
+    """Rebuild media_asset_tags (tags + cached keywords) and orientation for every asset. Returns the asset count."""
+    count = 0
+    last_id = ""
+    while True:
+        rows = db.session.query(MediaAsset.id, MediaAsset.tags, MediaAsset.resolution).filter(
+            MediaAsset.id > last_id
+        ).order_by(MediaAsset.id).limit(batch_size).all()
+        if not rows:
+            break
+        connection = db.session.connection()
+        for asset_id, tags, resolution in rows:
+            _write_tags(connection, asset_id, tags)
+            orientation = orientation_for(resolution)
+            if orientation:
+                MediaAsset.query.filter_by(id=asset_id).update(
+                    {"orientation": orientation}, synchronize_session=False)
+        db.session.commit()
+        count += len(rows)
+        last_id = rows[-1][0]
+    print(f"[AssetIndex] Reindexed {count} assets")
+    return count
+
+
+def search_assets(tags: Optional[Iterable] = None, content_type: Optional[str] = None,
+                  min_duration: Optional[float] = None, orientation: Optional[str] = None,
+                  commercial_only: bool = False, derivatives_only: bool = False,
+                  no_attribution: bool = False, status: str = "safe",
+                  limit: int = 20, offset: int = 0) -> Tuple[List[MediaAsset], bool]:
+    """
+    Ranked, filtered page of library assets.
+
+    With tags, only assets matching at least one of them are returned, best
+    matches first. Returns (assets, has_more).
+    """
+    terms = index_terms(tags)[:MAX_QUERY_TAGS]
+    query = MediaAsset.query.filter(MediaAsset.status == status)
+
+    if content_type:
+        query = query.filter(MediaAsset.content_type == content_type)
+    if min_duration:
+        query = query.filter(MediaAsset.duration_sec >= float(min_duration))
+    if orientation in ORIENTATIONS:
+        query = query.filter(MediaAsset.orientation == orientation)
+    if commercial_only:
+        query = query.filter(MediaAsset.commercial_use_allowed == True)
+    if derivatives_only:
+        query = query.filter(MediaAsset.derivatives_allowed == True)
+    if no_attribution:
+        query = query.filter(MediaAsset.attribution_required == False)
+
+    order = []
+    if terms:
+        matches = db.session.query(
+            MediaAssetTag.asset_id.label("asset_id"),
+            func.count().label("score")
+        ).filter(MediaAssetTag.tag.in_(terms)).group_by(MediaAssetTag.asset_id).subquery()
+        query = query.join(matches, matches.c.asset_id == MediaAsset.id)
+        order.append(matches.c.score.desc())
+    order += [func.coalesce(MediaAsset.use_count, 0).desc(), MediaAsset.created_at.desc(), MediaAsset.id]
+
+    rows = query.order_by(*order).offset(max(0, offset)).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
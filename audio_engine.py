@@ -296,12 +296,24 @@ def mix_sfx_into_audio(voiceover_path, sfx_requests, output_path, total_script_l
     SFX are placed based on their relative position in the script.
     """
     from pydub import AudioSegment
+    from render_cache import RENDER_CACHE
     
     if not sfx_requests or not os.path.exists(voiceover_path):
         if os.path.exists(voiceover_path):
             shutil.copy(voiceover_path, output_path)
         return output_path
     
+    suffix = os.path.splitext(output_path)[1] or '.mp3'
+    try:
+        cache_key = RENDER_CACHE.make_key(
+            [voiceover_path],
+            {'op': 'sfx_mix', 'sfx': sfx_requests, 'total_lines': total_script_lines, 'bitrate': '192k'}
+        )
+    except OSError:
+        cache_key = None
+    if cache_key and RENDER_CACHE.fetch(cache_key, output_path, suffix):
+        return output_path
+    
     try:
         voiceover = AudioSegment.from_file(voiceover_path)
         total_duration_ms = len(voiceover)
@@ -338,6 +350,8 @@ def mix_sfx_into_audio(voiceover_path, sfx_requests, output_path, total_script_l
         
         voiceover.export(output_path, format='mp3', bitrate='192k')
         print(f"SFX mixed audio saved to {output_path}")
+        if cache_key:
+            RENDER_CACHE.store(cache_key, output_path, suffix)
         return output_path
         
     except Exception as e:
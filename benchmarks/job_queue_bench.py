@@ -0,0 +1,108 @@
+"""
+Job Queue Benchmark: legacy polling vs pooled LISTEN/NOTIFY
+
+Measures, for each JobQueue backend:
+- enqueue-to-start latency (time from add_job until a worker claims the job)
+- database connections opened per job (producer + consumer)
+
+Runs against DATABASE_URL. Stop every `worker.py` process first and make
+sure no real jobs are pending - the benchmark consumer claims whatever is
+at the head of the queue. Benchmark rows are deleted afterwards.
+
+Usage:
+    python benchmarks/job_queue_bench.py --jobs 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_queue import JobQueue, PooledJobQueue  # noqa: E402
+
+
+BENCH_USER_ID = "__job_queue_bench__"
+LEGACY_POLL_INTERVAL = 2.0
+NOTIFY_FALLBACK_INTERVAL = 15.0
+
+
+def _consume(queue: JobQueue, expected: int, idle_wait: float, latencies: list, stop: threading.Event):
+    queue.start_listening()
+    while len(latencies) < expected and not stop.is_set():
+        job = queue.get_next_job()
+        if not job:
+            queue.wait_for_job(idle_wait)
+            continue
+        enqueued_at = (job.job_data or {}).get("enqueued_at", time.time())
+        latencies.append(time.time() - enqueued_at)
+        queue.complete_job(job.id, "benchmark")
+
+
+def run_backend(name: str, producer: JobQueue, consumer: JobQueue, jobs: int, spacing: float) -> dict:
+    idle_wait = NOTIFY_FALLBACK_INTERVAL if consumer.supports_notify else LEGACY_POLL_INTERVAL
+    latencies: list = []
+    stop = threading.Event()
+    thread = threading.Thread(target=_consume, args=(consumer, jobs, idle_wait, latencies, stop), daemon=True)
+    thread.start()
+    time.sleep(0.5)
+
+    started = time.time()
+    for _ in range(jobs):
+        producer.add_job(BENCH_USER_ID, 0, "good", {"benchmark": True, "enqueued_at": time.time()})
+        time.sleep(spacing)
+
+    thread.join(timeout=jobs * (idle_wait + 1) + 10)
+    stop.set()
+    elapsed = time.time() - started
+
+    connections = producer.connections_opened + consumer.connections_opened
+    return {
+        "backend": name,
+        "jobs": len(latencies),
+        "latency_mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "latency_max_ms": round(max(latencies) * 1000, 1) if latencies else None,
+        "connections_opened": connections,
+        "connections_per_job": round(connections / max(1, len(latencies)), 2),
+        "wall_seconds": round(elapsed, 2),
+    }
+
+
+def _cleanup(queue: JobQueue):
+    with queue._connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM video_jobs WHERE user_id = %s", (BENCH_USER_ID,))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--spacing", type=float, default=0.7, help="Seconds between enqueues")
+    args = parser.parse_args()
+
+    guard = JobQueue()
+    if guard.get_queue_stats()["pending"] > 0:
+        print("Refusing to run: there are pending jobs in video_jobs.")
+        sys.exit(1)
+
+    results = []
+    try:
+        results.append(run_backend("legacy", JobQueue(), JobQueue(), args.jobs, args.spacing))
+        pooled_producer, pooled_consumer = PooledJobQueue(), PooledJobQueue()
+        results.append(run_backend("pooled", pooled_producer, pooled_consumer, args.jobs, args.spacing))
+        pooled_producer.close()
+        pooled_consumer.close()
+    finally:
+        _cleanup(guard)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Rate Limit Benchmark: per-request overhead of routes.utils.rate_limit
+
+Times a trivial view called directly and wrapped in @rate_limit, inside a
+Flask test request context, for each limiter backend:
+- memory:   GCRALimiter (always)
+- postgres: SharedWindowLimiter (only when DATABASE_URL is set; benchmark
+            counters are deleted afterwards)
+
+The limit is set high enough that no request is rejected, so the numbers
+are pure decorator + limiter overhead.
+
+Each backend is also checked for recovery: a key hammered far past its
+limit in one window must be allowed again early in the next window
+(rejected requests must not count against it).
+
+Usage:
+    python benchmarks/rate_limit_bench.py --requests 5000
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask_login import LoginManager  # noqa: E402
+
+import rate_limiter  # noqa: E402
+from routes import utils  # noqa: E402
+
+
+BENCH_KEY_PREFIX = "ip:bench-"
+
+
+def _view():
+    return "ok"
+
+
+def _time_calls(fn, requests: int) -> list:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _summary(name: str, samples: list, baseline_us: float = 0.0) -> dict:
+    ordered = sorted(samples)
+    mean_us = statistics.mean(samples) * 1e6
+    return {
+        "backend": name,
+        "requests": len(samples),
+        "mean_us": round(mean_us, 2),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 2),
+        "p99_us": round(ordered[int(len(ordered) * 0.99) - 1] * 1e6, 2),
+        "overhead_us": round(mean_us - baseline_us, 2),
+    }
+
+
+def run_backend(name: str, limiter, app: Flask, requests: int, baseline_us: float) -> dict:
+    rate_limiter.RATE_LIMITER = limiter
+    view = utils.rate_limit(limit=requests * 10, window=60)(_view)
+    with app.test_request_context("/", environ_base={"REMOTE_ADDR": f"bench-{name}"}):
+        view()
+        return _summary(name, _time_calls(view, requests), baseline_us)
+
+
+def check_recovery(name: str, limiter, limit: int = 5, window: int = 2, attempts: int = 50) -> dict:
+    """Block a key for one window, then confirm it is allowed again in the next."""
+    key = f"{BENCH_KEY_PREFIX}recovery-{name}-{time.time()}"
+    now = time.time()
+    # Start at a window boundary so the whole burst lands in one window
+    time.sleep(math.ceil(now / window) * window - now)
+    rejected = sum(1 for _ in range(attempts) if limiter.hit(key, limit, window) > 0)
+
+    # The previous window weighs (1 - elapsed); one interval in, a full
+    # window of allowed hits leaves room for exactly one more
+    next_start = (time.time() // window + 1) * window
+    time.sleep(max(0.0, next_start + window / limit * 1.1 - time.time()))
+    allowed_again = limiter.hit(key, limit, window) == 0
+    return {
+        "backend": name,
+        "rejected_in_first_window": rejected,
+        "allowed_in_next_window": allowed_again,
+        "ok": rejected == attempts - limit and allowed_again,
+    }
+
+
+def _cleanup(limiter):
+    with limiter.queue._connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM rate_limit_counters WHERE client_key LIKE %s", (BENCH_KEY_PREFIX + "%",))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.secret_key = "bench"
+    LoginManager().init_app(app)
+
+    with app.test_request_context("/"):
+        baseline = _summary("none", _time_calls(_view, args.requests))
+    results = [baseline]
+    results.append(run_backend("memory", rate_limiter.GCRALimiter(), app, args.requests, baseline["mean_us"]))
+    checks = [check_recovery("memory", rate_limiter.GCRALimiter())]
+
+    if os.environ.get("DATABASE_URL"):
+        shared = rate_limiter.SharedWindowLimiter()
+        try:
+            results.append(run_backend("postgres", shared, app, min(args.requests, 1000), baseline["mean_us"]))
+            checks.append(check_recovery("postgres", shared))
+        finally:
+            _cleanup(shared)
+
+    print(json.dumps({"overhead": results, "recovery": checks}, indent=2))
+    if not all(c["ok"] for c in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
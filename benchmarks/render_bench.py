@@ -0,0 +1,342 @@
+"""
+Render Benchmark: end-to-end timings on synthetic media
+
+Generates offline fixtures with ffmpeg's lavfi sources (testsrc2 pattern
+stills, colour clips with a tone track, sine-tone voiceovers) and times the
+main render paths:
+
+- stitch:      worker.stitch_pre_rendered_scenes
+- background:  video_renderer.background_render_task
+- transition:  services/preview_service._stitch_with_transition
+- sfx_mix:     audio_engine.mix_sfx_into_audio
+- captions:    services/caption_service.export_ass
+
+Each (case, scene count) runs in its own child process so that peak RSS
+(ru_maxrss of the process and its ffmpeg children) is not carried over from
+earlier runs. Reported per run: wall time, CPU time (user + system, including
+ffmpeg children), peak RSS and output size. The render cache is disabled
+unless --with-cache is passed, so every run does the full work. Database
+writes (job progress, render job status) and the completion email are
+replaced with in-memory recorders; no network access is needed.
+
+Usage:
+    python benchmarks/render_bench.py --scenes 2 4 8 --repeat 3 --output bench.json
+    python benchmarks/render_bench.py --cases stitch captions --scenes 4
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import statistics
+import contextlib
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = ("stitch", "background", "transition", "sfx_mix", "captions")
+SCENE_DURATION = 3.0
+FIXTURE_SIZE = (540, 960)
+TRANSITIONS = ("fade", "cut", "dissolve", "wipe_left")
+
+
+def _ffmpeg(*args: str):
+    cmd = ["ffmpeg", "-y", "-v", "error"] + list(args)
+    result = subprocess.run(cmd, capture_output=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(f"fixture generation failed: {result.stderr.decode(errors='replace')[:300]}")
+
+
+def make_still(path: str, index: int):
+    w, h = FIXTURE_SIZE
+    _ffmpeg("-f", "lavfi", "-i", f"testsrc2=size={w}x{h}:rate=1,hue=h={index * 47 % 360}",
+            "-frames:v", "1", path)
+
+
+def make_clip(path: str, index: int, duration: float = SCENE_DURATION):
+    w, h = FIXTURE_SIZE
+    colors = ("red", "green", "blue", "orange", "purple", "teal", "yellow", "gray")
+    _ffmpeg("-f", "lavfi", "-i", f"color=c={colors[index % len(colors)]}:size={w}x{h}:rate=30:duration={duration}",
+            "-f", "lavfi", "-i", f"sine=frequency={220 + 40 * index}:duration={duration}",
+            "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-shortest", path)
+
+
+def make_voiceover(path: str, duration: float):
+    _ffmpeg("-f", "lavfi", "-i", f"sine=frequency=180:beep_factor=4:duration={duration}",
+            "-c:a", "libmp3lame", "-b:a", "128k", path)
+
+
+def make_phrases(scenes: int, words_per_scene: int = 8):
+    phrases = []
+    t = 0.0
+    step = SCENE_DURATION / words_per_scene
+    for _ in range(scenes * words_per_scene // 4):
+        words = []
+        for j in range(4):
+            words.append({"text": f"WORD{j}", "start": round(t, 3), "end": round(t + step, 3)})
+            t += step
+        phrases.append({"text": " ".join(w["text"] for w in words), "start": words[0]["start"],
+                        "end": words[-1]["end"], "words": words})
+    return phrases
+
+
+class _RecordingJobQueue:
+    """Stands in for JOB_QUEUE so the stitch path does not need Postgres."""
+
+    def __init__(self):
+        self.calls = []
+
+    def update_progress(self, *args, **kwargs):
+        self.calls.append(("update_progress", args))
+
+    def complete_job(self, *args, **kwargs):
+        self.calls.append(("complete_job", args))
+
+    def fail_job(self, *args, **kwargs):
+        self.calls.append(("fail_job", args))
+
+
+class _RecordingRenderJobs:
+    """Stands in for RENDER_JOBS so the background path does not need Postgres."""
+
+    def __init__(self):
+        self.state = {}
+
+    def create(self, job_id, user_id, status="queued"):
+        self.state = {"status": status, "progress": 0}
+
+    def update(self, job_id, flush=False, **fields):
+        self.state.update(fields)
+
+
+def run_stitch(scenes: int, workdir: str):
+    import worker
+    clips = []
+    for i in range(scenes):
+        path = os.path.join(workdir, f"scene_{i}.mp4")
+        make_clip(path, i)
+        clips.append({"scene_index": i, "rendered_path": path,
+                      "transition_out": TRANSITIONS[i % len(TRANSITIONS)]})
+    worker.JOB_QUEUE = _RecordingJobQueue()
+
+    started = _mark()
+    worker.stitch_pre_rendered_scenes(0, {"pre_rendered_scenes": clips, "project_id": 0})
+    stopped = _mark()
+    done = [c for c in worker.JOB_QUEUE.calls if c[0] == "complete_job"]
+    return started, stopped, done[0][1][1] if done else None
+
+
+def run_background(scenes: int, workdir: str):
+    import render_jobs
+    import video_renderer
+    stills = []
+    for i in range(scenes):
+        path = os.path.join(workdir, f"still_{i}.png")
+        make_still(path, i)
+        stills.append({"url": path, "duration": SCENE_DURATION})
+    voiceover = os.path.join(workdir, "voiceover.mp3")
+    make_voiceover(voiceover, scenes * SCENE_DURATION)
+    render_jobs.RENDER_JOBS = _RecordingRenderJobs()
+    video_renderer.send_render_complete_email = lambda *args, **kwargs: None
+
+    params = {"scenes": stills, "audio_path": voiceover, "format": "9:16", "template": "explainer"}
+    started = _mark()
+    video_renderer.background_render_task("bench", params, None, contextlib.nullcontext())
+    stopped = _mark()
+    video_url = render_jobs.RENDER_JOBS.state.get("video_url")
+    return started, stopped, video_url.lstrip("/") if video_url else None
+
+
+def run_transition(scenes: int, workdir: str):
+    from services import preview_service
+    paths = []
+    for i in range(scenes):
+        path = os.path.join(workdir, f"scene_{i}.mp4")
+        make_clip(path, i)
+        paths.append(path)
+    output = os.path.join(workdir, "transition_last.mp4")
+
+    started = _mark()
+    for i in range(scenes - 1):
+        output = os.path.join(workdir, f"transition_{i}.mp4")
+        preview_service._stitch_with_transition(paths[i], paths[i + 1], TRANSITIONS[i % len(TRANSITIONS)], output)
+    stopped = _mark()
+    return started, stopped, output
+
+
+def run_sfx_mix(scenes: int, workdir: str):
+    import audio_engine
+    voiceover = os.path.join(workdir, "voiceover.mp3")
+    make_voiceover(voiceover, scenes * SCENE_DURATION)
+    effects = ("whoosh", "impact", "reveal", "beep")
+    sfx = [{"position": i + 1, "duration": 1.0, "effect_type": effects[i % len(effects)]} for i in range(scenes)]
+    output = os.path.join(workdir, "mixed.mp3")
+
+    started = _mark()
+    audio_engine.mix_sfx_into_audio(voiceover, sfx, output, total_script_lines=scenes)
+    stopped = _mark()
+    return started, stopped, output
+
+
+def run_captions(scenes: int, workdir: str):
+    from services import caption_service
+    phrases = make_phrases(scenes)
+    output = os.path.join(workdir, "captions.ass")
+
+    started = _mark()
+    caption_service.export_ass(phrases, output, template="bold_pop")
+    stopped = _mark()
+    return started, stopped, output
+
+
+RUNNERS = {
+    "stitch": run_stitch,
+    "background": run_background,
+    "transition": run_transition,
+    "sfx_mix": run_sfx_mix,
+    "captions": run_captions,
+}
+
+
+def _mark() -> dict:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "wall": time.perf_counter(),
+        "cpu": own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+    }
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / scale, 1)
+
+
+def run_one(case: str, scenes: int) -> dict:
+    """Child-process entry point: build fixtures, time one render path, report."""
+    sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix=f"render_bench_{case}_")
+    os.chdir(workdir)
+    os.makedirs("output", exist_ok=True)
+    try:
+        started, stopped, output = RUNNERS[case](scenes, workdir)
+        size = os.path.getsize(output) if output and os.path.exists(output) else None
+        return {
+            "case": case,
+            "scenes": scenes,
+            "ok": size is not None,
+            "wall_seconds": round(stopped["wall"] - started["wall"], 3),
+            "cpu_seconds": round(stopped["cpu"] - started["cpu"], 3),
+            "peak_rss_mb": _peak_rss_mb(),
+            "output_bytes": size,
+        }
+    except Exception as e:
+        return {"case": case, "scenes": scenes, "ok": False, "error": f"{type(e).__name__}: {e}"}
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _spawn(case: str, scenes: int, with_cache: bool) -> dict:
+    env = dict(os.environ)
+    env.pop("ELEVENLABS_API_KEY", None)
+    if not with_cache:
+        env["RENDER_CACHE_ENABLED"] = "false"
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-one", case, "--scenes", str(scenes)],
+        capture_output=True, text=True, env=env, timeout=1800
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode != 0 or not lines:
+        return {"case": case, "scenes": scenes, "ok": False,
+                "error": (result.stderr or result.stdout).strip()[-500:]}
+    return json.loads(lines[-1])
+
+
+def _summarize(runs: list) -> dict:
+    ok = [r for r in runs if r.get("ok")]
+    summary = {"case": runs[0]["case"], "scenes": runs[0]["scenes"], "runs": len(runs), "ok_runs": len(ok)}
+    if not ok:
+        summary["error"] = next((r.get("error") for r in runs if r.get("error")), "no output")
+        return summary
+    for field in ("wall_seconds", "cpu_seconds"):
+        values = [r[field] for r in ok]
+        summary[f"{field}_median"] = round(statistics.median(values), 3)
+        summary[f"{field}_min"] = round(min(values), 3)
+    summary["peak_rss_mb"] = max(r["peak_rss_mb"] for r in ok)
+    summary["output_bytes"] = ok[-1]["output_bytes"]
+    return summary
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _ffmpeg_version() -> str:
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, timeout=10).stdout
+        return out.splitlines()[0] if out else ""
+    except Exception:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--scenes", nargs="+", type=int, default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--with-cache", action="store_true", help="Leave the render cache enabled")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    parser.add_argument("--run-one", choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one, args.scenes[0])))
+        return
+
+    if not shutil.which("ffmpeg"):
+        print("Refusing to run: ffmpeg is not on PATH.")
+        sys.exit(1)
+
+    results = []
+    for case in args.cases:
+        for scenes in args.scenes:
+            runs = [_spawn(case, max(2, scenes), args.with_cache) for _ in range(max(1, args.repeat))]
+            summary = _summarize(runs)
+            print(f"[RenderBench] {case} x{summary['scenes']}: "
+                  f"{summary.get('wall_seconds_median', '-')}s wall, {summary.get('ok_runs')}/{summary['runs']} ok",
+                  file=sys.stderr)
+            results.append(summary)
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ffmpeg": _ffmpeg_version(),
+        "render_cache": args.with_cache,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
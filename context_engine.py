@@ -36,6 +36,7 @@ from stock_search import (
     search_pexels,
     search_wikimedia_images,
     search_visuals_unified,
+    search_visuals_many,
     search_pexels_safe,
     get_scene_visuals,
 )
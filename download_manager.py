@@ -0,0 +1,297 @@
+"""
+Streaming Media Download Manager
+
+Scene renders, previews and remixes download stock clips that are often
+tens of MB each. Reading a whole response into memory per scene (and
+opening a fresh connection every time) is what drives peak RSS during
+multi-scene renders. Every media download goes through DOWNLOADS instead:
+
+- One requests.Session with a keep-alive connection pool per host
+- Streams to <dest>.part in DOWNLOAD_CHUNK_BYTES chunks (bounded memory),
+  then renames into place, so readers never see a half-written file
+- On a dropped connection, resumes with a Range request from the bytes
+  already on disk (falls back to a full restart if the server ignores it)
+- At most DOWNLOAD_PER_HOST_CONCURRENCY downloads per host at a time
+- Integrity: size must match Content-Length / Content-Range, empty bodies
+  and bodies over max_bytes are rejected, optional sha256 check
+- Concurrent downloads of the same URL share one transfer. Before the
+  first caller's download returns, every caller that joined gets its own
+  copy at its own destination, checked against its own max_bytes and
+  sha256, so no one reads a file another caller may already have moved
+
+Usage:
+    result = DOWNLOADS.download(url, "output/raw_abc_0.mp4")
+    result.path, result.size, result.content_type
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DOWNLOAD_CHUNK_BYTES = int(os.environ.get("DOWNLOAD_CHUNK_BYTES", str(256 * 1024)))
+DOWNLOAD_PER_HOST_CONCURRENCY = int(os.environ.get("DOWNLOAD_PER_HOST_CONCURRENCY", "4"))
+DOWNLOAD_POOL_SIZE = int(os.environ.get("DOWNLOAD_POOL_SIZE", "16"))
+DOWNLOAD_MAX_RETRIES = int(os.environ.get("DOWNLOAD_MAX_RETRIES", "3"))
+DOWNLOAD_MAX_BYTES = int(os.environ.get("DOWNLOAD_MAX_BYTES", str(1024 ** 3)))
+DOWNLOAD_CONNECT_TIMEOUT = float(os.environ.get("DOWNLOAD_CONNECT_TIMEOUT", "10"))
+DOWNLOAD_READ_TIMEOUT = float(os.environ.get("DOWNLOAD_READ_TIMEOUT", "60"))
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+class DownloadError(Exception):
+    pass
+
+
+class _CallerLimitError(DownloadError):
+    """The file was rejected by one caller's max_bytes/sha256, not by the server."""
+
+
+@dataclass
+class DownloadResult:
+    url: str
+    path: str
+    size: int
+    content_type: Optional[str] = None
+    resumed: bool = False
+    shared: bool = False
+
+
+@dataclass
+class _Waiter:
+    dest: str
+    max_bytes: int
+    sha256: Optional[str]
+    future: Future = field(default_factory=Future)
+
+
+@dataclass
+class _Transfer:
+    """One in-flight URL and the callers waiting for a copy of it."""
+    waiters: List[_Waiter] = field(default_factory=list)
+    closed: bool = False
+
+
+def _total_from_response(resp: requests.Response, offset: int) -> Optional[int]:
+    """Full resource size from Content-Range (206) or Content-Length (200)."""
+    content_range = resp.headers.get("Content-Range", "")
+    if resp.status_code == 206 and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = resp.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length) + (offset if resp.status_code == 206 else 0)
+    return None
+
+
+class DownloadManager:
+    """Pooled, resumable, de-duplicated streaming downloads to local files."""
+
+    def __init__(self, per_host: int = DOWNLOAD_PER_HOST_CONCURRENCY, pool_size: int = DOWNLOAD_POOL_SIZE,
+                 max_retries: int = DOWNLOAD_MAX_RETRIES, chunk_bytes: int = DOWNLOAD_CHUNK_BYTES):
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.chunk_bytes = chunk_bytes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._inflight: Dict[str, _Transfer] = {}
+        self._lock = threading.Lock()
+        self._stats = {"downloads": 0, "bytes": 0, "resumes": 0, "shared": 0, "failures": 0}
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def download(self, url: str, dest: str, headers: Optional[Dict[str, str]] = None,
+                 max_bytes: int = DOWNLOAD_MAX_BYTES, sha256: Optional[str] = None,
+                 timeout: Optional[tuple] = None) -> DownloadResult:
+        """
+        Stream url to dest. Raises DownloadError when the file could not be fetched intact.
+
+        If the same URL is already being downloaded, joins that transfer: its
+        leader copies the file to dest (checked against this call's
+        max_bytes and sha256) before it returns.
+        """
+        with self._lock:
+            transfer = self._inflight.get(url)
+            leader = transfer is None or transfer.closed
+            if leader:
+                transfer = self._inflight[url] = _Transfer()
+            else:
+                waiter = _Waiter(dest, max_bytes, sha256)
+                transfer.waiters.append(waiter)
+
+        if not leader:
+            result = waiter.future.result()
+            if result is None:
+                # The leader's own limits rejected the file; ours may not
+                return self.download(url, dest, headers, max_bytes, sha256, timeout)
+            with self._lock:
+                self._stats["shared"] += 1
+            return result
+
+        try:
+            return self._download(url, dest, headers, max_bytes, sha256, timeout, transfer)
+        except BaseException as e:
+            with self._lock:
+                self._stats["failures"] += 1
+            retry = isinstance(e, _CallerLimitError)
+            error = e if isinstance(e, DownloadError) else DownloadError(str(e))
+            for waiter in self._close(transfer):
+                if retry:
+                    waiter.future.set_result(None)
+                else:
+                    waiter.future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(url) is transfer:
+                    del self._inflight[url]
+
+    def _close(self, transfer: _Transfer) -> List[_Waiter]:
+        """Stop new callers joining the transfer and return the ones that did."""
+        with self._lock:
+            transfer.closed = True
+            waiters, transfer.waiters = transfer.waiters, []
+        return waiters
+
+    def _hand_off(self, transfer: _Transfer, source: str, result: DownloadResult):
+        """Give every joined caller its own verified copy of source."""
+        digest = None
+        for waiter in self._close(transfer):
+            part = f"{waiter.dest}.part"
+            try:
+                if result.size > waiter.max_bytes:
+                    raise DownloadError(f"{result.url} is {result.size} bytes (limit {waiter.max_bytes})")
+                if waiter.sha256:
+                    digest = digest or self._file_sha256(source)
+                    if digest != waiter.sha256.lower():
+                        raise DownloadError(f"sha256 mismatch for {result.url}")
+                if os.path.abspath(waiter.dest) != os.path.abspath(result.path):
+                    shutil.copyfile(source, part)
+                    os.replace(part, waiter.dest)
+                waiter.future.set_result(DownloadResult(
+                    result.url, waiter.dest, result.size, result.content_type, result.resumed, shared=True))
+            except Exception as e:
+                self._discard(part)
+                waiter.future.set_exception(e if isinstance(e, DownloadError) else DownloadError(str(e)))
+
+    def _download(self, url: str, dest: str, headers: Optional[Dict[str, str]], max_bytes: int,
+                  sha256: Optional[str], timeout: Optional[tuple],
+                  transfer: Optional[_Transfer] = None) -> DownloadResult:
+        timeout = timeout or (DOWNLOAD_CONNECT_TIMEOUT, DOWNLOAD_READ_TIMEOUT)
+        part = f"{dest}.part"
+        if os.path.exists(part):
+            os.remove(part)
+        resumed = False
+        content_type = None
+        last_error = None
+
+        with self._slot(url):
+            for attempt in range(self.max_retries + 1):
+                offset = os.path.getsize(part) if os.path.exists(part) else 0
+                request_headers = {**DEFAULT_HEADERS, **(headers or {})}
+                if offset:
+                    request_headers["Range"] = f"bytes={offset}-"
+                try:
+                    with self.session.get(url, headers=request_headers, stream=True, timeout=timeout) as resp:
+                        if resp.status_code == 416 and offset:
+                            os.remove(part)
+                            continue
+                        if resp.status_code not in (200, 206):
+                            raise DownloadError(f"HTTP {resp.status_code} for {url}")
+                        if offset and resp.status_code == 200:
+                            offset = 0
+                        elif offset:
+                            resumed = True
+                            with self._lock:
+                                self._stats["resumes"] += 1
+                        content_type = resp.headers.get("Content-Type", content_type)
+                        total = _total_from_response(resp, offset)
+                        if total is not None and total > max_bytes:
+                            raise _CallerLimitError(f"{url} is {total} bytes (limit {max_bytes})")
+
+                        written = offset
+                        with open(part, "ab" if offset else "wb") as f:
+                            for chunk in resp.iter_content(chunk_size=self.chunk_bytes):
+                                if not chunk:
+                                    continue
+                                written += len(chunk)
+                                if written > max_bytes:
+                                    raise _CallerLimitError(f"{url} exceeded {max_bytes} bytes")
+                                f.write(chunk)
+
+                    if total is not None and written != total:
+                        raise requests.exceptions.ChunkedEncodingError(
+                            f"short read: {written}/{total} bytes")
+                    break
+                except DownloadError:
+                    self._discard(part)
+                    raise
+                except (requests.exceptions.RequestException, OSError) as e:
+                    last_error = e
+                    if attempt < self.max_retries:
+                        print(f"[Downloads] {urlparse(url).netloc}: {e}; retrying from byte "
+                              f"{os.path.getsize(part) if os.path.exists(part) else 0}")
+                        time.sleep(min(2 ** attempt, 8))
+            else:
+                self._discard(part)
+                raise DownloadError(f"Download failed after {self.max_retries + 1} attempts: {last_error}")
+
+        size = os.path.getsize(part)
+        if size == 0:
+            self._discard(part)
+            raise DownloadError(f"Empty response body for {url}")
+        if sha256 and self._file_sha256(part) != sha256.lower():
+            self._discard(part)
+            raise _CallerLimitError(f"sha256 mismatch for {url}")
+
+        os.replace(part, dest)
+        result = DownloadResult(url, dest, size, content_type, resumed)
+        if transfer is not None:
+            # dest is still ours until we return, so copying from it is safe
+            self._hand_off(transfer, dest, result)
+
+        with self._lock:
+            self._stats["downloads"] += 1
+            self._stats["bytes"] += size
+        return result
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "inflight": len(self._inflight)}
+
+
+DOWNLOADS = DownloadManager()
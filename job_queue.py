@@ -7,14 +7,23 @@ workers, allowing users to continue using the app while videos generate.
 
 Architecture:
 - Jobs stored in PostgreSQL (video_jobs table)
-- Workers poll for pending jobs and process them
+- add_job sends a NOTIFY on the video_jobs channel
+- Workers LISTEN on that channel and claim jobs as soon as they arrive,
+  with slow polling kept only as a fallback (PooledJobQueue)
 - Status updates are polled by frontend
 - Can scale by running multiple workers
+
+Backends (JOB_QUEUE_BACKEND env var):
+- "pooled" (default): shared connection pool + LISTEN/NOTIFY wake-ups
+- "legacy": a fresh connection per call, workers poll on a fixed interval
 """
 
 import os
 import json
 import time
+import select
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
@@ -22,9 +31,21 @@ from enum import Enum
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.pool import ThreadedConnectionPool
 
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
+JOB_QUEUE_BACKEND = os.environ.get("JOB_QUEUE_BACKEND", "pooled").lower()
+JOB_QUEUE_POOL_MIN = int(os.environ.get("JOB_QUEUE_POOL_MIN", "1"))
+JOB_QUEUE_POOL_MAX = int(os.environ.get("JOB_QUEUE_POOL_MAX", "20"))
+JOB_QUEUE_POOL_TIMEOUT = float(os.environ.get("JOB_QUEUE_POOL_TIMEOUT", "10"))
+JOB_NOTIFY_CHANNEL = "video_jobs"
+
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within JOB_QUEUE_POOL_TIMEOUT seconds."""
+    pass
 
 
 class JobStatus(Enum):
@@ -63,12 +84,45 @@ class JobQueue:
     - Supports priority queuing (created_at order)
     """
     
+    supports_notify = False
+    
     def __init__(self):
         self.db_url = DATABASE_URL
+        self.connections_opened = 0
     
     def _get_connection(self):
+        self.connections_opened += 1
         return psycopg2.connect(self.db_url, cursor_factory=RealDictCursor)
     
+    @contextmanager
+    def _connection(self):
+        """Open a connection for one unit of work and close it afterwards."""
+        conn = self._get_connection()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def start_listening(self):
+        """Prepare to receive new-job wake-ups. Polling backend: nothing to do."""
+        pass
+    
+    def wait_for_job(self, timeout: float) -> bool:
+        """
+        Block until a new job may be available or timeout elapses.
+        
+        Returns:
+            True if woken by a new-job notification, False on timeout
+        """
+        time.sleep(timeout)
+        return False
+    
+    def _publish(self, job_id: int, **event):
+        """Push a progress event to SSE subscribers of this job (see progress_events)."""
+        from progress_events import publish_progress, job_topic
+        publish_progress(job_topic(job_id), type="job", job_id=job_id, **event)
+    
     def add_job(
         self,
         user_id: str,
@@ -82,7 +136,7 @@ class JobQueue:
         Returns:
             The job ID
         """
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO video_jobs (user_id, project_id, quality_tier, job_data, status)
@@ -93,6 +147,8 @@ class JobQueue:
                 if not result:
                     raise RuntimeError("Failed to create job - no ID returned")
                 job_id: int = result['id']  # type: ignore[index]
+                # Delivered to listening workers when the transaction commits
+                cur.execute("SELECT pg_notify(%s, %s)", (JOB_NOTIFY_CHANNEL, str(job_id)))
                 conn.commit()
                 print(f"[JobQueue] Created job {job_id} for user {user_id}, quality={quality_tier}")
                 return job_id
@@ -105,7 +161,7 @@ class JobQueue:
         Returns:
             VideoJob if available, None otherwise
         """
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     UPDATE video_jobs
@@ -122,13 +178,14 @@ class JobQueue:
                 row = cur.fetchone()
                 conn.commit()
                 
-                if row:
-                    return self._row_to_job(row)
-                return None
+        if row:
+            self._publish(row['id'], status='processing')
+            return self._row_to_job(row)
+        return None
     
     def get_job(self, job_id: int) -> Optional[VideoJob]:
         """Get a specific job by ID."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT * FROM video_jobs WHERE id = %s", (job_id,))
                 row = cur.fetchone()
@@ -138,7 +195,7 @@ class JobQueue:
     
     def get_user_jobs(self, user_id: str, limit: int = 10) -> List[VideoJob]:
         """Get recent jobs for a user."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT * FROM video_jobs
@@ -151,7 +208,7 @@ class JobQueue:
     
     def get_active_jobs(self, user_id: str) -> List[VideoJob]:
         """Get jobs that are currently pending or processing for a user."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT * FROM video_jobs
@@ -169,7 +226,7 @@ class JobQueue:
         message: Optional[str] = None
     ):
         """Update job progress."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     UPDATE video_jobs
@@ -177,10 +234,11 @@ class JobQueue:
                     WHERE id = %s
                 """, (current, total, message, job_id))
                 conn.commit()
+        self._publish(job_id, status='processing', current=current, total=total, message=message)
     
     def complete_job(self, job_id: int, result_url: str):
         """Mark a job as completed with the result URL."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     UPDATE video_jobs
@@ -190,10 +248,11 @@ class JobQueue:
                 """, (result_url, job_id))
                 conn.commit()
                 print(f"[JobQueue] Job {job_id} completed: {result_url}")
+        self._publish(job_id, status='completed', result_url=result_url)
     
     def fail_job(self, job_id: int, error_message: str):
         """Mark a job as failed with an error message."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     UPDATE video_jobs
@@ -202,10 +261,11 @@ class JobQueue:
                 """, (error_message, job_id))
                 conn.commit()
                 print(f"[JobQueue] Job {job_id} failed: {error_message}")
+        self._publish(job_id, status='failed', error=error_message)
     
     def cancel_job(self, job_id: int, user_id: str) -> bool:
         """Cancel a pending job (only owner can cancel)."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     UPDATE video_jobs
@@ -215,11 +275,13 @@ class JobQueue:
                 """, (job_id, user_id))
                 result = cur.fetchone()
                 conn.commit()
-                return result is not None
+        if result is not None:
+            self._publish(job_id, status='cancelled')
+        return result is not None
     
     def get_queue_position(self, job_id: int) -> int:
         """Get the position of a job in the queue (1-indexed)."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT COUNT(*) + 1 as position
@@ -234,7 +296,7 @@ class JobQueue:
     
     def get_queue_stats(self) -> Dict[str, int]:
         """Get overall queue statistics."""
-        with self._get_connection() as conn:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
                     SELECT status, COUNT(*) as count
@@ -294,4 +356,128 @@ class JobQueue:
         }
 
 
-JOB_QUEUE = JobQueue()
+class PooledJobQueue(JobQueue):
+    """
+    JobQueue backed by a shared connection pool with LISTEN/NOTIFY wake-ups.
+    
+    - Every method borrows a pooled connection instead of connecting;
+      when all max_connections are in use, callers wait up to
+      JOB_QUEUE_POOL_TIMEOUT for one (ThreadedConnectionPool itself would
+      raise PoolError at once) and then get PoolTimeout
+    - Idle workers block on the video_jobs channel and claim new jobs
+      immediately with the same FOR UPDATE SKIP LOCKED query
+    - wait_for_job's timeout is only a slow fallback in case a
+      notification is missed (e.g. listener reconnect)
+    """
+    
+    supports_notify = True
+    
+    def __init__(self, min_connections: int = JOB_QUEUE_POOL_MIN, max_connections: int = JOB_QUEUE_POOL_MAX,
+                 pool_timeout: float = JOB_QUEUE_POOL_TIMEOUT):
+        super().__init__()
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._listen_conn = None
+        self._listen_lock = threading.Lock()
+        self._known_connections = set()
+    
+    def _get_pool(self) -> ThreadedConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadedConnectionPool(
+                        self.min_connections, self.max_connections,
+                        self.db_url, cursor_factory=RealDictCursor
+                    )
+        return self._pool
+    
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection, waiting for a free one; broken connections are discarded."""
+        pool = self._get_pool()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise PoolTimeout(f"no database connection free within {self.pool_timeout}s "
+                              f"(pool max {self.max_connections})")
+        try:
+            conn = pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        if id(conn) not in self._known_connections:
+            self._known_connections.add(id(conn))
+            self.connections_opened += 1
+        broken = False
+        try:
+            with conn:
+                yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            pool.putconn(conn, close=broken or bool(conn.closed))
+            self._slots.release()
+    
+    def _ensure_listener(self):
+        if self._listen_conn is not None and not self._listen_conn.closed:
+            return self._listen_conn
+        conn = self._get_connection()
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {JOB_NOTIFY_CHANNEL}")
+        self._listen_conn = conn
+        print(f"[JobQueue] Listening on channel '{JOB_NOTIFY_CHANNEL}'")
+        return conn
+    
+    def start_listening(self):
+        """LISTEN before the first claim attempt so no notification is missed."""
+        with self._listen_lock:
+            self._ensure_listener()
+    
+    def wait_for_job(self, timeout: float) -> bool:
+        with self._listen_lock:
+            try:
+                conn = self._ensure_listener()
+                if conn.notifies:
+                    conn.notifies.clear()
+                    return True
+                ready, _, _ = select.select([conn], [], [], timeout)
+                if not ready:
+                    return False
+                conn.poll()
+                woken = bool(conn.notifies)
+                conn.notifies.clear()
+                return woken
+            except (psycopg2.Error, OSError, ValueError) as e:
+                print(f"[JobQueue] Listener error, falling back to polling: {e}")
+                try:
+                    if self._listen_conn is not None:
+                        self._listen_conn.close()
+                except Exception:
+                    pass
+                self._listen_conn = None
+        time.sleep(min(timeout, 2.0))
+        return False
+    
+    def close(self):
+        """Close the listener and all pooled connections."""
+        with self._listen_lock:
+            if self._listen_conn is not None:
+                self._listen_conn.close()
+                self._listen_conn = None
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+
+
+def create_job_queue(backend: str = JOB_QUEUE_BACKEND) -> JobQueue:
+    """Build the configured JobQueue backend ("pooled" or "legacy")."""
+    if backend == "legacy":
+        return JobQueue()
+    return PooledJobQueue()
+
+
+JOB_QUEUE = create_job_queue()
@@ -0,0 +1,116 @@
+"""
+LLM Response Cache for call_ai
+
+Many call sites send fully deterministic prompts (keyword extraction, scene
+visuals, content classification, anchor detection, scene ordering, visual
+direction), and re-renders and retries send the same prompts again. This
+module answers repeats from a cache instead of the provider.
+
+- Key: sha256 of (model, system prompt, prompt, json_output, max_tokens)
+- Memory tier: TTLCache LRU (LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_HOURS)
+- Persistent tier: PostgresCacheStore("llm"), shared by all web workers and
+  the video worker (LLM_CACHE_SHARED)
+- Single-flight: N concurrent identical prompts make one upstream call
+- Only successful responses are cached (call_ai returns None on failure)
+
+Caching is opt-in per call site: deterministic sites call cached_call_ai
+with a site name instead of call_ai. A site can be switched off without a
+deploy via LLM_CACHE_DISABLED_SITES, and a single call can skip the cache
+with cache=False. Bump LLM_CACHE_MODEL when the provider/model behind
+call_ai changes so old answers are not reused.
+
+Usage:
+    result = cached_call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True,
+                            max_tokens=512, site="classify_content_type")
+    llm_cache_stats()   # per-site calls / upstream calls / hit rate
+"""
+
+import os
+import copy
+import json
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+from ttl_cache import TTLCache, PostgresCacheStore
+
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() != "false"
+LLM_CACHE_TTL_HOURS = float(os.environ.get("LLM_CACHE_TTL_HOURS", "72"))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_SHARED = os.environ.get("LLM_CACHE_SHARED", "true").lower() != "false" and bool(os.environ.get("DATABASE_URL"))
+LLM_CACHE_MODEL = os.environ.get("LLM_CACHE_MODEL", "default")
+LLM_CACHE_DISABLED_SITES = {
+    site.strip() for site in os.environ.get("LLM_CACHE_DISABLED_SITES", "").split(",") if site.strip()
+}
+
+_llm_cache = TTLCache(
+    "llm",
+    ttl_seconds=LLM_CACHE_TTL_HOURS * 3600,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    store=PostgresCacheStore("llm") if LLM_CACHE_SHARED else None
+)
+
+_site_stats: Dict[str, Dict[str, int]] = {}
+_site_lock = threading.Lock()
+
+
+def make_key(prompt: str, system_prompt: Optional[str], json_output: bool,
+             max_tokens: Optional[int], model: Optional[str] = None) -> str:
+    payload = json.dumps([model or LLM_CACHE_MODEL, system_prompt, prompt, bool(json_output), max_tokens],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _record(site: str, field: str):
+    with _site_lock:
+        stats = _site_stats.setdefault(site, {"calls": 0, "upstream": 0, "bypassed": 0})
+        stats[field] += 1
+
+
+def cache_enabled_for(site: str) -> bool:
+    return LLM_CACHE_ENABLED and site not in LLM_CACHE_DISABLED_SITES
+
+
+def cached_call_ai(prompt: str, system_prompt: Optional[str] = None, json_output: bool = False,
+                   max_tokens: Optional[int] = None, site: str = "default", cache: bool = True, **kwargs) -> Any:
+    """call_ai with the response cache in front; same arguments plus site/cache."""
+    from ai_client import call_ai
+
+    call_kwargs = dict(kwargs)
+    if system_prompt is not None:
+        call_kwargs["system_prompt"] = system_prompt
+    if json_output:
+        call_kwargs["json_output"] = json_output
+    if max_tokens is not None:
+        call_kwargs["max_tokens"] = max_tokens
+
+    _record(site, "calls")
+    if not cache or not cache_enabled_for(site):
+        _record(site, "bypassed")
+        _record(site, "upstream")
+        return call_ai(prompt, **call_kwargs)
+
+    def compute():
+        _record(site, "upstream")
+        return call_ai(prompt, **call_kwargs)
+
+    key = make_key(prompt, system_prompt, json_output, max_tokens, kwargs.get("model"))
+    result = _llm_cache.get_or_compute(key, compute, cacheable=lambda value: bool(value))
+    # Callers mutate the parsed JSON they get back; never hand out the cached object.
+    return copy.deepcopy(result)
+
+
+def invalidate(prompt: str, system_prompt: Optional[str] = None, json_output: bool = False,
+               max_tokens: Optional[int] = None, model: Optional[str] = None):
+    _llm_cache.invalidate(make_key(prompt, system_prompt, json_output, max_tokens, model))
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    with _site_lock:
+        sites = {site: dict(stats) for site, stats in _site_stats.items()}
+    for stats in sites.values():
+        cacheable = stats["calls"] - stats["bypassed"]
+        hits = cacheable - (stats["upstream"] - stats["bypassed"])
+        stats["hit_rate"] = round(hits / cacheable, 3) if cacheable else 0.0
+    return {"enabled": LLM_CACHE_ENABLED, "cache": _llm_cache.stats(), "sites": sites}
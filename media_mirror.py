@@ -0,0 +1,243 @@
+"""
+Local Media Mirror for stock and generated assets
+
+Preview, final render, re-render and platform export all fetch the same
+Pexels/Pixabay/Wikimedia clips and Runway outputs. The mirror keeps one
+local copy of every remote asset a render touched, so a repeat render of
+a project makes no external downloads.
+
+- Key: MediaAsset.id when the caller knows it ("a_<id>"), otherwise a hash
+  of the URL ("u_<sha256>")
+- Entries live in MEDIA_MIRROR_DIR; downloads go through DOWNLOADS
+  (streamed, resumable, de-duplicated)
+- Size-bounded LRU on disk: file mtime is the last-access time and is
+  bumped on every hit; the least recently used entries are evicted once
+  MEDIA_MIRROR_MAX_BYTES is exceeded
+- Pinning: assets referenced by active ScenePlan rows (source_config
+  "source_url" / "media_asset_id" of projects touched within
+  MEDIA_MIRROR_PIN_DAYS) are never evicted; preview and render record
+  the sources they fetched there (record_scene_sources)
+- fetch() hands out a private copy, so callers may trim, overwrite or
+  delete their file as before
+
+Usage:
+    MEDIA_MIRROR.fetch(video_url, "output/raw_abc_0.mp4")
+    MEDIA_MIRROR.fetch(asset.download_url, path, asset_id=asset.id)
+"""
+
+import os
+import re
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Set
+from urllib.parse import urlparse
+
+from download_manager import DOWNLOADS
+
+
+MEDIA_MIRROR_DIR = os.environ.get(
+    "MEDIA_MIRROR_DIR", os.path.join(tempfile.gettempdir(), "framd_media_mirror")
+)
+MEDIA_MIRROR_MAX_BYTES = int(os.environ.get("MEDIA_MIRROR_MAX_BYTES", str(5 * 1024 ** 3)))
+MEDIA_MIRROR_ENABLED = os.environ.get("MEDIA_MIRROR_ENABLED", "true").lower() != "false"
+MEDIA_MIRROR_PIN_DAYS = int(os.environ.get("MEDIA_MIRROR_PIN_DAYS", "14"))
+PIN_REFRESH_SECONDS = 300
+
+MEDIA_SUFFIXES = {".mp4", ".mov", ".webm", ".mkv", ".m4v", ".jpg", ".jpeg", ".png", ".gif", ".webp",
+                  ".mp3", ".wav", ".m4a", ".ogg"}
+
+
+def _suffix(url: str) -> str:
+    ext = os.path.splitext(urlparse(url).path)[1].lower()
+    return ext if ext in MEDIA_SUFFIXES else ".bin"
+
+
+class MediaMirror:
+    """Size-bounded on-disk LRU of remote media, keyed by asset id or URL."""
+
+    def __init__(self, mirror_dir: str = MEDIA_MIRROR_DIR, max_bytes: int = MEDIA_MIRROR_MAX_BYTES,
+                 enabled: bool = MEDIA_MIRROR_ENABLED):
+        self.mirror_dir = mirror_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pins: Set[str] = set()
+        self._pins_loaded_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes_downloaded": 0}
+        if self.enabled:
+            os.makedirs(self.mirror_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(url: str, asset_id: Optional[str] = None) -> str:
+        if asset_id:
+            safe = re.sub(r"[^A-Za-z0-9_.-]", "_", str(asset_id))
+            if len(safe) <= 120:
+                return f"a_{safe}"
+            return "a_" + hashlib.sha256(str(asset_id).encode("utf-8")).hexdigest()
+        return "u_" + hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, url: str, asset_id: Optional[str]) -> str:
+        return os.path.join(self.mirror_dir, self.key_for(url, asset_id) + _suffix(url))
+
+    @staticmethod
+    def _verified_asset_id(url: str, asset_id: Optional[str]) -> Optional[str]:
+        """
+        asset_id if MediaAsset asset_id really points at url, else None (key by URL).
+        Asset ids often come from request bodies; an unchecked id would let one
+        caller store any URL under another asset's entry.
+        """
+        if not asset_id:
+            return None
+        try:
+            from extensions import db
+            from models import MediaAsset
+            asset = db.session.get(MediaAsset, str(asset_id))
+            return asset_id if asset is not None and asset.download_url == url else None
+        except Exception:
+            return None
+
+    def resolve(self, url: str, asset_id: Optional[str] = None) -> str:
+        """Local path of the mirrored asset, downloading it on a miss."""
+        asset_id = self._verified_asset_id(url, asset_id)
+        entry = self._entry_path(url, asset_id)
+        if os.path.exists(entry):
+            try:
+                os.utime(entry, None)
+                with self._lock:
+                    self._stats["hits"] += 1
+                return entry
+            except OSError:
+                pass
+
+        with self._lock:
+            self._stats["misses"] += 1
+        result = DOWNLOADS.download(url, entry)
+        with self._lock:
+            self._stats["bytes_downloaded"] += result.size
+        self._evict()
+        return entry
+
+    def fetch(self, url: str, dest: str, asset_id: Optional[str] = None) -> str:
+        """Place a private copy of the asset at dest (raises DownloadError on failure)."""
+        if not self.enabled or not url.startswith(("http://", "https://")):
+            DOWNLOADS.download(url, dest)
+            return dest
+        for attempt in range(2):
+            entry = self.resolve(url, asset_id)
+            try:
+                shutil.copyfile(entry, dest)
+                return dest
+            except FileNotFoundError:
+                # Evicted between resolve and copy; fetch it again once
+                if attempt:
+                    raise
+        return dest
+
+    def keys_for_config(self, config: Dict[str, Any]) -> Set[str]:
+        """
+        Mirror keys a source_config may be stored under. fetch() keys by asset
+        id when it was given one and by URL otherwise, so both are pinned.
+        """
+        keys = set()
+        if config.get("source_url"):
+            keys.add(self.key_for(config["source_url"]))
+        if config.get("media_asset_id"):
+            keys.add(self.key_for("", config["media_asset_id"]))
+        return keys
+
+    def record_scene_sources(self, project_id: int, sources: Dict[int, Dict[str, Any]]):
+        """
+        Store {scene_index: {"source_url", "media_asset_id"}} in the project's
+        ScenePlan.source_config, so the files a render fetched stay pinned.
+        Must run inside an app context; scenes without a ScenePlan are skipped.
+        """
+        if not project_id or not sources:
+            return
+        try:
+            from extensions import db
+            from models import ScenePlan
+            plans = ScenePlan.query.filter(
+                ScenePlan.project_id == project_id,
+                ScenePlan.scene_index.in_(list(sources))
+            ).with_for_update().populate_existing().all()
+            for plan in plans:
+                source = {k: v for k, v in sources[plan.scene_index].items() if v}
+                plan.source_config = {**(plan.source_config or {}), **source}
+                self._pins.update(self.keys_for_config(source))
+            db.session.commit()
+        except Exception as e:
+            print(f"[MediaMirror] Could not record scene sources for project {project_id}: {e}")
+            try:
+                db.session.rollback()
+            except Exception:
+                pass
+
+    def pinned_keys(self) -> Set[str]:
+        """Mirror keys referenced by active ScenePlan rows (refreshed every few minutes)."""
+        if time.time() - self._pins_loaded_at < PIN_REFRESH_SECONDS:
+            return self._pins
+        pins = set()
+        try:
+            from app import app
+            from models import ScenePlan
+            since = datetime.now() - timedelta(days=MEDIA_MIRROR_PIN_DAYS)
+            with app.app_context():
+                rows = ScenePlan.query.with_entities(ScenePlan.source_config).filter(
+                    ScenePlan.updated_at >= since,
+                    ScenePlan.source_config.isnot(None)
+                ).all()
+            for (config,) in rows:
+                if isinstance(config, dict):
+                    pins.update(self.keys_for_config(config))
+        except Exception as e:
+            print(f"[MediaMirror] Could not load pinned assets: {e}")
+            self._pins_loaded_at = time.time()
+            return self._pins
+        self._pins = pins
+        self._pins_loaded_at = time.time()
+        return pins
+
+    def _evict(self):
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.mirror_dir) as it:
+                for e in it:
+                    if not e.is_file() or e.name.endswith(".part"):
+                        continue
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path, e.name))
+                    total += st.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        pinned = self.pinned_keys()
+        entries.sort()
+        for _, size, path, name in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.splitext(name)[0] in pinned:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self._stats["evictions"] += 1
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["pinned"] = len(self._pins)
+        return stats
+
+
+MEDIA_MIRROR = MediaMirror()
@@ -0,0 +1,252 @@
+"""
+Media Probe - one ffprobe per file, cached
+
+Every caller that needs a duration, resolution, frame rate or "does this
+file have audio?" goes through here instead of spawning its own ffprobe.
+
+- One `-show_format -show_streams` JSON probe per file, parsed into MediaInfo
+- In-memory LRU keyed by (absolute path, size, mtime), so a file that is
+  rewritten in place is probed again
+- Optional persistent tier (MEDIA_PROBE_CACHE_PATH, a small SQLite file)
+  shared by web workers and the video worker across restarts
+- Failed probes are never cached
+
+Usage:
+    info = probe_media(path)            # MediaInfo or None
+    seconds = get_media_duration(path, default=5.0)
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import subprocess
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any
+
+
+MEDIA_PROBE_MAX_ENTRIES = int(os.environ.get("MEDIA_PROBE_MAX_ENTRIES", "2048"))
+MEDIA_PROBE_CACHE_PATH = os.environ.get("MEDIA_PROBE_CACHE_PATH")
+MEDIA_PROBE_TIMEOUT = 30
+
+
+@dataclass
+class MediaInfo:
+    """Parsed ffprobe output for one file."""
+    path: str
+    duration: Optional[float] = None
+    size: Optional[int] = None
+    format_name: Optional[str] = None
+    bit_rate: Optional[int] = None
+    has_video: bool = False
+    has_audio: bool = False
+    video_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pix_fmt: Optional[str] = None
+    frame_rate: Optional[str] = None
+    time_base: Optional[str] = None
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+
+    @property
+    def fps(self) -> Optional[float]:
+        """frame_rate ("30000/1001") as a float."""
+        if not self.frame_rate:
+            return None
+        try:
+            if "/" in self.frame_rate:
+                num, den = self.frame_rate.split("/")
+                return float(num) / float(den) if float(den) > 0 else None
+            return float(self.frame_rate)
+        except (TypeError, ValueError):
+            return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_probe_output(path: str, data: Dict[str, Any]) -> MediaInfo:
+    """Build MediaInfo from ffprobe's JSON (-show_format -show_streams)."""
+    fmt = data.get("format") or {}
+    streams = data.get("streams") or []
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = _to_float(fmt.get("duration"))
+    if duration is None and video:
+        duration = _to_float(video.get("duration"))
+    if duration is None and audio:
+        duration = _to_float(audio.get("duration"))
+
+    info = MediaInfo(
+        path=path,
+        duration=duration,
+        size=_to_int(fmt.get("size")),
+        format_name=fmt.get("format_name"),
+        bit_rate=_to_int(fmt.get("bit_rate")),
+        has_video=video is not None,
+        has_audio=audio is not None,
+    )
+    if video:
+        info.video_codec = video.get("codec_name")
+        info.width = _to_int(video.get("width"))
+        info.height = _to_int(video.get("height"))
+        info.pix_fmt = video.get("pix_fmt")
+        info.frame_rate = video.get("r_frame_rate")
+        info.time_base = video.get("time_base")
+    if audio:
+        info.audio_codec = audio.get("codec_name")
+        info.sample_rate = _to_int(audio.get("sample_rate"))
+        info.channels = _to_int(audio.get("channels"))
+    return info
+
+
+class MediaProbe:
+    """ffprobe front-end with an in-memory LRU and optional SQLite persistence."""
+
+    def __init__(self, max_entries: int = MEDIA_PROBE_MAX_ENTRIES, persist_path: Optional[str] = MEDIA_PROBE_CACHE_PATH):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._cache: "OrderedDict[tuple, MediaInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "persistent_hits": 0, "probes": 0, "failures": 0}
+        if self.persist_path:
+            try:
+                with self._db() as conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS media_probe "
+                        "(cache_key TEXT PRIMARY KEY, info TEXT NOT NULL)"
+                    )
+            except sqlite3.Error as e:
+                print(f"[MediaProbe] Persistent cache disabled: {e}")
+                self.persist_path = None
+
+    def _db(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.persist_path, timeout=5)
+
+    @staticmethod
+    def _cache_key(path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+    def _remember(self, key: tuple, info: MediaInfo):
+        with self._lock:
+            self._cache[key] = info
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _load_persistent(self, key: tuple) -> Optional[MediaInfo]:
+        if not self.persist_path:
+            return None
+        try:
+            with self._db() as conn:
+                row = conn.execute(
+                    "SELECT info FROM media_probe WHERE cache_key = ?", (json.dumps(key),)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[MediaProbe] Persistent lookup failed: {e}")
+            return None
+        if not row:
+            return None
+        try:
+            return MediaInfo(**json.loads(row[0]))
+        except (TypeError, ValueError):
+            return None
+
+    def _save_persistent(self, key: tuple, info: MediaInfo):
+        if not self.persist_path:
+            return
+        try:
+            with self._db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO media_probe (cache_key, info) VALUES (?, ?)",
+                    (json.dumps(key), json.dumps(info.to_dict()))
+                )
+        except sqlite3.Error as e:
+            print(f"[MediaProbe] Persistent store failed: {e}")
+
+    def _run_ffprobe(self, path: str) -> Optional[MediaInfo]:
+        self.stats["probes"] += 1
+        try:
+            result = subprocess.run(
+                ["ffprobe", "-v", "error", "-print_format", "json",
+                 "-show_format", "-show_streams", path],
+                capture_output=True, text=True, timeout=MEDIA_PROBE_TIMEOUT
+            )
+            if result.returncode != 0:
+                print(f"[MediaProbe] ffprobe failed for {path}: {result.stderr[:200]}")
+                self.stats["failures"] += 1
+                return None
+            return parse_probe_output(path, json.loads(result.stdout or "{}"))
+        except Exception as e:
+            print(f"[MediaProbe] ffprobe error for {path}: {e}")
+            self.stats["failures"] += 1
+            return None
+
+    def probe(self, path: str) -> Optional[MediaInfo]:
+        """Metadata for a local file, or None if it is missing or unreadable."""
+        key = self._cache_key(path)
+        if key is None:
+            return None
+
+        with self._lock:
+            info = self._cache.get(key)
+            if info is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return info
+
+        info = self._load_persistent(key)
+        if info is not None:
+            self.stats["persistent_hits"] += 1
+            self._remember(key, info)
+            return info
+
+        info = self._run_ffprobe(path)
+        if info is None:
+            return None
+        self._remember(key, info)
+        self._save_persistent(key, info)
+        return info
+
+    def duration(self, path: str, default: Optional[float] = None) -> Optional[float]:
+        info = self.probe(path)
+        if info is None or info.duration is None:
+            return default
+        return info.duration
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+MEDIA_PROBE = MediaProbe()
+
+
+def probe_media(path: str) -> Optional[MediaInfo]:
+    return MEDIA_PROBE.probe(path)
+
+
+def get_media_duration(path: str, default: Optional[float] = None) -> Optional[float]:
+    return MEDIA_PROBE.duration(path, default)
@@ -0,0 +1,86 @@
+"""
+Cacheable Media Responses for render outputs and uploads
+
+app.add_no_cache_headers marks every response no-store, which is right for
+API JSON but made browsers re-download whole MP4s on every scrub and
+revisit. Files under /output and /uploads (and per-user scene previews)
+are written once under unique names, so they are served with:
+
+- A content-hash ETag (sha256 of the file bytes, memoized by
+  path/size/mtime), so a revisit costs a 304 instead of the whole video
+- Byte-range (206) responses via werkzeug's conditional send_file, so
+  players can seek and start without fetching the full file
+- Cache-Control: public, max-age=MEDIA_CACHE_MAX_AGE for public files,
+  private + revalidate for per-user previews
+- Optional hand-off to a front proxy (MEDIA_OFFLOAD):
+    accel     -> X-Accel-Redirect: MEDIA_ACCEL_PREFIX/<path relative to the
+                 app directory>, e.g. /_protected_media/output/x.mp4 (nginx)
+    sendfile  -> X-Sendfile: <absolute path> (Apache/lighttpd)
+  The proxy then does the range handling and the worker is freed at once.
+
+Responses built here carry `is_media = True`, which tells
+add_no_cache_headers to leave their caching headers alone.
+
+Usage:
+    return send_media(current_app.config['OUTPUT_FOLDER'], filename)
+"""
+
+import os
+import mimetypes
+from typing import Optional
+
+from flask import send_file, abort, make_response
+from werkzeug.security import safe_join
+
+
+MEDIA_CACHE_MAX_AGE = int(os.environ.get("MEDIA_CACHE_MAX_AGE", str(7 * 86400)))
+MEDIA_OFFLOAD = os.environ.get("MEDIA_OFFLOAD", "").lower()
+MEDIA_ACCEL_PREFIX = os.environ.get("MEDIA_ACCEL_PREFIX", "/_protected_media").rstrip("/")
+
+
+def media_etag(path: str) -> str:
+    from render_cache import RENDER_CACHE
+    return RENDER_CACHE.file_digest(path)
+
+
+def _cache_control(private: bool) -> str:
+    if private:
+        return "private, no-cache"
+    return f"public, max-age={MEDIA_CACHE_MAX_AGE}"
+
+
+def send_media_file(path: str, mimetype: Optional[str] = None, private: bool = False,
+                    accel_path: Optional[str] = None):
+    """Serve a local media file with ETag, Range and cache headers (or hand it to the proxy)."""
+    if not path or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetype or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    etag = media_etag(path)
+
+    if MEDIA_OFFLOAD == "accel" and accel_path:
+        response = make_response("")
+        response.headers["X-Accel-Redirect"] = f"{MEDIA_ACCEL_PREFIX}/{accel_path.lstrip('/')}"
+        response.headers["Content-Type"] = mimetype
+        response.set_etag(etag)
+    elif MEDIA_OFFLOAD == "sendfile":
+        response = make_response("")
+        response.headers["X-Sendfile"] = os.path.abspath(path)
+        response.headers["Content-Type"] = mimetype
+        response.set_etag(etag)
+    else:
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=etag,
+                             max_age=0 if private else MEDIA_CACHE_MAX_AGE)
+
+    response.headers["Cache-Control"] = _cache_control(private)
+    response.headers["Accept-Ranges"] = "bytes"
+    response.is_media = True
+    return response
+
+
+def send_media(directory: str, filename: str, private: bool = False, mimetype: Optional[str] = None):
+    """send_from_directory equivalent for render outputs and uploads."""
+    path = safe_join(directory, filename)
+    if path is None:
+        abort(404)
+    return send_media_file(path, mimetype=mimetype, private=private,
+                           accel_path=os.path.relpath(path, os.getcwd()).replace(os.sep, "/"))
@@ -192,6 +192,10 @@ class HostedVideo(db.Model):
     public_id = db.Column(db.String(64), unique=True, nullable=False)
     video_path = db.Column(db.String(500), nullable=False)
     thumbnail_path = db.Column(db.String(500), nullable=True)
+    hls_status = db.Column(db.String(20), nullable=True)  # processing, ready, failed
+    hls_master_path = db.Column(db.String(500), nullable=True)
+    hls_started_at = db.Column(db.DateTime, nullable=True)
+    hls_attempts = db.Column(db.Integer, default=0)
     views = db.Column(db.Integer, default=0)
     is_public = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
@@ -218,6 +222,11 @@ class FeedItem(db.Model):
     
     user = db.relationship('User', backref=db.backref('feed_items', lazy='dynamic'))
 
+    __table_args__ = (
+        Index('ix_feed_items_global_created', 'is_global', created_at.desc(), id.desc()),
+        Index('ix_feed_items_user_created', 'user_id', created_at.desc(), id.desc()),
+    )
+
 
 class SwipeFeedback(db.Model):
     __tablename__ = 'swipe_feedback'
@@ -231,6 +240,10 @@ class SwipeFeedback(db.Model):
     user = db.relationship('User', backref=db.backref('swipe_feedback', lazy='dynamic'))
     feed_item = db.relationship('FeedItem', backref=db.backref('feedback', lazy='dynamic'))
 
+    __table_args__ = (
+        Index('ix_swipe_feedback_user_item', 'user_id', 'feed_item_id'),
+    )
+
 
 class ProjectFeedback(db.Model):
     __tablename__ = 'project_feedback'
@@ -437,6 +450,7 @@ class MediaAsset(db.Model):
     content_type = db.Column(db.String(20), nullable=False, index=True)
     duration_sec = db.Column(db.Float)
     resolution = db.Column(db.String(20))
+    orientation = db.Column(db.String(10), index=True)
     description = db.Column(db.Text)
     tags = db.Column(db.JSON)
     safe_flags = db.Column(db.JSON)
@@ -445,6 +459,17 @@ class MediaAsset(db.Model):
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
 
+class MediaAssetTag(db.Model):
+    """Normalized tag index for MediaAsset search (maintained by asset_index.py)."""
+    __tablename__ = 'media_asset_tags'
+    asset_id = db.Column(db.String(255), db.ForeignKey('media_asset.id', ondelete='CASCADE'), primary_key=True)
+    tag = db.Column(db.String(100), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_media_asset_tags_tag', 'tag', 'asset_id'),
+    )
+
+
 class KeywordAssetCache(db.Model):
     """Cache keyword → asset associations for faster visual curation."""
     __tablename__ = 'keyword_asset_cache'
@@ -0,0 +1,247 @@
+"""
+Progress Event Broker
+
+Fans out progress updates for video jobs, background renders and scene
+previews to Server-Sent Events subscribers, so the frontend no longer has
+to poll /api/jobs/<id>, /render-status/<job_id> or preview-status.
+
+Topics:
+- job:<id>        JobQueue.update_progress / complete_job / fail_job
+- render:<id>     RenderJobStore writes (status + batched progress)
+- project:<id>    preview_service scene status changes
+
+Delivery:
+- With the pooled job queue (LISTEN/NOTIFY available) events are published
+  with pg_notify on the progress_events channel. Each web process runs one
+  listener thread that forwards notifications to its local subscribers, so
+  the video worker and every gunicorn worker reach every SSE client.
+- Otherwise (or if NOTIFY fails) events are delivered in-process only.
+  Events from another process (the video worker) then never reach the
+  stream, so it re-reads its snapshot every SSE_SNAPSHOT_POLL_SECONDS and
+  sends it when it changed. With NOTIFY the snapshot is still re-checked
+  on each heartbeat in case a notification was missed.
+"""
+
+import os
+import json
+import time
+import queue
+import select
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, List, Callable
+
+
+PROGRESS_EVENTS_BACKEND = os.environ.get("PROGRESS_EVENTS_BACKEND", "auto").lower()
+PROGRESS_CHANNEL = "progress_events"
+SSE_HEARTBEAT_SECONDS = 15.0
+SSE_MAX_STREAM_SECONDS = float(os.environ.get("SSE_MAX_STREAM_SECONDS", "900"))
+SSE_SNAPSHOT_POLL_SECONDS = float(os.environ.get("SSE_SNAPSHOT_POLL_SECONDS", "3"))
+SUBSCRIBER_QUEUE_SIZE = 100
+LISTENER_READY_TIMEOUT = 5.0
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+TERMINAL_STATUSES = ("completed", "complete", "failed", "error", "cancelled", "finished")
+
+
+def job_topic(job_id) -> str:
+    return f"job:{job_id}"
+
+
+def render_topic(job_id) -> str:
+    return f"render:{job_id}"
+
+
+def project_topic(project_id) -> str:
+    return f"project:{project_id}"
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """One unnamed SSE message (EventSource.onmessage); the kind is in event["type"]."""
+    return f"data: {json.dumps(event, default=str)}\n\n"
+
+
+class ProgressBroker:
+    """Topic-based fan-out of progress events to SSE subscribers."""
+
+    def __init__(self, backend: str = PROGRESS_EVENTS_BACKEND):
+        self.backend = backend
+        self._subscribers: Dict[str, List[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._listening = threading.Event()
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0, "notify_failures": 0}
+
+    @property
+    def uses_notify(self) -> bool:
+        if self.backend == "local":
+            return False
+        try:
+            from job_queue import JOB_QUEUE
+        except Exception:
+            return False
+        return self.backend == "notify" or JOB_QUEUE.supports_notify
+
+    def publish(self, topic: str, event: Dict[str, Any]):
+        """Publish an event. Never raises - progress reporting must not break a render."""
+        event = dict(event)
+        event.setdefault("topic", topic)
+        event.setdefault("ts", time.time())
+        self.stats["published"] += 1
+
+        if self.uses_notify:
+            payload = json.dumps({"topic": topic, "event": event}, default=str)
+            if len(payload) <= NOTIFY_PAYLOAD_LIMIT:
+                try:
+                    from job_queue import JOB_QUEUE
+                    with JOB_QUEUE._connection() as conn:
+                        with conn.cursor() as cur:
+                            cur.execute("SELECT pg_notify(%s, %s)", (PROGRESS_CHANNEL, payload))
+                        conn.commit()
+                    return
+                except Exception as e:
+                    self.stats["notify_failures"] += 1
+                    print(f"[ProgressEvents] NOTIFY failed, delivering locally: {e}")
+        self._deliver(topic, event)
+
+    def _deliver(self, topic: str, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+                self.stats["delivered"] += 1
+            except queue.Full:
+                self.stats["dropped"] += 1
+
+    @property
+    def cross_process(self) -> bool:
+        """True when events published by other processes reach this one."""
+        return self.uses_notify and self._listening.is_set()
+
+    def _snapshot_interval(self) -> float:
+        return SSE_HEARTBEAT_SECONDS if self.cross_process else SSE_SNAPSHOT_POLL_SECONDS
+
+    @contextmanager
+    def subscribe(self, topic: str) -> Iterator[queue.Queue]:
+        """
+        Register a subscriber queue. With NOTIFY, waits (up to
+        LISTENER_READY_TIMEOUT) until this process is LISTENing, so anything
+        read after entering cannot miss a later event.
+        """
+        q: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(q)
+        if self.uses_notify:
+            self._ensure_listener()
+            if not self._listening.wait(LISTENER_READY_TIMEOUT):
+                print("[ProgressEvents] Listener not ready, falling back to snapshot polling")
+        try:
+            yield q
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(topic, [])
+                if q in subscribers:
+                    subscribers.remove(q)
+                if not subscribers:
+                    self._subscribers.pop(topic, None)
+
+    def stream(self, topic: str, snapshot: Optional[Callable[[], Dict[str, Any]]] = None,
+               max_seconds: float = SSE_MAX_STREAM_SECONDS) -> Iterator[str]:
+        """
+        SSE body for one topic: an optional initial snapshot, then events as
+        they arrive, with comment heartbeats. Ends on a terminal status.
+
+        snapshot is called only once the subscription is live, so an event
+        published between the read and the subscribe cannot be lost.
+        """
+        with self.subscribe(topic) as q:
+            initial = snapshot() if snapshot is not None else None
+            if initial is not None:
+                yield format_sse(initial)
+                if initial.get("status") in TERMINAL_STATUSES:
+                    return
+            last_sent = json.dumps(initial, default=str, sort_keys=True)
+            deadline = time.time() + max_seconds
+            next_poll = time.time() + self._snapshot_interval()
+            next_heartbeat = time.time() + SSE_HEARTBEAT_SECONDS
+            while time.time() < deadline:
+                wake = min(next_poll, next_heartbeat) if snapshot is not None else next_heartbeat
+                try:
+                    event = q.get(timeout=max(0.0, wake - time.time()))
+                except queue.Empty:
+                    event = None
+
+                if event is not None:
+                    yield format_sse(event)
+                    if event.get("status") in TERMINAL_STATUSES:
+                        return
+                    continue
+
+                now = time.time()
+                if snapshot is not None and now >= next_poll:
+                    next_poll = now + self._snapshot_interval()
+                    current = snapshot()
+                    encoded = json.dumps(current, default=str, sort_keys=True)
+                    if encoded != last_sent:
+                        last_sent = encoded
+                        next_heartbeat = now + SSE_HEARTBEAT_SECONDS
+                        yield format_sse(current)
+                        if current.get("status") in TERMINAL_STATUSES:
+                            return
+                        continue
+                if now >= next_heartbeat:
+                    next_heartbeat = now + SSE_HEARTBEAT_SECONDS
+                    yield ": keepalive\n\n"
+            yield format_sse({"type": "timeout", "topic": topic})
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name="progress-events", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        from job_queue import DATABASE_URL
+
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {PROGRESS_CHANNEL}")
+                self._listening.set()
+                print(f"[ProgressEvents] Listening on channel '{PROGRESS_CHANNEL}'")
+                while True:
+                    ready, _, _ = select.select([conn], [], [], SSE_HEARTBEAT_SECONDS)
+                    if not ready:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            message = json.loads(notify.payload)
+                            self._deliver(message["topic"], message["event"])
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            except Exception as e:
+                self._listening.clear()
+                print(f"[ProgressEvents] Listener error, reconnecting: {e}")
+                time.sleep(2.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+PROGRESS_EVENTS = ProgressBroker()
+
+
+def publish_progress(topic: str, **event):
+    PROGRESS_EVENTS.publish(topic, event)
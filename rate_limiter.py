@@ -0,0 +1,272 @@
+"""
+Rate Limiting Primitives
+
+TokenBucket: classic token bucket (rate tokens/second, burst capacity).
+- In-process by default, guarded by a threading.Lock
+- Pass state_path to share one bucket between processes on the same host
+  (web workers + video worker); state lives in a small JSON file guarded
+  by an exclusive flock
+
+Request limiters behind routes.utils.rate_limit (RATE_LIMIT_BACKEND env var):
+- "memory": GCRALimiter, per-process GCRA state; for single-node deployments
+- "postgres": SharedWindowLimiter, one counter row per key per window,
+  updated with a single UPSERT on a pooled connection, sliding-window
+  estimate from the current and previous window, background pruning.
+  It has its own pool (RATE_LIMIT_POOL_MAX connections, callers wait up
+  to RATE_LIMIT_POOL_TIMEOUT seconds), so busy job/progress traffic cannot
+  starve it
+- "auto" (default): postgres when DATABASE_URL is set, otherwise memory
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Optional, Dict
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to in-process buckets
+    fcntl = None
+
+
+class TokenBucket:
+    """Token bucket limiter shared across threads (and optionally processes)."""
+
+    def __init__(self, rate: float, capacity: float = 1.0, state_path: Optional[str] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.state_path = state_path if fcntl else None
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.time()
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+
+    def _take_local(self, tokens: float) -> float:
+        now = time.time()
+        self._tokens = self._refill(self._tokens, self._updated, now)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def _take_shared(self, tokens: float) -> float:
+        fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            now = time.time()
+            try:
+                state = json.loads(raw) if raw else {}
+                current = self._refill(float(state["tokens"]), float(state["updated"]), now)
+            except (ValueError, KeyError, TypeError):
+                current = self.capacity
+
+            if current >= tokens:
+                current -= tokens
+                wait = 0.0
+            else:
+                wait = (tokens - current) / self.rate
+
+            payload = json.dumps({"tokens": current, "updated": now}).encode()
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, payload)
+            return wait
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens if available.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds until they would be
+        """
+        with self._lock:
+            if self.state_path:
+                try:
+                    return self._take_shared(tokens)
+                except OSError as e:
+                    print(f"[RateLimit] Shared bucket unavailable ({e}), using in-process state")
+                    self.state_path = None
+            return self._take_local(tokens)
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available. Returns False if timeout elapses first."""
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.time() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "auto").lower()
+RATE_LIMIT_PRUNE_INTERVAL = float(os.environ.get("RATE_LIMIT_PRUNE_INTERVAL", "300"))
+RATE_LIMIT_POOL_MAX = int(os.environ.get("RATE_LIMIT_POOL_MAX", "10"))
+RATE_LIMIT_POOL_TIMEOUT = float(os.environ.get("RATE_LIMIT_POOL_TIMEOUT", "5"))
+
+
+class GCRALimiter:
+    """
+    In-process request limiter (generic cell rate algorithm).
+
+    Allows `limit` requests per `window` seconds with bursts up to `limit`,
+    storing one theoretical-arrival-time float per key.
+    """
+
+    def __init__(self, prune_interval: float = RATE_LIMIT_PRUNE_INTERVAL):
+        self.prune_interval = prune_interval
+        self._tat: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        """
+        Count one request for key.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until the next request would be
+        """
+        interval = window / max(1, limit)
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._tat.get(key, now), now) + interval
+            if tat - now > window:
+                return tat - now - window
+            self._tat[key] = tat
+            if now - self._last_prune > self.prune_interval:
+                self._prune(now)
+        return 0.0
+
+    def _prune(self, now: float):
+        # A TAT in the past carries no state: the key is back to a full burst
+        self._last_prune = now
+        for key in [k for k, tat in self._tat.items() if tat <= now]:
+            del self._tat[key]
+
+    def reset(self):
+        with self._lock:
+            self._tat.clear()
+
+
+def window_estimate(hits: int, previous_hits: int, elapsed: float) -> float:
+    """Sliding-window request count; elapsed is the fraction of the current window gone by."""
+    return hits + previous_hits * (1.0 - min(1.0, max(0.0, elapsed)))
+
+
+class SharedWindowLimiter:
+    """
+    Request limiter shared by every process through Postgres.
+
+    Each (key, window) keeps one row per fixed window; a request is one
+    UPSERT that bumps the current row and reads the previous one. The
+    count is the sliding-window estimate (window_estimate)
+        current + previous * (1 - elapsed / window).
+    Only allowed requests are counted: a rejected one is decremented again
+    in the same transaction, so a client that keeps retrying while blocked
+    does not push its own block into the next window.
+    Connections come from a dedicated PooledJobQueue pool that blocks when
+    full and raises job_queue.PoolTimeout rather than letting a request
+    through. Expired rows are deleted by a background thread every
+    prune_interval seconds.
+    """
+
+    def __init__(self, queue=None, prune_interval: float = RATE_LIMIT_PRUNE_INTERVAL):
+        self._queue = queue
+        self.prune_interval = prune_interval
+        self._pruner: Optional[threading.Thread] = None
+        self._init_lock = threading.Lock()
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            with self._init_lock:
+                if self._queue is None:
+                    from job_queue import PooledJobQueue
+                    self._queue = PooledJobQueue(min_connections=1, max_connections=RATE_LIMIT_POOL_MAX,
+                                                 pool_timeout=RATE_LIMIT_POOL_TIMEOUT)
+        return self._queue
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        """Count one request for key. Returns 0.0 if allowed, else seconds to wait."""
+        self._ensure_pruner()
+        window = max(1, int(window))
+        now = time.time()
+        window_start = int(now // window) * window
+        scoped_key = f"{key}:{window}"
+
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    WITH current AS (
+                        INSERT INTO rate_limit_counters (client_key, window_start, hits, expires_at)
+                        VALUES (%s, %s, 1, %s)
+                        ON CONFLICT (client_key, window_start)
+                        DO UPDATE SET hits = rate_limit_counters.hits + 1
+                        RETURNING hits
+                    )
+                    SELECT current.hits AS hits,
+                           COALESCE((SELECT hits FROM rate_limit_counters
+                                     WHERE client_key = %s AND window_start = %s), 0) AS previous_hits
+                    FROM current
+                """, (scoped_key, window_start, window_start + 2 * window, scoped_key, window_start - window))
+                row = cur.fetchone()
+                estimate = window_estimate(row["hits"], row["previous_hits"], (now - window_start) / window)
+                if estimate > limit:
+                    # Still holding the row lock: take the rejected request back out
+                    cur.execute("""
+                        UPDATE rate_limit_counters SET hits = hits - 1
+                        WHERE client_key = %s AND window_start = %s
+                    """, (scoped_key, window_start))
+                conn.commit()
+
+        if estimate <= limit:
+            return 0.0
+        return max(0.0, window_start + window - now)
+
+    def prune(self) -> int:
+        """Delete counters whose windows can no longer affect a decision."""
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM rate_limit_counters WHERE expires_at < %s", (int(time.time()),))
+                removed = cur.rowcount
+                conn.commit()
+        return removed
+
+    def _ensure_pruner(self):
+        if self._pruner is not None:
+            return
+        with self._init_lock:
+            if self._pruner is None:
+                self._pruner = threading.Thread(target=self._prune_loop, name="rate-limit-pruner", daemon=True)
+                self._pruner.start()
+
+    def _prune_loop(self):
+        while True:
+            time.sleep(self.prune_interval)
+            try:
+                self.prune()
+            except Exception as e:
+                print(f"[RateLimit] Counter pruning failed: {e}")
+
+
+def create_rate_limiter(backend: str = RATE_LIMIT_BACKEND):
+    """Build the configured request limiter ("memory", "postgres" or "auto")."""
+    if backend == "memory":
+        return GCRALimiter()
+    if backend == "postgres" or os.environ.get("DATABASE_URL"):
+        return SharedWindowLimiter()
+    return GCRALimiter()
+
+
+RATE_LIMITER = create_rate_limiter()
@@ -17,11 +17,17 @@ File Type Distinction:
 
 import os
 import json
+import tempfile
 import requests
+from concurrent.futures import wait as wait_futures, FIRST_COMPLETED
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from rate_limiter import TokenBucket
+from stock_cache import cached_search
+from task_poller import TASK_POLLER
+
 class FileType(Enum):
     REFERENCE = "reference"  # For vibe extraction only
     CONTENT = "content"      # To be integrated into final video
@@ -222,6 +228,7 @@ class RunwayError(Exception):
         super().__init__(self.message)
 
 
+@cached_search("pexels_videos")
 def search_pexels_videos(
     query: str,
     per_page: int = 3,
@@ -525,12 +532,12 @@ def runway_wait_for_completion(
     poll_interval: int = 5
 ) -> RunwayTaskResult:
     """
-    Poll Runway task until completion or timeout.
+    Wait for a Runway task via the shared TASK_POLLER.
     
     Args:
-        task_id: The task ID to poll
+        task_id: The task ID to wait on
         max_wait_seconds: Maximum time to wait (default 5 minutes)
-        poll_interval: Seconds between polls (default 5)
+        poll_interval: Unused; the poller schedules checks adaptively
         
     Returns:
         Final RunwayTaskResult
@@ -538,29 +545,7 @@ def runway_wait_for_completion(
     Raises:
         RunwayError: On failure or timeout
     """
-    import time
-    
-    elapsed = 0
-    while elapsed < max_wait_seconds:
-        result = runway_get_task_status(task_id)
-        
-        print(f"[Runway API] Task {task_id[:8]}... status={result.status.value}, progress={result.progress}")
-        
-        if result.status == RunwayTaskStatus.SUCCEEDED:
-            print(f"[Runway API] Task completed! Output URLs: {result.output_urls}")
-            return result
-        elif result.status == RunwayTaskStatus.FAILED:
-            raise RunwayError(
-                result.error_message or "Task failed",
-                code=result.error_code or "TASK_FAILED"
-            )
-        elif result.status == RunwayTaskStatus.CANCELLED:
-            raise RunwayError("Task was cancelled", code="CANCELLED")
-        
-        time.sleep(poll_interval)
-        elapsed += poll_interval
-    
-    raise RunwayError(f"Task timed out after {max_wait_seconds}s", code="TIMEOUT")
+    return TASK_POLLER.watch_runway(task_id, max_wait_seconds=max_wait_seconds).result()
 
 
 def runway_generate_video(
@@ -681,45 +666,74 @@ def runway_generate_with_retry(
                 print(f"[Runway Queue] Rate limited, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
                 time.sleep(delay)
                 continue
-            elif e.code == "CONTENT_MODERATED":
-                return {
-                    "success": False,
-                    "error": "The image couldn't be processed. Please try a different source image.",
-                    "error_code": e.code,
-                    "user_message": "Content couldn't be processed"
-                }
-            elif e.code == "TIMEOUT":
-                if attempt < max_retries:
-                    delay = base_delay * (2 ** attempt)
-                    print(f"[Runway Queue] Timeout, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
-                    time.sleep(delay)
-                    continue
-                return {
-                    "success": False,
-                    "error": "Generation is taking longer than expected. Your video is queued and will be ready shortly.",
-                    "error_code": e.code,
-                    "user_message": "High demand — video queued"
-                }
+            elif e.code == "TIMEOUT" and attempt < max_retries:
+                delay = base_delay * (2 ** attempt)
+                print(f"[Runway Queue] Timeout, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
+                time.sleep(delay)
+                continue
             else:
                 break
     
+    return _runway_failure_result(last_error)
+
+
+def _runway_failure_result(error: Optional[RunwayError]) -> Dict[str, Any]:
+    """Map a final (non-retried) RunwayError to a user-facing result dict."""
+    if error and error.code == "CONTENT_MODERATED":
+        return {
+            "success": False,
+            "error": "The image couldn't be processed. Please try a different source image.",
+            "error_code": error.code,
+            "user_message": "Content couldn't be processed"
+        }
+    if error and error.code == "TIMEOUT":
+        return {
+            "success": False,
+            "error": "Generation is taking longer than expected. Your video is queued and will be ready shortly.",
+            "error_code": error.code,
+            "user_message": "High demand — video queued"
+        }
     return {
         "success": False,
-        "error": last_error.message if last_error else "Unknown error",
-        "error_code": last_error.code if last_error else "UNKNOWN",
+        "error": error.message if error else "Unknown error",
+        "error_code": error.code if error else "UNKNOWN",
         "user_message": "Something went wrong. Please try again in a moment."
     }
 
 
+RUNWAY_MAX_IN_FLIGHT = int(os.environ.get("RUNWAY_MAX_IN_FLIGHT", "4"))
+RUNWAY_RATE_BURST = float(os.environ.get("RUNWAY_RATE_BURST", "2"))
+RUNWAY_BUCKET_PATH = os.path.join(tempfile.gettempdir(), "framd_runway_bucket.json")
+
+
 class RunwayQueue:
     """
-    Sequential request queue to prevent rate limiting.
-    Processes one Runway request at a time with delays between requests.
+    Pipelined Runway dispatcher.
+    
+    - Submissions pass through a token bucket shared by every thread and
+      process on the host (one request per delay_between_requests, with a
+      small burst), so concurrent jobs cannot trip Runway's rate limit
+    - Up to max_in_flight tasks run at once; a batch submits as many as the
+      limit allows, then waits on TASK_POLLER futures for all of them and
+      tops up free slots as tasks finish
+    - Batch wall-clock time is roughly the slowest scene, not the sum
     """
     
-    def __init__(self, delay_between_requests: float = 2.0):
+    def __init__(
+        self,
+        delay_between_requests: float = 2.0,
+        max_in_flight: int = RUNWAY_MAX_IN_FLIGHT,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_wait_seconds: int = 300
+    ):
         self.delay = delay_between_requests
-        self._last_request_time = 0.0
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_wait_seconds = max_wait_seconds
+        self.limiter = rate_limiter or TokenBucket(
+            rate=1.0 / max(delay_between_requests, 0.01),
+            capacity=RUNWAY_RATE_BURST,
+            state_path=RUNWAY_BUCKET_PATH
+        )
     
     def process(
         self,
@@ -732,17 +746,7 @@ class RunwayQueue:
         """
         Process a single request, respecting rate limits.
         """
-        import time
-        
-        now = time.time()
-        time_since_last = now - self._last_request_time
-        
-        if time_since_last < self.delay:
-            sleep_time = self.delay - time_since_last
-            print(f"[Runway Queue] Waiting {sleep_time:.1f}s before next request...")
-            time.sleep(sleep_time)
-        
-        self._last_request_time = time.time()
+        self.limiter.acquire()
         
         return runway_generate_with_retry(
             prompt_image=prompt_image,
@@ -752,47 +756,122 @@ class RunwayQueue:
             ratio=ratio
         )
     
+    def _submit(self, req: Dict[str, Any], quality_tier: QualityTier) -> RunwayTaskResult:
+        self.limiter.acquire()
+        return runway_create_image_to_video(
+            prompt_image=req.get("prompt_image", ""),
+            prompt_text=req.get("prompt_text", ""),
+            quality_tier=quality_tier,
+            duration=req.get("duration", 5),
+            ratio=req.get("ratio", "9:16")
+        )
+    
     def process_batch(
         self,
         requests: List[Dict[str, Any]],
         quality_tier: QualityTier = QualityTier.GOOD,
-        on_progress: Any = None
+        on_progress: Any = None,
+        max_retries: int = 3,
+        base_delay: float = 5.0
     ) -> List[Dict[str, Any]]:
         """
-        Process multiple requests sequentially with progress callbacks.
+        Submit every request, then wait on all in-flight tasks together.
+        
+        Retry policy matches runway_generate_with_retry: rate limits and
+        timeouts are retried with exponential backoff, moderation and other
+        failures are final.
         
         Args:
             requests: List of dicts with prompt_image, prompt_text, duration, ratio
             quality_tier: Quality tier for all requests
-            on_progress: Optional callback(current, total, status_message)
+            on_progress: Optional callback(completed, total, status_message),
+                called as scenes actually finish
             
         Returns:
-            List of results for each request
+            List of results in the same order as requests
         """
-        results = []
-        total = len(requests)
+        import time
         
-        for i, req in enumerate(requests):
-            if on_progress:
-                remaining_time = (total - i) * 1.5
-                on_progress(i + 1, total, f"Generating scene {i + 1} of {total}... ~{int(remaining_time)} min remaining")
+        total = len(requests)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        attempts = [0] * total
+        not_before = [0.0] * total
+        waiting = list(range(total))
+        in_flight: Dict[int, Dict[str, Any]] = {}
+        completed = 0
+        
+        if on_progress and total:
+            on_progress(0, total, f"Submitting {total} scenes for generation...")
+        
+        def finish(index: int, result: Dict[str, Any]):
+            nonlocal completed
+            results[index] = result
+            completed += 1
+            if result.get("success"):
+                print(f"[Runway Queue] Scene {index + 1} done ({completed}/{total})")
+            elif result.get("error_code") == "CONTENT_MODERATED":
+                print(f"[Runway Queue] Scene {index + 1} failed moderation, continuing with next...")
+            else:
+                print(f"[Runway Queue] Scene {index + 1} failed: {result.get('error')}")
+            if on_progress and completed < total:
+                on_progress(completed, total, f"Generated {completed} of {total} scenes...")
+        
+        def handle_error(index: int, error: RunwayError):
+            retryable = error.code in ("RATE_LIMITED", "TIMEOUT")
+            if retryable and attempts[index] < max_retries:
+                delay = base_delay * (2 ** attempts[index])
+                attempts[index] += 1
+                print(f"[Runway Queue] Scene {index + 1} {error.code}, retrying in {delay}s (attempt {attempts[index]}/{max_retries})")
+                not_before[index] = time.time() + delay
+                waiting.append(index)
+            else:
+                finish(index, _runway_failure_result(error))
+        
+        while waiting or in_flight:
+            now = time.time()
+            for index in sorted(waiting):
+                if len(in_flight) >= self.max_in_flight:
+                    break
+                if not_before[index] > now:
+                    continue
+                waiting.remove(index)
+                try:
+                    task = self._submit(requests[index], quality_tier)
+                    in_flight[index] = TASK_POLLER.watch_runway(task.task_id, max_wait_seconds=self.max_wait_seconds)
+                    print(f"[Runway Queue] Scene {index + 1} submitted as task {task.task_id[:8]}... ({len(in_flight)} in flight)")
+                except RunwayError as e:
+                    handle_error(index, e)
             
-            result = self.process(
-                prompt_image=req.get("prompt_image", ""),
-                prompt_text=req.get("prompt_text", ""),
-                quality_tier=quality_tier,
-                duration=req.get("duration", 5),
-                ratio=req.get("ratio", "9:16")
-            )
-            results.append(result)
+            retry_at = min((not_before[i] for i in waiting), default=None)
+            if not in_flight:
+                if retry_at is not None:
+                    time.sleep(max(0.0, retry_at - time.time()))
+                continue
             
-            if not result.get("success") and result.get("error_code") == "CONTENT_MODERATED":
-                print(f"[Runway Queue] Scene {i + 1} failed moderation, continuing with next...")
+            wait_timeout = max(0.0, retry_at - time.time()) if retry_at is not None else None
+            done, _ = wait_futures(list(in_flight.values()), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            
+            for index, future in list(in_flight.items()):
+                if future not in done:
+                    continue
+                del in_flight[index]
+                try:
+                    status = future.result()
+                    finish(index, {
+                        "success": True,
+                        "task_id": status.task_id,
+                        "status": status.status.value,
+                        "output_url": status.output_urls[0] if status.output_urls else None,
+                        "all_outputs": status.output_urls,
+                        "retries_used": attempts[index]
+                    })
+                except RunwayError as e:
+                    handle_error(index, e)
         
         if on_progress:
             on_progress(total, total, "All scenes generated!")
         
-        return results
+        return [r if r is not None else _runway_failure_result(None) for r in results]
 
 
 RUNWAY_QUEUE = RunwayQueue(delay_between_requests=2.0)
@@ -2369,39 +2448,14 @@ def shotstack_wait_for_completion(
     poll_interval: int = 5
 ) -> Dict[str, Any]:
     """
-    Poll Shotstack render until completion or timeout.
+    Wait for a Shotstack render via the shared TASK_POLLER.
     
     Args:
         render_id: The render job ID
         max_wait_seconds: Maximum time to wait
-        poll_interval: Seconds between polls
+        poll_interval: Unused; the poller schedules checks adaptively
         
     Returns:
         Final status with URL if complete
     """
-    import time
-    
-    elapsed = 0
-    while elapsed < max_wait_seconds:
-        status = check_shotstack_status(render_id)
-        
-        print(f"[Shotstack] Render {render_id[:8]}... status={status.get('status')}")
-        
-        if status.get("status") == "done":
-            return {
-                "status": "done",
-                "url": status.get("url"),
-                "render_time": status.get("render_time")
-            }
-        elif status.get("status") == "failed":
-            return {
-                "status": "failed",
-                "error": status.get("error", "Render failed")
-            }
-        elif status.get("error"):
-            return status
-        
-        time.sleep(poll_interval)
-        elapsed += poll_interval
-    
-    return {"status": "timeout", "error": f"Render timed out after {max_wait_seconds}s"}
+    return TASK_POLLER.watch_shotstack(render_id, max_wait_seconds=max_wait_seconds).result()
@@ -0,0 +1,218 @@
+"""
+Content-Addressed Render Cache
+
+Scene clips, trimmed stock clips, Ken Burns image clips and SFX-mixed audio
+are pure functions of their inputs and ffmpeg parameters, but each render
+writes them under a fresh uuid name. This cache keys every artifact by
+
+    sha256(input media bytes or URL + normalized ffmpeg parameters)
+
+so a re-render after a caption tweak or a single-scene edit reuses every
+unchanged clip instead of downloading and re-encoding it.
+
+- Entries live in RENDER_CACHE_DIR as <key><suffix>
+- Size-bounded LRU on disk: file mtime is bumped on every hit, the oldest
+  entries are evicted once RENDER_CACHE_MAX_BYTES is exceeded
+- Hits hand out a private copy, so callers may overwrite or delete their
+  output as before without touching the cache
+- hit/miss/store/eviction counters via RENDER_CACHE.stats()
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from typing import Optional, List, Dict, Any, Callable
+
+
+RENDER_CACHE_DIR = os.environ.get(
+    "RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "framd_render_cache")
+)
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+RENDER_CACHE_ENABLED = os.environ.get("RENDER_CACHE_ENABLED", "true").lower() != "false"
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def _normalize_param(value: Any) -> Any:
+    """Round floats so 4.000001s and 4.0s share a key; recurse into containers."""
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, dict):
+        return {str(k): _normalize_param(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_param(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class RenderCache:
+    """Size-bounded, content-addressed LRU cache of rendered media files."""
+
+    def __init__(self, cache_dir: str = RENDER_CACHE_DIR, max_bytes: int = RENDER_CACHE_MAX_BYTES,
+                 enabled: bool = RENDER_CACHE_ENABLED):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._digests: Dict[tuple, str] = {}
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def file_digest(self, path: str) -> str:
+        """sha256 of a file's bytes, memoized by (path, size, mtime)."""
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(memo_key)
+        if cached:
+            return cached
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            if len(self._digests) > 4096:
+                self._digests.clear()
+            self._digests[memo_key] = digest
+        return digest
+
+    def make_key(self, inputs: List[str], params: Dict[str, Any]) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            inputs: Local file paths (hashed by content) or URLs (hashed as strings)
+            params: ffmpeg parameters that affect the output (size, duration, crf, ...)
+        """
+        parts = []
+        for item in inputs:
+            if item and not item.startswith(("http://", "https://", "data:")) and os.path.isfile(item):
+                parts.append("file:" + self.file_digest(item))
+            else:
+                parts.append("url:" + (item or ""))
+        payload = json.dumps({"inputs": parts, "params": _normalize_param(params)}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def fetch(self, key: str, output_path: str, suffix: str = ".mp4") -> bool:
+        """Place a cached artifact at output_path. Returns False on a miss."""
+        if not self.enabled:
+            return False
+        entry = self._entry_path(key, suffix)
+        if not os.path.exists(entry):
+            with self._lock:
+                self._stats["misses"] += 1
+            return False
+        try:
+            os.utime(entry, None)
+            if os.path.abspath(entry) != os.path.abspath(output_path):
+                shutil.copyfile(entry, output_path)
+        except OSError as e:
+            print(f"[RenderCache] Fetch failed for {key[:12]}: {e}")
+            with self._lock:
+                self._stats["misses"] += 1
+            return False
+        with self._lock:
+            self._stats["hits"] += 1
+        print(f"[RenderCache] Hit {key[:12]} -> {output_path}")
+        return True
+
+    def store(self, key: str, source_path: str, suffix: str = ".mp4") -> Optional[str]:
+        """Copy a freshly rendered artifact into the cache and enforce the size budget."""
+        if not self.enabled or not os.path.exists(source_path):
+            return None
+        entry = self._entry_path(key, suffix)
+        tmp = f"{entry}.{threading.get_ident()}.tmp"
+        try:
+            shutil.copyfile(source_path, tmp)
+            os.replace(tmp, entry)
+        except OSError as e:
+            print(f"[RenderCache] Store failed for {key[:12]}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return None
+        with self._lock:
+            self._stats["stores"] += 1
+        self._evict()
+        return entry
+
+    def get_or_render(
+        self,
+        inputs: List[str],
+        params: Dict[str, Any],
+        output_path: str,
+        render_fn: Callable[[str], bool],
+        suffix: Optional[str] = None
+    ) -> bool:
+        """
+        Serve output_path from the cache, or render it and cache the result.
+
+        render_fn(output_path) must return True only when the output is a
+        faithful render of (inputs, params); fallbacks that still leave a
+        usable file should return False so they are not cached.
+
+        Returns True on a cache hit or when render_fn returned True. A False
+        return may still leave a (fallback or partial) file at output_path;
+        callers that accept fallbacks check for the file themselves.
+        """
+        suffix = suffix or os.path.splitext(output_path)[1] or ".mp4"
+        try:
+            key = self.make_key(inputs, params) if self.enabled else None
+        except OSError as e:
+            print(f"[RenderCache] Could not hash inputs: {e}")
+            key = None
+
+        if key and self.fetch(key, output_path, suffix):
+            return True
+
+        rendered = bool(render_fn(output_path)) and os.path.exists(output_path)
+        if key and rendered:
+            self.store(key, output_path, suffix)
+        return rendered
+
+    def _evict(self):
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for e in it:
+                    if not e.is_file() or e.name.endswith(".tmp"):
+                        continue
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                with self._lock:
+                    self._stats["evictions"] += 1
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+RENDER_CACHE = RenderCache()
@@ -0,0 +1,215 @@
+"""
+Single-Pass Render Graph
+
+Builds one ffmpeg invocation for a final render: every scene source (raw
+downloaded video or still image), its motion filter, the xfade chain,
+scale/crop to the output format, template visual FX, burned-in subtitles
+and the voiceover mux all go into a single filter_complex with one
+libx264 encode.
+
+The multi-pass chain in routes/render.render_video (per-clip encode ->
+xfade encode -> Pass 1 scale/audio encode -> Pass 2 subtitles encode)
+is kept as the fallback when this graph fails.
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
+
+
+TRANSITION_DURATION = 0.5
+OUTPUT_FPS = 30
+
+
+@dataclass
+class SceneInput:
+    """One scene source on local disk."""
+    path: str
+    duration: float
+    is_image: bool = False
+    direction: Optional[str] = None
+
+
+def motion_filter(direction: Optional[str], target_w: int, target_h: int, duration: float) -> str:
+    """Ken Burns style motion for a still image, or a letterboxed fit when static."""
+    base_filter = f'scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:black'
+    direction = (direction or '').lower()
+    if direction in ('static', ''):
+        return base_filter
+    if 'zoom in' in direction:
+        return f'scale={int(target_w*1.2)}:{int(target_h*1.2)}:force_original_aspect_ratio=decrease,zoompan=z=\'min(zoom+0.0015,1.1)\':x=\'iw/2-(iw/zoom/2)\':y=\'ih/2-(ih/zoom/2)\':d={int(duration*30)}:s={target_w}x{target_h}'
+    if 'zoom out' in direction:
+        return f'scale={int(target_w*1.2)}:{int(target_h*1.2)}:force_original_aspect_ratio=decrease,zoompan=z=\'if(lte(zoom,1.0),1.1,max(zoom-0.0015,1.0))\':x=\'iw/2-(iw/zoom/2)\':y=\'ih/2-(ih/zoom/2)\':d={int(duration*30)}:s={target_w}x{target_h}'
+    if 'pan left' in direction:
+        return f'scale={int(target_w*1.3)}:-1,crop={target_w}:{target_h}:x=\'(iw-{target_w})*t/{duration}\':y=0'
+    if 'pan right' in direction:
+        return f'scale={int(target_w*1.3)}:-1,crop={target_w}:{target_h}:x=\'(iw-{target_w})*(1-t/{duration})\':y=0'
+    return base_filter
+
+
+def build_subtitle_filter(srt_path: str, style: Dict[str, Any]) -> str:
+    """subtitles= filter burning an SRT with the caption style settings."""
+    hex_color = style['color'].lstrip('#')
+    if len(hex_color) == 6:
+        r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+        bgr_color = f"&H{b:02X}{g:02X}{r:02X}&"
+    else:
+        bgr_color = "&HFFFFFF&"
+
+    outline_width = 3 if style['outline'] else 0
+    shadow_depth = 2 if style['shadow'] else 0
+    escaped_srt = srt_path.replace('\\', '/').replace(':', r'\:')
+    margin_v = 100
+
+    return (
+        f"subtitles={escaped_srt}:force_style='"
+        f"FontName=DejaVu Sans,FontSize={style['fontsize']},"
+        f"PrimaryColour={bgr_color},OutlineColour=&H000000&,"
+        f"BorderStyle=1,Outline={outline_width},Shadow={shadow_depth},"
+        f"Alignment=2,MarginV={margin_v}'"
+    )
+
+
+def build_render_graph(
+    scenes: List[SceneInput],
+    width: int,
+    height: int,
+    motion_size: Optional[tuple] = None,
+    audio_path: Optional[str] = None,
+    audio_duration: Optional[float] = None,
+    fx_filter: str = '',
+    subtitle_filter: Optional[str] = None,
+    transition_duration: float = TRANSITION_DURATION,
+) -> Dict[str, Any]:
+    """
+    Build input arguments and the filter_complex for a single-pass render.
+
+    Args:
+        scenes: Scene sources in timeline order
+        width, height: Output size
+        motion_size: Canvas the image motion filters run at (defaults to output size)
+        audio_path: Voiceover to mux; audio_duration pins the output length to it
+        fx_filter: build_visual_fx_filter output ('' for none)
+        subtitle_filter: build_subtitle_filter output, or None
+
+    Returns:
+        {'inputs': [...ffmpeg input args...], 'filter': str, 'video_label': str,
+         'audio_index': int or None, 'duration': float}
+    """
+    if not scenes:
+        raise ValueError("No scenes to render")
+
+    motion_w, motion_h = motion_size or (width, height)
+    inputs: List[str] = []
+    parts: List[str] = []
+    durations = [max(0.1, s.duration) for s in scenes]
+
+    for i, scene in enumerate(scenes):
+        duration = durations[i]
+        if scene.is_image:
+            if 'zoom' in (scene.direction or '').lower():
+                # zoompan emits d frames per input frame, so feed it the still exactly once
+                inputs.extend(['-i', os.path.abspath(scene.path)])
+            else:
+                inputs.extend(['-loop', '1', '-framerate', str(OUTPUT_FPS), '-t', f'{duration:.3f}', '-i', os.path.abspath(scene.path)])
+            prefix = motion_filter(scene.direction, motion_w, motion_h, duration) + ','
+        else:
+            inputs.extend(['-t', f'{duration:.3f}', '-i', os.path.abspath(scene.path)])
+            prefix = ''
+        parts.append(
+            f"[{i}:v]{prefix}scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},"
+            f"setsar=1,fps={OUTPUT_FPS},format=yuv420p,tpad=stop_mode=clone:stop_duration={duration:.3f},"
+            f"trim=duration={duration:.3f},setpts=PTS-STARTPTS[s{i}]"
+        )
+
+    if len(scenes) == 1:
+        current = "[s0]"
+        timeline = durations[0]
+    else:
+        if min(durations) < 1:
+            transition_duration = min(transition_duration, min(durations) * 0.8)
+        current = "[s0]"
+        offset = 0.0
+        for i in range(1, len(scenes)):
+            offset += max(0.1, durations[i - 1] - transition_duration)
+            label = f"[x{i}]"
+            parts.append(
+                f"{current}[s{i}]xfade=transition=fade:duration={transition_duration:.3f}:offset={offset:.3f}{label}"
+            )
+            current = label
+        timeline = offset + durations[-1]
+
+    post = []
+    if audio_duration and audio_duration > timeline:
+        # Hold the last frame instead of cutting the voiceover short
+        post.append(f"tpad=stop_mode=clone:stop_duration={audio_duration - timeline + 0.1:.3f}")
+    if fx_filter:
+        post.append(fx_filter)
+    if subtitle_filter:
+        post.append(subtitle_filter)
+    if post:
+        parts.append(f"{current}{','.join(post)}[vout]")
+        current = "[vout]"
+
+    audio_index = None
+    if audio_path:
+        audio_index = len(scenes)
+        inputs.extend(['-i', os.path.abspath(audio_path)])
+
+    return {
+        'inputs': inputs,
+        'filter': ';'.join(parts),
+        'video_label': current,
+        'audio_index': audio_index,
+        'duration': audio_duration or timeline,
+    }
+
+
+def render_single_pass(
+    scenes: List[SceneInput],
+    output_path: str,
+    width: int,
+    height: int,
+    motion_size: Optional[tuple] = None,
+    audio_path: Optional[str] = None,
+    audio_duration: Optional[float] = None,
+    fx_filter: str = '',
+    subtitle_filter: Optional[str] = None,
+    crf: int = 26,
+    preset: str = 'ultrafast',
+    timeout: int = 300
+) -> bool:
+    """Render scenes + FX + subtitles + audio with one ffmpeg encode. Returns True on success."""
+    try:
+        graph = build_render_graph(
+            scenes, width, height, motion_size=motion_size, audio_path=audio_path,
+            audio_duration=audio_duration, fx_filter=fx_filter, subtitle_filter=subtitle_filter
+        )
+    except ValueError as e:
+        print(f"[RenderGraph] {e}")
+        return False
+
+    cmd = ['ffmpeg', '-y'] + graph['inputs'] + [
+        '-filter_complex', graph['filter'],
+        '-map', graph['video_label'],
+    ]
+    if graph['audio_index'] is not None:
+        cmd.extend(['-map', f"{graph['audio_index']}:a", '-c:a', 'aac', '-b:a', '128k'])
+    else:
+        cmd.append('-an')
+    cmd.extend(['-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-threads', '0', '-pix_fmt', 'yuv420p'])
+    if audio_duration:
+        cmd.extend(['-t', f'{audio_duration:.3f}'])
+    cmd.append(os.path.abspath(output_path))
+
+    print(f"[RenderGraph] Single-pass render: {len(scenes)} scenes, {graph['duration']:.1f}s")
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print("[RenderGraph] Single-pass render timed out")
+        return False
+    if result.returncode != 0 or not os.path.exists(output_path):
+        print(f"[RenderGraph] Single-pass render failed: {result.stderr.decode(errors='replace')[-800:]}")
+        return False
+    return True
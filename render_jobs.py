@@ -0,0 +1,209 @@
+"""
+Durable Render Job Store
+
+Background renders (video_renderer.background_render_task) used to report
+status through a module-level dict in app.py, which was lost on restart,
+invisible to other gunicorn workers and never pruned. Render job state now
+lives in the render_jobs table so any web worker can answer
+/render-status/<job_id> and /my-render-jobs.
+
+- create / update / get / list_by_user / expire
+- Progress-only updates are batched: they are coalesced in memory and
+  written at most once per RENDER_JOB_FLUSH_INTERVAL per job; status,
+  result and error changes are written immediately
+- Rows carry an expires_at (RENDER_JOB_TTL_HOURS); expired rows are
+  deleted opportunistically when new jobs are created
+- Connections come from JOB_QUEUE, so the pooled backend is shared
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
+
+
+RENDER_JOB_TTL_HOURS = int(os.environ.get("RENDER_JOB_TTL_HOURS", "24"))
+RENDER_JOB_FLUSH_INTERVAL = float(os.environ.get("RENDER_JOB_FLUSH_INTERVAL", "2.0"))
+EXPIRE_EVERY_SECONDS = 600
+
+TERMINAL_STATUSES = ("complete", "error")
+UPDATABLE_FIELDS = ("status", "progress", "video_url", "error")
+
+
+@dataclass
+class RenderJob:
+    job_id: str
+    user_id: Optional[str]
+    status: str
+    progress: int
+    video_url: Optional[str]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    expires_at: Optional[datetime]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "user_id": self.user_id,
+            "status": self.status,
+            "progress": self.progress,
+            "video_url": self.video_url,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class RenderJobStore:
+    """Postgres-backed render job state shared by every process."""
+
+    def __init__(self, queue=None, ttl_hours: int = RENDER_JOB_TTL_HOURS,
+                 flush_interval: float = RENDER_JOB_FLUSH_INTERVAL):
+        self._queue = queue
+        self.ttl_hours = ttl_hours
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._last_expire = 0.0
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            from job_queue import JOB_QUEUE
+            self._queue = JOB_QUEUE
+        return self._queue
+
+    def create(self, job_id: str, user_id: Optional[str], status: str = "queued") -> Optional[RenderJob]:
+        """Register a render job. Creating an existing job_id is a no-op."""
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO render_jobs (job_id, user_id, status, progress, expires_at)
+                    VALUES (%s, %s, %s, 0, NOW() + make_interval(hours => %s))
+                    ON CONFLICT (job_id) DO NOTHING
+                """, (job_id, str(user_id) if user_id is not None else None, status, self.ttl_hours))
+                conn.commit()
+
+        if time.time() - self._last_expire > EXPIRE_EVERY_SECONDS:
+            self._last_expire = time.time()
+            try:
+                self.expire()
+            except Exception as e:
+                print(f"[RenderJobs] Expiry sweep failed: {e}")
+        return self.get(job_id)
+
+    def update(self, job_id: str, flush: bool = False, **fields):
+        """
+        Update status/progress/video_url/error for a job.
+
+        Progress-only updates are buffered; anything else (or flush=True)
+        writes the buffered fields together in one statement.
+        """
+        unknown = set(fields) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown render job fields: {sorted(unknown)}")
+
+        with self._lock:
+            pending = self._pending.setdefault(job_id, {})
+            pending.update(fields)
+            due = (
+                flush
+                or any(k != "progress" for k in fields)
+                or time.time() - self._last_flush.get(job_id, 0.0) >= self.flush_interval
+            )
+        if due:
+            self.flush(job_id)
+
+    def flush(self, job_id: Optional[str] = None):
+        """Write buffered updates for one job (or all jobs) to the database."""
+        with self._lock:
+            job_ids = [job_id] if job_id else list(self._pending)
+            batches = [(jid, self._pending.pop(jid)) for jid in job_ids if self._pending.get(jid)]
+            now = time.time()
+            for jid, _ in batches:
+                self._last_flush[jid] = now
+        if not batches:
+            return
+
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                for jid, values in batches:
+                    columns = [k for k in UPDATABLE_FIELDS if k in values]
+                    assignments = ", ".join(f"{col} = %s" for col in columns)
+                    cur.execute(
+                        f"UPDATE render_jobs SET {assignments}, updated_at = NOW() WHERE job_id = %s",
+                        [values[col] for col in columns] + [jid]
+                    )
+                conn.commit()
+
+        from progress_events import publish_progress, render_topic
+        for jid, values in batches:
+            publish_progress(render_topic(jid), type="render", job_id=jid, **values)
+
+        with self._lock:
+            for jid, values in batches:
+                if values.get("status") in TERMINAL_STATUSES:
+                    self._last_flush.pop(jid, None)
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM render_jobs WHERE job_id = %s AND expires_at > NOW()", (job_id,))
+                row = cur.fetchone()
+        job = self._row_to_job(row) if row else None
+        if job:
+            self._overlay_pending(job)
+        return job
+
+    def list_by_user(self, user_id: str, limit: int = 10) -> List[RenderJob]:
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT * FROM render_jobs
+                    WHERE user_id = %s AND expires_at > NOW()
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                """, (user_id, limit))
+                rows = cur.fetchall()
+        jobs = [self._row_to_job(row) for row in rows]
+        for job in jobs:
+            self._overlay_pending(job)
+        return jobs
+
+    def expire(self) -> int:
+        """Delete expired jobs. Returns the number of rows removed."""
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM render_jobs WHERE expires_at <= NOW()")
+                removed = cur.rowcount
+                conn.commit()
+        if removed:
+            print(f"[RenderJobs] Expired {removed} render jobs")
+        return removed
+
+    def _overlay_pending(self, job: RenderJob):
+        """Show this process's not-yet-flushed progress on reads."""
+        with self._lock:
+            pending = dict(self._pending.get(job.job_id) or {})
+        for key, value in pending.items():
+            setattr(job, key, value)
+
+    def _row_to_job(self, row: Any) -> RenderJob:
+        return RenderJob(
+            job_id=row["job_id"],
+            user_id=row.get("user_id"),
+            status=row["status"],
+            progress=row.get("progress") or 0,
+            video_url=row.get("video_url"),
+            error=row.get("error"),
+            created_at=row.get("created_at"),
+            updated_at=row.get("updated_at"),
+            expires_at=row.get("expires_at"),
+        )
+
+
+RENDER_JOBS = RenderJobStore()
@@ -6,11 +6,14 @@ background render jobs, and export/promo functionality.
 import os
 import json
 import logging
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response
 from flask_login import current_user
 
 from models import Project
 from job_queue import JOB_QUEUE
+from render_jobs import RENDER_JOBS
+from progress_events import PROGRESS_EVENTS, job_topic, render_topic, project_topic
+from media_probe import get_media_duration
 from routes.utils import get_user_id, format_user_error
 
 api_bp = Blueprint('api', __name__)
@@ -119,6 +122,17 @@ def api_queue_stats():
     })
 
 
+@api_bp.route('/api/llm-cache/stats', methods=['GET'])
+def api_llm_cache_stats():
+    """LLM response cache hit rates per call site (admin)."""
+    from llm_cache import llm_cache_stats
+    
+    return jsonify({
+        'ok': True,
+        'stats': llm_cache_stats()
+    })
+
+
 @api_bp.route('/api/projects', methods=['GET'])
 def api_get_projects():
     user_id = get_user_id()
@@ -194,24 +208,25 @@ def start_background_render():
 @api_bp.route('/render-status/<job_id>', methods=['GET'])
 def get_render_status(job_id):
     """Check the status of a background render job."""
-    from app import background_render_jobs
-    
-    job = JOB_QUEUE.get_job(job_id)
+    render_job = RENDER_JOBS.get(job_id)
+    if render_job:
+        return jsonify({
+            'status': render_job.status,
+            'progress': render_job.progress,
+            'video_url': render_job.video_url,
+            'error': render_job.error
+        })
     
+    job = JOB_QUEUE.get_job(int(job_id)) if job_id.isdigit() else None
     if not job:
-        if job_id in background_render_jobs:
-            old_job = background_render_jobs[job_id]
-            return jsonify({
-                'status': old_job['status'],
-                'progress': old_job['progress'],
-                'video_url': old_job['video_url'],
-                'error': old_job['error']
-            })
         return jsonify({'error': 'Job not found'}), 404
     
+    job = JOB_QUEUE.to_dict(job)
+    progress = job['progress']
+    percent = int(progress['current'] * 100 / progress['total']) if progress['total'] else 0
     return jsonify({
         'status': job['status'],
-        'progress': job.get('progress', {}).get('percent', 0),
+        'progress': percent,
         'video_url': job.get('result_url'),
         'error': job.get('error_message'),
         'job': job
@@ -221,8 +236,6 @@ def get_render_status(job_id):
 @api_bp.route('/my-render-jobs', methods=['GET'])
 def get_my_render_jobs():
     """Get all render jobs for the current user."""
-    from app import background_render_jobs
-    
     user_id = None
     if current_user.is_authenticated:
         user_id = current_user.id
@@ -232,39 +245,87 @@ def get_my_render_jobs():
     if not user_id:
         return jsonify([])
     
-    user_jobs = []
-    for job_id, job in background_render_jobs.items():
-        if job.get('user_id') == user_id:
-            user_jobs.append({
-                'job_id': job_id,
-                'status': job['status'],
-                'progress': job['progress'],
-                'video_url': job['video_url'],
-                'created_at': job.get('created_at')
-            })
-    
-    user_jobs.sort(key=lambda x: x.get('created_at', 0), reverse=True)
+    user_jobs = [{
+        'job_id': job.job_id,
+        'status': job.status,
+        'progress': job.progress,
+        'video_url': job.video_url,
+        'created_at': job.created_at.isoformat() if job.created_at else None
+    } for job in RENDER_JOBS.list_by_user(str(user_id), limit=10)]
     
-    return jsonify(user_jobs[:10])
+    return jsonify(user_jobs)
 
 
 @api_bp.route('/api/job/<job_id>/status', methods=['GET'])
 def api_job_status(job_id):
-    from app import background_render_jobs
-    
-    if job_id in background_render_jobs:
-        job = background_render_jobs[job_id]
+    job = RENDER_JOBS.get(job_id)
+    if job:
         return jsonify({
             'ok': True,
-            'status': job.get('status', 'unknown'),
-            'progress': job.get('progress', 0),
-            'message': job.get('status', 'Processing...').replace('_', ' ').title(),
-            'video_url': job.get('video_url'),
-            'error': job.get('error')
+            'status': job.status or 'unknown',
+            'progress': job.progress or 0,
+            'message': (job.status or 'Processing...').replace('_', ' ').title(),
+            'video_url': job.video_url,
+            'error': job.error
         })
     return jsonify({'ok': False, 'error': 'Job not found'}), 404
 
 
+@api_bp.route('/api/progress/<kind>/<item_id>/stream', methods=['GET'])
+def api_progress_stream(kind, item_id):
+    """
+    Server-Sent Events stream of progress for a job, render or project.
+    
+    kind: 'job' (video_jobs id), 'render' (background render job id) or
+    'project' (scene preview status). The first event is a snapshot of the
+    current state; the stream ends when the work reaches a terminal status.
+    """
+    user_id = get_user_id()
+    if not user_id:
+        return jsonify({'ok': False, 'error': 'Not authenticated'}), 401
+    
+    if kind == 'job':
+        job = JOB_QUEUE.get_job(int(item_id)) if item_id.isdigit() else None
+        if not job:
+            return jsonify({'ok': False, 'error': 'Job not found'}), 404
+        if job.user_id != user_id:
+            return jsonify({'ok': False, 'error': 'Not authorized'}), 403
+        topic = job_topic(job.id)
+        
+        def snapshot():
+            current = JOB_QUEUE.get_job(job.id) or job
+            return {'type': 'snapshot', 'status': current.status, 'job': JOB_QUEUE.to_dict(current)}
+    elif kind == 'render':
+        render_job = RENDER_JOBS.get(item_id)
+        if not render_job:
+            return jsonify({'ok': False, 'error': 'Job not found'}), 404
+        if render_job.user_id and render_job.user_id != str(user_id):
+            return jsonify({'ok': False, 'error': 'Not authorized'}), 403
+        topic = render_topic(item_id)
+        
+        def snapshot():
+            current = RENDER_JOBS.get(item_id) or render_job
+            return {'type': 'snapshot', **current.to_dict()}
+    elif kind == 'project':
+        project = Project.query.filter_by(id=item_id, user_id=user_id).first() if item_id.isdigit() else None
+        if not project:
+            return jsonify({'ok': False, 'error': 'Project not found'}), 404
+        topic = project_topic(project.id)
+        project_id = project.id
+        
+        def snapshot():
+            return {'type': 'snapshot', 'project_id': project_id}
+    else:
+        return jsonify({'ok': False, 'error': 'Unknown progress stream'}), 400
+    
+    # The snapshot is read inside the stream, after it has subscribed
+    return Response(
+        PROGRESS_EVENTS.stream(topic, snapshot=snapshot),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @api_bp.route('/export-platform-format', methods=['POST'])
 def export_platform_format():
     """Export video in platform-specific format with caption styles and post optimization."""
@@ -390,12 +451,7 @@ def generate_carousel_images(video_path, count, script_text, output_id):
     os.makedirs('output/carousel', exist_ok=True)
     images = []
     
-    try:
-        probe_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                     '-of', 'default=noprint_wrappers=1:nokey=1', video_path]
-        duration = float(subprocess.run(probe_cmd, capture_output=True, text=True).stdout.strip() or '10')
-    except:
-        duration = 10
+    duration = get_media_duration(video_path, default=10)
     
     if not script_text or len(script_text.strip()) < 10:
         slides = [{"text": f"Slide {i+1}", "timestamp": (i + 0.5) / count} for i in range(count)]
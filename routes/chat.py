@@ -4,7 +4,6 @@ Handles chat/conversation endpoints.
 """
 import json
 import os
-import subprocess
 from flask import Blueprint, request, jsonify
 from flask_login import current_user
 
@@ -14,6 +13,7 @@ from context_engine import call_ai, SYSTEM_GUARDRAILS
 from routes.utils import get_user_id
 from routes.overlays import get_or_create_monthly_usage, CLIPPER_MONTHLY_CAP
 from services.preview_service import generate_scene_preview_async, generate_all_scenes_async
+from media_probe import get_media_duration
 
 chat_bp = Blueprint('chat', __name__)
 
@@ -313,16 +313,7 @@ def api_chat():
             file_path = matches[0]
             ext = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
             file_type = 'video' if ext in ('mp4', 'mov', 'avi', 'webm', 'mkv') else 'audio' if ext in ('mp3', 'wav', 'm4a', 'aac') else 'other'
-            duration = None
-            try:
-                probe = subprocess.run(
-                    ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'json', file_path],
-                    capture_output=True, text=True, timeout=30
-                )
-                probe_data = json.loads(probe.stdout)
-                duration = float(probe_data.get('format', {}).get('duration', 0))
-            except Exception:
-                pass
+            duration = get_media_duration(file_path)
             source = ProjectSource(
                 project_id=project_id,
                 user_id=user_id,
@@ -634,8 +625,8 @@ def api_preview_video(project_id):
     local_path = config.get('preview_local_path')
     
     if local_path and os.path.exists(local_path):
-        from flask import send_file
-        return send_file(local_path, mimetype='video/mp4')
+        from media_serving import send_media_file
+        return send_media_file(local_path, mimetype='video/mp4', private=True)
     
     return '', 404
 
@@ -655,8 +646,8 @@ def api_scene_preview_video(project_id, scene_id):
         return '', 404
     
     if os.path.exists(scene.rendered_path):
-        from flask import send_file
-        return send_file(scene.rendered_path, mimetype='video/mp4')
+        from media_serving import send_media_file
+        return send_media_file(scene.rendered_path, mimetype='video/mp4', private=True)
     
     return '', 404
 
@@ -3,6 +3,7 @@ from extensions import db
 from models import CommunityTemplate, Project
 from context_engine import call_ai, SYSTEM_GUARDRAILS
 from trend_research import research_topic_trends
+from template_index import match_community_templates
 from routes.utils import get_user_id
 import json
 import logging
@@ -21,40 +22,11 @@ def match_templates():
     tone = data.get('tone', '')
 
     matched = []
-
-    if topic or tone:
-        query = CommunityTemplate.query.filter(CommunityTemplate.is_public == True)
-        if topic and tone:
-            tier1_results = query.filter(
-                CommunityTemplate.topic_tags.cast(db.Text).ilike(f'%{topic}%'),
-                CommunityTemplate.tone_tags.cast(db.Text).ilike(f'%{tone}%')
-            ).order_by(CommunityTemplate.usage_count.desc()).limit(6).all()
-            matched.extend(tier1_results)
-
-        if len(matched) < 3:
-            existing_ids = [t.id for t in matched]
-            tier2_query = CommunityTemplate.query.filter(
-                CommunityTemplate.is_public == True,
-                ~CommunityTemplate.id.in_(existing_ids) if existing_ids else True
-            )
-            if topic:
-                topic_matches = tier2_query.filter(
-                    CommunityTemplate.topic_tags.cast(db.Text).ilike(f'%{topic}%')
-                ).order_by(CommunityTemplate.usage_count.desc()).limit(6 - len(matched)).all()
-                matched.extend(topic_matches)
-
-            if len(matched) < 3 and tone:
-                existing_ids = [t.id for t in matched]
-                tone_matches = CommunityTemplate.query.filter(
-                    CommunityTemplate.is_public == True,
-                    ~CommunityTemplate.id.in_(existing_ids) if existing_ids else True,
-                    CommunityTemplate.tone_tags.cast(db.Text).ilike(f'%{tone}%')
-                ).order_by(CommunityTemplate.usage_count.desc()).limit(6 - len(matched)).all()
-                matched.extend(tone_matches)
-    else:
-        matched = CommunityTemplate.query.filter(
-            CommunityTemplate.is_public == True
-        ).order_by(CommunityTemplate.usage_count.desc()).limit(6).all()
+    try:
+        matched = list(match_community_templates(topic, tone))
+    except Exception as e:
+        logging.error(f"Template matching failed: {e}")
+        db.session.rollback()
 
     if len(matched) < 1:
         try:
@@ -109,12 +81,11 @@ Output JSON:
                 )
                 db.session.add(new_template)
                 db.session.commit()
-                matched.append(new_template)
+                matched.append(new_template.to_dict())
         except Exception as e:
             logging.error(f"AI template generation failed: {e}")
 
-    templates_out = [t.to_dict() for t in matched]
-    return jsonify({'templates': templates_out, 'count': len(templates_out)})
+    return jsonify({'templates': matched, 'count': len(matched)})
 
 
 @community_bp.route('/api/community/templates', methods=['GET'])
@@ -2,7 +2,9 @@ from flask import Blueprint, request, jsonify, session, render_template
 from extensions import db
 import os
 import json
+import base64
 import logging
+from datetime import datetime
 
 feed_bp = Blueprint('feed_bp', __name__)
 
@@ -38,6 +40,15 @@ def host_video():
     if not video_path:
         return jsonify({'error': 'Video path required'}), 400
 
+    from services.hls_service import resolve_hosted_source, submit_hosted_video
+    from routes.utils import user_owns_media
+    source = resolve_hosted_source(video_path)
+    if not source:
+        return jsonify({'error': 'Only rendered videos can be hosted'}), 400
+    rel_path = os.path.relpath(source).replace(os.sep, '/')
+    if not user_owns_media(user_id, rel_path):
+        return jsonify({'error': 'Video not found'}), 404
+
     public_id = uuid.uuid4().hex[:12]
 
     hosted = HostedVideo(
@@ -45,11 +56,13 @@ def host_video():
         project_id=project_id,
         title=title,
         public_id=public_id,
-        video_path=video_path
+        video_path='/' + rel_path
     )
     db.session.add(hosted)
     db.session.commit()
 
+    submit_hosted_video(hosted.id)
+
     domains = os.environ.get('REPLIT_DOMAINS', 'localhost:5000')
     domain = domains.split(',')[0] if domains else 'localhost:5000'
     protocol = 'https' if 'replit' in domain else 'http'
@@ -58,7 +71,8 @@ def host_video():
         'success': True,
         'public_id': public_id,
         'share_url': f'{protocol}://{domain}/v/{public_id}',
-        'title': title
+        'title': title,
+        'hls_status': 'processing'
     })
 
 
@@ -86,6 +100,7 @@ def my_hosted_videos():
             'share_url': f'{protocol}://{domain}/v/{v.public_id}',
             'views': v.views,
             'is_public': v.is_public,
+            'hls_status': v.hls_status,
             'created_at': v.created_at.isoformat()
         } for v in videos]
     })
@@ -106,30 +121,86 @@ def view_hosted_video(public_id):
     return render_template('video_view.html', video=video)
 
 
+HLS_MIMETYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.jpg': 'image/jpeg',
+}
+
+
+@feed_bp.route('/hls/<public_id>/<path:filename>')
+def serve_hosted_hls(public_id, filename):
+    """HLS playlists, segments and poster for a hosted video (immutable, cacheable)."""
+    from media_serving import send_media
+    from services.hls_service import HLS_OUTPUT_DIR
+
+    mimetype = HLS_MIMETYPES.get(os.path.splitext(filename)[1].lower())
+    if not mimetype or not public_id.isalnum():
+        return "Not found", 404
+    return send_media(os.path.join(HLS_OUTPUT_DIR, public_id), filename, mimetype=mimetype)
+
+
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 50
+
+
+def encode_feed_cursor(item):
+    """Opaque keyset cursor for the last item of a page: (created_at, id)."""
+    raw = f"{item.created_at.isoformat()}|{item.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_feed_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, item_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
 @feed_bp.route('/feed/items', methods=['GET'])
 def get_feed_items():
-    """Get AI-generated content for the swipe feed."""
+    """
+    Get AI-generated content for the swipe feed.
+
+    Newest first, excluding items the user already swiped (NOT EXISTS
+    anti-join on swipe_feedback). Keyset pagination: pass the returned
+    next_cursor as ?cursor= to get the following page.
+    """
     from models import FeedItem, SwipeFeedback
-    from sqlalchemy import or_
+    from sqlalchemy import or_, and_, exists
 
     user_id = get_user_id()
-
-    already_swiped = []
-    if user_id:
-        already_swiped = [f.feed_item_id for f in SwipeFeedback.query.filter_by(user_id=user_id).all()]
+    limit = max(1, min(request.args.get('limit', FEED_PAGE_SIZE, type=int), FEED_MAX_PAGE_SIZE))
 
     query = FeedItem.query
     if user_id:
         query = query.filter(or_(FeedItem.is_global == True, FeedItem.user_id == user_id))
+        query = query.filter(~exists().where(and_(
+            SwipeFeedback.user_id == user_id,
+            SwipeFeedback.feed_item_id == FeedItem.id
+        )))
     else:
         query = query.filter(FeedItem.is_global == True)
 
-    if already_swiped:
-        query = query.filter(FeedItem.id.notin_(already_swiped))
-
-    items = query.order_by(FeedItem.created_at.desc()).limit(20).all()
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = decode_feed_cursor(cursor)
+        if not position:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        created_at, item_id = position
+        query = query.filter(or_(
+            FeedItem.created_at < created_at,
+            and_(FeedItem.created_at == created_at, FeedItem.id < item_id)
+        ))
+
+    rows = query.order_by(FeedItem.created_at.desc(), FeedItem.id.desc()).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = encode_feed_cursor(items[-1]) if len(rows) > limit else None
 
     return jsonify({
+        'next_cursor': next_cursor,
         'items': [{
             'id': item.id,
             'content_type': item.content_type,
@@ -8,6 +8,8 @@ import traceback
 from extensions import db
 from PIL import Image, ImageDraw, ImageFont
 from urllib.parse import urlparse
+from download_manager import DOWNLOADS
+from media_serving import send_media
 import io
 
 files_bp = Blueprint('files_bp', __name__)
@@ -29,16 +31,14 @@ def download_asset():
         return jsonify({'success': False, 'error': 'Download URL not from approved source'}), 403
     
     try:
-        resp = requests.get(download_url, timeout=60, stream=True)
-        resp.raise_for_status()
+        base_name = f"{asset_id or uuid.uuid4()}"
+        download_path = os.path.join('output', f"{base_name}.download")
+        result = DOWNLOADS.download(download_url, download_path)
         
-        ext = 'mp4' if 'video' in resp.headers.get('content-type', '') else 'webm'
-        filename = f"{asset_id or uuid.uuid4()}.{ext}"
+        ext = 'mp4' if 'video' in (result.content_type or '') else 'webm'
+        filename = f"{base_name}.{ext}"
         filepath = os.path.join('output', filename)
-        
-        with open(filepath, 'wb') as f:
-            for chunk in resp.iter_content(chunk_size=8192):
-                f.write(chunk)
+        os.replace(download_path, filepath)
         
         return jsonify({
             'success': True,
@@ -486,12 +486,12 @@ def upload_file():
 
 @files_bp.route('/output/<filename>')
 def serve_output(filename):
-    return send_from_directory(current_app.config['OUTPUT_FOLDER'], filename)
+    return send_media(current_app.config['OUTPUT_FOLDER'], filename)
 
 
 @files_bp.route('/uploads/<filename>')
 def serve_uploads(filename):
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+    return send_media(current_app.config['UPLOAD_FOLDER'], filename)
 
 
 @files_bp.route('/favicon.ico')
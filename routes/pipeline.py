@@ -22,6 +22,7 @@ from context_engine import (
     generate_captions,
 )
 from audio_engine import extract_voice_actor_script, parse_character_lines
+from media_probe import probe_media, get_media_duration
 
 pipeline_bp = Blueprint('pipeline', __name__)
 
@@ -161,7 +162,7 @@ def validate_loop_endpoint():
 @pipeline_bp.route('/scene-visuals', methods=['POST'])
 def get_scene_visuals_endpoint():
     """Get AI-curated visual suggestions for a specific scene with 3 categories."""
-    from context_engine import get_scene_visuals, search_visuals_unified, detect_characters_in_scene
+    from context_engine import get_scene_visuals, search_visuals_unified, search_visuals_many, detect_characters_in_scene
 
     data = request.get_json()
     scene_text = data.get('scene_text')
@@ -197,28 +198,24 @@ def get_scene_visuals_endpoint():
         except:
             pass
 
-        curated = []
-        for query in visual_suggestions.get('search_queries', [])[:2]:
-            try:
-                results = search_visuals_unified(query, per_page=3)
-                for r in results:
-                    r['category'] = 'curated'
-                curated.extend(results)
-            except:
-                pass
-
-        backgrounds = []
+        curated_queries = visual_suggestions.get('search_queries', [])[:2]
         bg_queries = visual_suggestions.get('background_queries', [])
         if not bg_queries:
             bg_queries = ['cinematic background', 'dramatic atmosphere']
-        for query in bg_queries[:2]:
-            try:
-                results = search_visuals_unified(query, per_page=2)
-                for r in results:
-                    r['category'] = 'background'
-                backgrounds.extend(results)
-            except:
-                pass
+        bg_queries = bg_queries[:2]
+
+        # One concurrent round for every query; backgrounds keep their top 2
+        search_results = search_visuals_many(curated_queries + bg_queries, per_page=3)
+
+        curated = []
+        for query in curated_queries:
+            for r in search_results.get(query, []):
+                curated.append({**r, 'category': 'curated'})
+
+        backgrounds = []
+        for query in bg_queries:
+            for r in search_results.get(query, [])[:2]:
+                backgrounds.append({**r, 'category': 'background'})
 
         return jsonify({
             'success': True,
@@ -770,9 +767,9 @@ TOKEN_COSTS = {
 @pipeline_bp.route('/generate-video', methods=['POST'])
 def generate_video():
     """Generate a video mockup combining stock footage with voiceover."""
-    import requests
+    from media_mirror import MEDIA_MIRROR
     from models import Subscription, User
-    from routes.utils import rate_limit
+    from routes.utils import rate_limit, remember_rendered_output
 
     user_id = None
     is_dev_mode = os.environ.get('FLASK_ENV') == 'development' or os.environ.get('DEV_MODE') == 'true'
@@ -859,12 +856,9 @@ def generate_video():
                         continue
 
                     try:
-                        resp = requests.get(video_url, timeout=60)
-                        if resp.status_code == 200:
-                            temp_path = os.path.join(output_dir, f'temp_{output_id}_{i}.mp4')
-                            with open(temp_path, 'wb') as f:
-                                f.write(resp.content)
-                            temp_files.append(temp_path)
+                        temp_path = os.path.join(output_dir, f'temp_{output_id}_{i}.mp4')
+                        MEDIA_MIRROR.fetch(video_url, temp_path, asset_id=video.get('id'))
+                        temp_files.append(temp_path)
                     except Exception as e:
                         print(f"Error downloading video {i}: {e}")
 
@@ -946,12 +940,7 @@ def generate_video():
             }
             y_pos = position_map.get(caption_position, 'h-150')
 
-            duration_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', final_video]
-            duration_result = subprocess.run(duration_cmd, capture_output=True, text=True, timeout=10)
-            try:
-                video_duration = float(duration_result.stdout.strip())
-            except:
-                video_duration = 30.0
+            video_duration = get_media_duration(final_video, default=30.0)
 
             clean_script = re.sub(r'[\n\r]+', ' ', script)
             clean_script = re.sub(r'\s+', ' ', clean_script).strip()
@@ -1075,9 +1064,8 @@ def generate_video():
 
             font_filter = ",".join(filter_chain) if filter_chain else f"drawtext=text='':fontsize={font_size}"
 
-            probe_cmd = ['ffprobe', '-v', 'error', '-select_streams', 'a', '-show_entries', 'stream=codec_type', '-of', 'csv=p=0', final_video]
-            probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=10)
-            has_audio = 'audio' in probe_result.stdout
+            video_info = probe_media(final_video)
+            has_audio = bool(video_info and video_info.has_audio)
 
             if has_audio:
                 cmd = [
@@ -1114,6 +1102,7 @@ def generate_video():
                     final_video = final_with_audio
 
         if os.path.exists(final_video):
+            remember_rendered_output(f'output/{os.path.basename(final_video)}')
             return jsonify({
                 'success': True,
                 'video_url': f'/output/{os.path.basename(final_video)}',
@@ -1175,16 +1164,7 @@ def upload_source():
         save_path = os.path.join('uploads', unique_name)
         file.save(save_path)
 
-        duration = None
-        try:
-            probe = subprocess.run(
-                ['ffprobe', '-v', 'quiet', '-show_entries', 'format=duration', '-of', 'json', save_path],
-                capture_output=True, text=True, timeout=30
-            )
-            probe_data = json.loads(probe.stdout)
-            duration = float(probe_data.get('format', {}).get('duration', 0))
-        except Exception:
-            pass
+        duration = get_media_duration(save_path)
 
         existing_count = ProjectSource.query.filter_by(project_id=project.id).count()
 
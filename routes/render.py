@@ -3,6 +3,11 @@ from flask_login import current_user
 from extensions import db
 from audio_engine import parse_sfx_from_directions, mix_sfx_into_audio
 from services.caption_service import generate_captions as assemblyai_generate_captions, transcribe_audio as assemblyai_transcribe, words_to_phrases
+from render_cache import RENDER_CACHE
+from download_manager import DOWNLOADS
+from media_mirror import MEDIA_MIRROR
+from media_probe import get_media_duration
+from render_graph import SceneInput, motion_filter, build_subtitle_filter, render_single_pass
 import os
 import re
 import uuid
@@ -12,6 +17,8 @@ import logging
 
 render_bp = Blueprint('render_bp', __name__)
 
+RENDER_SINGLE_PASS = os.environ.get('RENDER_SINGLE_PASS', 'true').lower() != 'false'
+
 
 @render_bp.route('/generate-voiceover-multi', methods=['POST'])
 def generate_voiceover_multi():
@@ -255,10 +262,10 @@ def generate_voiceover_multi():
 @render_bp.route('/render-video', methods=['POST'])
 def render_video():
     """Render final video from selected scenes and voiceover."""
-    import urllib.request
-    from models import Subscription, User
-    from routes.utils import rate_limit, format_user_error
+    from models import Subscription, User, Project
+    from routes.utils import rate_limit, format_user_error, remember_rendered_output
     from context_engine import get_template_visual_fx
+    from video_renderer import build_visual_fx_filter
     from concurrent.futures import ThreadPoolExecutor, as_completed
     
     user_id = None
@@ -324,19 +331,11 @@ def render_video():
         
         audio_duration = None
         if audio_path and os.path.exists(audio_path):
-            try:
-                probe_cmd = [
-                    'ffprobe', '-v', 'error',
-                    '-show_entries', 'format=duration',
-                    '-of', 'default=noprint_wrappers=1:nokey=1',
-                    audio_path
-                ]
-                probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=10)
-                if probe_result.returncode == 0:
-                    audio_duration = float(probe_result.stdout.strip())
-                    print(f"Voiceover duration: {audio_duration:.2f}s")
-            except Exception as e:
-                print(f"Could not get audio duration: {e}")
+            audio_duration = get_media_duration(audio_path)
+            if audio_duration:
+                print(f"Voiceover duration: {audio_duration:.2f}s")
+            else:
+                print(f"Could not get audio duration for {audio_path}")
         
         num_scenes = len([s for s in scenes if s.get('video_url') or s.get('image_url') or s.get('visual') or s.get('thumbnail')])
         if audio_duration and num_scenes > 0:
@@ -345,6 +344,30 @@ def render_video():
         else:
             base_clip_duration = None
         
+        def fetch_url(url, path, asset_id=None):
+            MEDIA_MIRROR.fetch(url, path, asset_id=asset_id)
+        
+        def download_scene_source(args):
+            """Download a scene's raw video or image (no encode) for the single-pass graph."""
+            i, scene, duration, output_id = args
+            video_url = scene.get('video_url', '')
+            image_url = scene.get('image_url', '') or scene.get('visual', '') or scene.get('thumbnail', '')
+            if not video_url and not image_url:
+                print(f"Clip {i}: No video_url or image_url found")
+                return None, i
+            path = f'output/raw_{output_id}_{i}.mp4' if video_url else f'output/img_{output_id}_{i}.jpg'
+            try:
+                fetch_url(video_url or image_url, path, scene.get('media_asset_id'))
+            except Exception as e:
+                print(f"Clip {i} download error: {e}")
+                return None, i
+            return SceneInput(
+                path=path,
+                duration=duration,
+                is_image=not video_url,
+                direction=scene.get('direction', 'static')
+            ), i
+        
         def download_and_trim_clip(args):
             """Download and trim a single clip - runs in parallel. Supports both video and image URLs."""
             i, scene, duration, output_id = args
@@ -357,94 +380,94 @@ def render_video():
             
             raw_path = f'output/raw_{output_id}_{i}.mp4'
             clip_path = f'output/clip_{output_id}_{i}.mp4'
+            direction = scene.get('direction', 'static')
+            format_sizes = {
+                '9:16': (1080, 1920),
+                '1:1': (1080, 1080),
+                '4:5': (1080, 1350),
+                '16:9': (1920, 1080)
+            }
+            target_w, target_h = format_sizes.get(video_format, (1080, 1920))
             
-            try:
-                if video_url:
-                    req = urllib.request.Request(video_url, headers={'User-Agent': 'Mozilla/5.0'})
-                    with urllib.request.urlopen(req, timeout=20) as response:
-                        with open(raw_path, 'wb') as f:
-                            f.write(response.read())
-                    
-                    trim_cmd = [
-                        'ffmpeg', '-y',
-                        '-ss', '0',
-                        '-i', os.path.abspath(raw_path),
-                        '-t', str(duration),
-                        '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '26',
-                        '-an',
-                        os.path.abspath(clip_path)
-                    ]
-                    result = subprocess.run(trim_cmd, capture_output=True, timeout=45)
-                    
-                    if result.returncode != 0:
-                        import shutil as _shutil
-                        _shutil.copy(raw_path, clip_path)
-                    
-                    if os.path.exists(raw_path):
-                        os.remove(raw_path)
-                else:
-                    img_path = f'output/img_{output_id}_{i}.jpg'
-                    direction = scene.get('direction', 'static')
-                    print(f"Clip {i}: Converting image to video - direction: {direction}")
-                    
-                    req = urllib.request.Request(image_url, headers={'User-Agent': 'Mozilla/5.0'})
-                    with urllib.request.urlopen(req, timeout=20) as response:
-                        with open(img_path, 'wb') as f:
-                            f.write(response.read())
-                    
-                    format_sizes = {
-                        '9:16': (1080, 1920),
-                        '1:1': (1080, 1080),
-                        '4:5': (1080, 1350),
-                        '16:9': (1920, 1080)
-                    }
-                    target_w, target_h = format_sizes.get(video_format, (1080, 1920))
-                    
-                    base_filter = f'scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:black'
-                    
-                    if direction and direction.lower() not in ['static', '']:
-                        if 'zoom in' in direction.lower():
-                            motion_filter = f'scale={int(target_w*1.2)}:{int(target_h*1.2)}:force_original_aspect_ratio=decrease,zoompan=z=\'min(zoom+0.0015,1.1)\':x=\'iw/2-(iw/zoom/2)\':y=\'ih/2-(ih/zoom/2)\':d={int(duration*30)}:s={target_w}x{target_h}'
-                        elif 'zoom out' in direction.lower():
-                            motion_filter = f'scale={int(target_w*1.2)}:{int(target_h*1.2)}:force_original_aspect_ratio=decrease,zoompan=z=\'if(lte(zoom,1.0),1.1,max(zoom-0.0015,1.0))\':x=\'iw/2-(iw/zoom/2)\':y=\'ih/2-(ih/zoom/2)\':d={int(duration*30)}:s={target_w}x{target_h}'
-                        elif 'pan left' in direction.lower():
-                            motion_filter = f'scale={int(target_w*1.3)}:-1,crop={target_w}:{target_h}:x=\'(iw-{target_w})*t/{duration}\':y=0'
-                        elif 'pan right' in direction.lower():
-                            motion_filter = f'scale={int(target_w*1.3)}:-1,crop={target_w}:{target_h}:x=\'(iw-{target_w})*(1-t/{duration})\':y=0'
-                        else:
-                            motion_filter = base_filter
-                        vf = motion_filter
-                    else:
-                        vf = base_filter
-                    
-                    img_to_vid_cmd = [
-                        'ffmpeg', '-y',
-                        '-loop', '1',
+            def trim_video(out_path):
+                if not os.path.exists(raw_path):
+                    fetch_url(video_url, raw_path, scene.get('media_asset_id'))
+                
+                trim_cmd = [
+                    'ffmpeg', '-y',
+                    '-ss', '0',
+                    '-i', os.path.abspath(raw_path),
+                    '-t', str(duration),
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '26',
+                    '-an',
+                    os.path.abspath(out_path)
+                ]
+                result = subprocess.run(trim_cmd, capture_output=True, timeout=45)
+                
+                if result.returncode != 0:
+                    import shutil as _shutil
+                    _shutil.copy(raw_path, out_path)
+                
+                if os.path.exists(raw_path):
+                    os.remove(raw_path)
+                return result.returncode == 0
+            
+            def image_to_video(out_path):
+                img_path = f'output/img_{output_id}_{i}.jpg'
+                print(f"Clip {i}: Converting image to video - direction: {direction}")
+                
+                if not os.path.exists(img_path):
+                    fetch_url(image_url, img_path, scene.get('media_asset_id'))
+                
+                base_filter = motion_filter('static', target_w, target_h, duration)
+                vf = motion_filter(direction, target_w, target_h, duration)
+                
+                img_to_vid_cmd = [
+                    'ffmpeg', '-y',
+                    '-loop', '1',
+                    '-i', os.path.abspath(img_path),
+                    '-t', str(duration),
+                    '-vf', vf,
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
+                    '-pix_fmt', 'yuv420p',
+                    '-an',
+                    os.path.abspath(out_path)
+                ]
+                result = subprocess.run(img_to_vid_cmd, capture_output=True, timeout=60)
+                
+                if result.returncode != 0:
+                    print(f"Clip {i}: FFmpeg error - {result.stderr.decode()[:200]}")
+                    fallback_cmd = [
+                        'ffmpeg', '-y', '-loop', '1',
                         '-i', os.path.abspath(img_path),
                         '-t', str(duration),
-                        '-vf', vf,
+                        '-vf', base_filter,
                         '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
-                        '-pix_fmt', 'yuv420p',
-                        '-an',
-                        os.path.abspath(clip_path)
+                        '-pix_fmt', 'yuv420p', '-an',
+                        os.path.abspath(out_path)
                     ]
-                    result = subprocess.run(img_to_vid_cmd, capture_output=True, timeout=60)
-                    
-                    if result.returncode != 0:
-                        print(f"Clip {i}: FFmpeg error - {result.stderr.decode()[:200]}")
-                        fallback_cmd = [
-                            'ffmpeg', '-y', '-loop', '1',
-                            '-i', os.path.abspath(img_path),
-                            '-t', str(duration),
-                            '-vf', base_filter,
-                            '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '23',
-                            '-pix_fmt', 'yuv420p', '-an',
-                            os.path.abspath(clip_path)
-                        ]
-                        subprocess.run(fallback_cmd, capture_output=True, timeout=60)
-                    
-                    if os.path.exists(img_path):
-                        os.remove(img_path)
+                    subprocess.run(fallback_cmd, capture_output=True, timeout=60)
+                
+                if os.path.exists(img_path):
+                    os.remove(img_path)
+                return result.returncode == 0
+            
+            try:
+                if video_url:
+                    RENDER_CACHE.get_or_render(
+                        [video_url],
+                        {'op': 'trim', 'duration': duration, 'preset': 'ultrafast', 'crf': 26},
+                        clip_path,
+                        trim_video
+                    )
+                else:
+                    RENDER_CACHE.get_or_render(
+                        [image_url],
+                        {'op': 'image_to_video', 'size': [target_w, target_h], 'duration': duration,
+                         'direction': (direction or 'static').lower(), 'preset': 'ultrafast', 'crf': 23},
+                        clip_path,
+                        image_to_video
+                    )
                 
                 if os.path.exists(clip_path):
                     print(f"Clip {i}: Success - {duration:.1f}s")
@@ -471,21 +494,15 @@ def render_video():
                     duration = 4
             download_tasks.append((i, scene, duration, output_id))
         
-        clip_results = {}
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {executor.submit(download_and_trim_clip, task): task[0] for task in download_tasks}
-            for future in as_completed(futures):
-                clip_path, idx, duration = future.result()
-                if clip_path:
-                    clip_results[idx] = (clip_path, duration)
-        
-        sorted_indices = sorted(clip_results.keys())
-        clip_paths = [clip_results[i][0] for i in sorted_indices]
-        clip_durations = [clip_results[i][1] for i in sorted_indices]
-        print(f"Downloaded and trimmed {len(clip_paths)} clips in parallel")
-        
-        if not clip_paths:
-            return jsonify({'error': 'Failed to download any video clips'}), 500
+        # Record what each scene fetches on the project's ScenePlans so MEDIA_MIRROR keeps it pinned
+        project_id = data.get('project_id') or session.get('current_project_id')
+        if user_id and project_id and Project.query.filter_by(id=project_id, user_id=user_id).first():
+            scene_source_urls = {}
+            for i, scene in enumerate(scenes):
+                url = scene.get('video_url') or scene.get('image_url') or scene.get('visual') or scene.get('thumbnail')
+                if url and url.startswith(('http://', 'https://')):
+                    scene_source_urls[i] = {'source_url': url, 'media_asset_id': scene.get('media_asset_id')}
+            MEDIA_MIRROR.record_scene_sources(project_id, scene_source_urls)
         
         if preview_mode:
             format_sizes = {
@@ -503,125 +520,6 @@ def render_video():
             }
         width, height = format_sizes.get(video_format, (360, 640) if preview_mode else (1080, 1920))
         
-        list_path = os.path.abspath(f'output/clips_{output_id}.txt')
-        with open(list_path, 'w') as f:
-            for clip in clip_paths:
-                f.write(f"file '{os.path.abspath(clip)}'\n")
-        
-        print(f"Using {len(clip_durations)} clip durations from parallel processing")
-        
-        concat_path = os.path.abspath(f'output/concat_{output_id}.mp4')
-        
-        if len(clip_paths) > 1:
-            transition_duration = 0.5
-            
-            inputs = []
-            for i, clip in enumerate(clip_paths):
-                inputs.extend(['-i', os.path.abspath(clip)])
-            
-            filter_parts = []
-            
-            for i in range(len(clip_paths)):
-                filter_parts.append(f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},setsar=1,fps=30[s{i}]")
-            
-            transition_duration = min(transition_duration, min(clip_durations) * 0.8) if min(clip_durations) < 1 else transition_duration
-            
-            if len(clip_paths) == 2:
-                offset = max(0.1, clip_durations[0] - transition_duration)
-                filter_parts.append(f"[s0][s1]xfade=transition=fade:duration={transition_duration}:offset={offset:.2f}[v]")
-            else:
-                cumulative_duration = 0
-                for i in range(len(clip_paths) - 1):
-                    if i == 0:
-                        cumulative_duration = max(0.1, clip_durations[0] - transition_duration)
-                        filter_parts.append(f"[s0][s1]xfade=transition=fade:duration={transition_duration}:offset={cumulative_duration:.2f}[v1]")
-                    elif i == len(clip_paths) - 2:
-                        cumulative_duration += max(0.1, clip_durations[i] - transition_duration)
-                        filter_parts.append(f"[v{i}][s{i+1}]xfade=transition=fade:duration={transition_duration}:offset={cumulative_duration:.2f}[v]")
-                    else:
-                        cumulative_duration += max(0.1, clip_durations[i] - transition_duration)
-                        filter_parts.append(f"[v{i}][s{i+1}]xfade=transition=fade:duration={transition_duration}:offset={cumulative_duration:.2f}[v{i+1}]")
-            
-            xfade_filter = ";".join(filter_parts)
-            
-            concat_cmd = ['ffmpeg', '-y'] + inputs + [
-                '-filter_complex', xfade_filter,
-                '-map', '[v]',
-                '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '28', '-threads', '0',
-                concat_path
-            ]
-            result = subprocess.run(concat_cmd, capture_output=True, timeout=180)
-            
-            if result.returncode != 0:
-                print(f"Xfade error: {result.stderr.decode()[:500]}")
-                concat_cmd = [
-                    'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-                    '-i', list_path,
-                    '-c', 'copy',
-                    concat_path
-                ]
-                result = subprocess.run(concat_cmd, capture_output=True, timeout=120)
-                if result.returncode != 0:
-                    print(f"Concat fallback error: {result.stderr.decode()}")
-                else:
-                    print("Used simple concat (xfade failed)")
-            else:
-                print(f"Added fade transitions between {len(clip_paths)} clips")
-        else:
-            concat_cmd = [
-                'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
-                '-i', list_path,
-                '-c', 'copy',
-                concat_path
-            ]
-            result = subprocess.run(concat_cmd, capture_output=True, timeout=120)
-            if result.returncode != 0:
-                print(f"Concat error: {result.stderr.decode()}")
-        
-        has_audio = audio_path and os.path.exists(audio_path)
-        temp_combined = os.path.abspath(f'output/temp_combined_{output_id}.mp4')
-        
-        audio_duration = None
-        if has_audio:
-            dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', audio_path]
-            dur_result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=10)
-            try:
-                audio_duration = float(dur_result.stdout.strip())
-                print(f"Audio duration: {audio_duration:.1f}s")
-            except:
-                audio_duration = None
-        
-        pass1_cmd = ['ffmpeg', '-y']
-        
-        if has_audio and audio_duration:
-            pass1_cmd.extend(['-stream_loop', '-1', '-i', concat_path])
-            pass1_cmd.extend(['-i', audio_path])
-            pass1_cmd.extend(['-t', str(audio_duration)])
-        else:
-            pass1_cmd.extend(['-i', concat_path])
-            if has_audio:
-                pass1_cmd.extend(['-i', audio_path])
-        
-        pass1_cmd.extend([
-            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}',
-            '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '26', '-threads', '0',
-        ])
-        
-        if has_audio:
-            pass1_cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
-        else:
-            pass1_cmd.extend(['-an'])
-        
-        pass1_cmd.append(temp_combined)
-        
-        print(f"Pass 1: Combining video + audio...")
-        pass1_result = subprocess.run(pass1_cmd, capture_output=True, timeout=180)
-        
-        if pass1_result.returncode != 0:
-            print(f"Pass 1 failed: {pass1_result.stderr.decode()[:500]}")
-            if os.path.exists(concat_path):
-                shutil.copy(concat_path, temp_combined)
-        
         caption_srt_path = None
         caption_style_settings = None
         
@@ -693,79 +591,225 @@ def render_video():
             except Exception as e:
                 print(f"[CaptionService] Caption generation failed, skipping: {e}")
         
-        if caption_srt_path and os.path.exists(caption_srt_path) and os.path.exists(temp_combined):
-            print(f"Pass 2: Adding captions from SRT file...")
+        motion_sizes = {
+            '9:16': (1080, 1920),
+            '1:1': (1080, 1080),
+            '4:5': (1080, 1350),
+            '16:9': (1920, 1080)
+        }
+        fx_filter = build_visual_fx_filter(visual_fx, width, height) if visual_fx else ''
+        subtitle_filter = None
+        if caption_srt_path and os.path.exists(caption_srt_path):
+            subtitle_filter = build_subtitle_filter(caption_srt_path, caption_style_settings)
+        
+        has_audio = audio_path and os.path.exists(audio_path)
+        single_pass_ok = False
+        scene_sources = []
+        if RENDER_SINGLE_PASS:
+            source_results = {}
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for source, idx in executor.map(download_scene_source, download_tasks):
+                    if source:
+                        source_results[idx] = source
+            scene_sources = [source_results[i] for i in sorted(source_results)]
             
-            style = caption_style_settings
-            font_size = style['fontsize']
-            hex_color = style['color'].lstrip('#')
-            if len(hex_color) == 6:
-                r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
-                bgr_color = f"&H{b:02X}{g:02X}{r:02X}&"
+            if scene_sources:
+                single_pass_ok = render_single_pass(
+                    scene_sources, output_path, width, height,
+                    motion_size=motion_sizes.get(video_format, (1080, 1920)),
+                    audio_path=audio_path if has_audio else None,
+                    audio_duration=audio_duration if has_audio else None,
+                    fx_filter=fx_filter,
+                    subtitle_filter=subtitle_filter
+                )
+            if single_pass_ok:
+                print(f"Single-pass render complete: {len(scene_sources)} scenes")
             else:
-                bgr_color = "&HFFFFFF&"
+                print("Single-pass render failed, falling back to multi-pass chain")
+        
+        if not single_pass_ok:
+            clip_results = {}
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = {executor.submit(download_and_trim_clip, task): task[0] for task in download_tasks}
+                for future in as_completed(futures):
+                    clip_path, idx, duration = future.result()
+                    if clip_path:
+                        clip_results[idx] = (clip_path, duration)
             
-            outline_width = 3 if style['outline'] else 0
-            shadow_depth = 2 if style['shadow'] else 0
+            sorted_indices = sorted(clip_results.keys())
+            clip_paths = [clip_results[i][0] for i in sorted_indices]
+            clip_durations = [clip_results[i][1] for i in sorted_indices]
+            print(f"Downloaded and trimmed {len(clip_paths)} clips in parallel")
             
-            escaped_srt = caption_srt_path.replace('\\', '/').replace(':', r'\:')
+            if not clip_paths:
+                return jsonify({'error': 'Failed to download any video clips'}), 500
             
-            margin_v = 100
+            list_path = os.path.abspath(f'output/clips_{output_id}.txt')
+            with open(list_path, 'w') as f:
+                for clip in clip_paths:
+                    f.write(f"file '{os.path.abspath(clip)}'\n")
             
-            subtitle_filter = (
-                f"subtitles={escaped_srt}:force_style='"
-                f"FontName=DejaVu Sans,FontSize={font_size},"
-                f"PrimaryColour={bgr_color},OutlineColour=&H000000&,"
-                f"BorderStyle=1,Outline={outline_width},Shadow={shadow_depth},"
-                f"Alignment=2,MarginV={margin_v}'"
-            )
+            print(f"Using {len(clip_durations)} clip durations from parallel processing")
             
-            pass2_cmd = [
-                'ffmpeg', '-y',
-                '-i', temp_combined,
-                '-vf', subtitle_filter,
+            concat_path = os.path.abspath(f'output/concat_{output_id}.mp4')
+            
+            if len(clip_paths) > 1:
+                transition_duration = 0.5
+                
+                inputs = []
+                for i, clip in enumerate(clip_paths):
+                    inputs.extend(['-i', os.path.abspath(clip)])
+                
+                filter_parts = []
+                
+                for i in range(len(clip_paths)):
+                    filter_parts.append(f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height},setsar=1,fps=30[s{i}]")
+                
+                transition_duration = min(transition_duration, min(clip_durations) * 0.8) if min(clip_durations) < 1 else transition_duration
+                
+                if len(clip_paths) == 2:
+                    offset = max(0.1, clip_durations[0] - transition_duration)
+                    filter_parts.append(f"[s0][s1]xfade=transition=fade:duration={transition_duration}:offset={offset:.2f}[v]")
+                else:
+                    cumulative_duration = 0
+                    for i in range(len(clip_paths) - 1):
+                        if i == 0:
+                            cumulative_duration = max(0.1, clip_durations[0] - transition_duration)
+                            filter_parts.append(f"[s0][s1]xfade=transition=fade:duration={transition_duration}:offset={cumulative_duration:.2f}[v1]")
+                        elif i == len(clip_paths) - 2:
+                            cumulative_duration += max(0.1, clip_durations[i] - transition_duration)
+                            filter_parts.append(f"[v{i}][s{i+1}]xfade=transition=fade:duration={transition_duration}:offset={cumulative_duration:.2f}[v]")
+                        else:
+                            cumulative_duration += max(0.1, clip_durations[i] - transition_duration)
+                            filter_parts.append(f"[v{i}][s{i+1}]xfade=transition=fade:duration={transition_duration}:offset={cumulative_duration:.2f}[v{i+1}]")
+                
+                xfade_filter = ";".join(filter_parts)
+                
+                concat_cmd = ['ffmpeg', '-y'] + inputs + [
+                    '-filter_complex', xfade_filter,
+                    '-map', '[v]',
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '28', '-threads', '0',
+                    concat_path
+                ]
+                result = subprocess.run(concat_cmd, capture_output=True, timeout=180)
+                
+                if result.returncode != 0:
+                    print(f"Xfade error: {result.stderr.decode()[:500]}")
+                    concat_cmd = [
+                        'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
+                        '-i', list_path,
+                        '-c', 'copy',
+                        concat_path
+                    ]
+                    result = subprocess.run(concat_cmd, capture_output=True, timeout=120)
+                    if result.returncode != 0:
+                        print(f"Concat fallback error: {result.stderr.decode()}")
+                    else:
+                        print("Used simple concat (xfade failed)")
+                else:
+                    print(f"Added fade transitions between {len(clip_paths)} clips")
+            else:
+                concat_cmd = [
+                    'ffmpeg', '-y', '-f', 'concat', '-safe', '0',
+                    '-i', list_path,
+                    '-c', 'copy',
+                    concat_path
+                ]
+                result = subprocess.run(concat_cmd, capture_output=True, timeout=120)
+                if result.returncode != 0:
+                    print(f"Concat error: {result.stderr.decode()}")
+            
+            temp_combined = os.path.abspath(f'output/temp_combined_{output_id}.mp4')
+            
+            pass1_cmd = ['ffmpeg', '-y']
+            
+            if has_audio and audio_duration:
+                pass1_cmd.extend(['-stream_loop', '-1', '-i', concat_path])
+                pass1_cmd.extend(['-i', audio_path])
+                pass1_cmd.extend(['-t', str(audio_duration)])
+            else:
+                pass1_cmd.extend(['-i', concat_path])
+                if has_audio:
+                    pass1_cmd.extend(['-i', audio_path])
+            
+            pass1_vf = f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}'
+            if fx_filter:
+                pass1_vf += ',' + fx_filter
+            pass1_cmd.extend([
+                '-vf', pass1_vf,
                 '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '26', '-threads', '0',
-                '-c:a', 'copy',
-                output_path
-            ]
+            ])
             
-            print(f"Caption filter: {subtitle_filter}")
-            pass2_result = subprocess.run(pass2_cmd, capture_output=True, timeout=300)
+            if has_audio:
+                pass1_cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+            else:
+                pass1_cmd.extend(['-an'])
+            
+            pass1_cmd.append(temp_combined)
             
-            if pass2_result.returncode != 0:
-                error_msg = pass2_result.stderr.decode()[:2000]
-                print(f"Pass 2 (captions) failed: {error_msg}")
-                shutil.copy(temp_combined, output_path)
-                print("Using video without captions as fallback")
+            print(f"Pass 1: Combining video + audio...")
+            pass1_result = subprocess.run(pass1_cmd, capture_output=True, timeout=180)
+            
+            if pass1_result.returncode != 0:
+                print(f"Pass 1 failed: {pass1_result.stderr.decode()[:500]}")
+                if os.path.exists(concat_path):
+                    shutil.copy(concat_path, temp_combined)
+            
+            if subtitle_filter and os.path.exists(temp_combined):
+                print(f"Pass 2: Adding captions from SRT file...")
+                
+                pass2_cmd = [
+                    'ffmpeg', '-y',
+                    '-i', temp_combined,
+                    '-vf', subtitle_filter,
+                    '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '26', '-threads', '0',
+                    '-c:a', 'copy',
+                    output_path
+                ]
+                
+                print(f"Caption filter: {subtitle_filter}")
+                pass2_result = subprocess.run(pass2_cmd, capture_output=True, timeout=300)
+                
+                if pass2_result.returncode != 0:
+                    error_msg = pass2_result.stderr.decode()[:2000]
+                    print(f"Pass 2 (captions) failed: {error_msg}")
+                    shutil.copy(temp_combined, output_path)
+                    print("Using video without captions as fallback")
+                else:
+                    print("Pass 2 succeeded - captions added via SRT")
             else:
-                print("Pass 2 succeeded - captions added via SRT")
+                if os.path.exists(temp_combined):
+                    shutil.copy(temp_combined, output_path)
+                elif os.path.exists(concat_path):
+                    shutil.copy(concat_path, output_path)
             
             try:
-                os.remove(caption_srt_path)
+                if os.path.exists(temp_combined):
+                    os.remove(temp_combined)
             except:
                 pass
-        else:
-            if os.path.exists(temp_combined):
-                shutil.copy(temp_combined, output_path)
-            elif os.path.exists(concat_path):
-                shutil.copy(concat_path, output_path)
-        
-        try:
-            if os.path.exists(temp_combined):
-                os.remove(temp_combined)
-        except:
-            pass
-        
-        for clip in clip_paths:
+            
+            for clip in clip_paths:
+                try:
+                    os.remove(clip)
+                except:
+                    pass
             try:
-                os.remove(clip)
+                os.remove(list_path)
+                os.remove(concat_path)
             except:
                 pass
-        try:
-            os.remove(list_path)
-            os.remove(concat_path)
-        except:
-            pass
+            
+        for source in scene_sources:
+            try:
+                os.remove(source.path)
+            except OSError:
+                pass
+        if caption_srt_path:
+            try:
+                os.remove(caption_srt_path)
+            except OSError:
+                pass
         
         try:
             mixed_audio_path = f'output/audio_with_sfx_{output_id}.mp3'
@@ -775,6 +819,7 @@ def render_video():
             pass
         
         if os.path.exists(output_path):
+            remember_rendered_output(output_path)
             response_data = {
                 'success': True,
                 'video_url': '/' + output_path,
@@ -999,7 +1044,7 @@ def render_with_visual_plan():
     """Render a video using a visual plan - unified pipeline with Source Merging Engine."""
     from visual_director import execute_visual_plan, get_merging_config
     from models import VisualPlan
-    import requests
+    from routes.utils import remember_rendered_output
     
     user_id = None
     if current_user.is_authenticated:
@@ -1069,9 +1114,7 @@ def render_with_visual_plan():
         
         audio_duration = 0
         if audio_path and os.path.exists(audio_path):
-            dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', audio_path]
-            dur_result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-            audio_duration = float(dur_result.stdout.strip()) if dur_result.stdout.strip() else 30
+            audio_duration = get_media_duration(audio_path, default=30)
         else:
             audio_duration = len(scenes_to_render) * 4
         
@@ -1085,11 +1128,8 @@ def render_with_visual_plan():
             
             if scene.get('image_url'):
                 try:
-                    resp = requests.get(scene['image_url'], timeout=30)
-                    if resp.status_code == 200:
-                        with open(scene_img_path, 'wb') as f:
-                            f.write(resp.content)
-                        temp_files.append(scene_img_path)
+                    MEDIA_MIRROR.fetch(scene['image_url'], scene_img_path)
+                    temp_files.append(scene_img_path)
                 except Exception as e:
                     print(f"Failed to download scene {i} image: {e}")
                     continue
@@ -1105,11 +1145,8 @@ def render_with_visual_plan():
                         n=1
                     )
                     img_url = response.data[0].url
-                    resp = requests.get(img_url, timeout=60)
-                    if resp.status_code == 200:
-                        with open(scene_img_path, 'wb') as f:
-                            f.write(resp.content)
-                        temp_files.append(scene_img_path)
+                    DOWNLOADS.download(img_url, scene_img_path)
+                    temp_files.append(scene_img_path)
                 except Exception as e:
                     print(f"Failed to generate DALL-E image for scene {i}: {e}")
                     continue
@@ -1253,6 +1290,7 @@ def render_with_visual_plan():
                     pass
         
         print(f"[render-with-plan] Created video with {len(scene_clips)} scenes: {output_path}")
+        remember_rendered_output(output_path)
         
         return jsonify({
             'success': True,
@@ -25,6 +25,9 @@ from video_renderer import (
     generate_video_description,
     CAPTION_TEMPLATES,
 )
+from media_probe import probe_media, get_media_duration
+from media_mirror import MEDIA_MIRROR
+from stock_cache import asset_id_for
 
 template_bp = Blueprint('template', __name__)
 
@@ -74,9 +77,7 @@ def analyze_video():
     try:
         client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
-        dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', file_path]
-        result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-        duration = float(result.stdout.strip()) if result.stdout.strip() else 0
+        duration = get_media_duration(file_path, default=0)
 
         frames_dir = os.path.join('uploads', 'video_frames')
         os.makedirs(frames_dir, exist_ok=True)
@@ -270,9 +271,7 @@ def extract_video_template():
         return jsonify({'error': 'Not a video file'}), 400
 
     try:
-        dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', file_path]
-        result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-        duration = float(result.stdout.strip()) if result.stdout.strip() else 0
+        duration = get_media_duration(file_path, default=0)
 
         frames_dir = os.path.join('uploads', 'template_frames')
         os.makedirs(frames_dir, exist_ok=True)
@@ -761,28 +760,12 @@ def extract_creative_dna():
     try:
         anthropic_client = Anthropic()
 
-        dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', file_path]
-        result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-        duration = float(result.stdout.strip()) if result.stdout.strip() else 30
-
-        fps_cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=r_frame_rate', '-of', 'csv=p=0', file_path]
-        fps_result = subprocess.run(fps_cmd, capture_output=True, text=True, timeout=30)
-        fps_str = fps_result.stdout.strip() if fps_result.stdout.strip() else '30/1'
-        try:
-            if '/' in fps_str:
-                num, den = fps_str.split('/')
-                fps = float(num) / float(den)
-            else:
-                fps = float(fps_str)
-        except:
-            fps = 30.0
-
-        res_cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=width,height', '-of', 'csv=p=0', file_path]
-        res_result = subprocess.run(res_cmd, capture_output=True, text=True, timeout=30)
-        try:
-            w, h = res_result.stdout.strip().split(',')
-            source_width, source_height = int(w), int(h)
-        except:
+        info = probe_media(file_path)
+        duration = info.duration if info and info.duration else 30
+        fps = (info.fps if info else None) or 30.0
+        if info and info.width and info.height:
+            source_width, source_height = info.width, info.height
+        else:
             source_width, source_height = 1080, 1920
 
         frames_dir = os.path.join('uploads', 'dna_frames')
@@ -1161,9 +1144,8 @@ No text, no faces, no solid backgrounds."""
                             if hd_files:
                                 stock_url = hd_files[0].get('link')
                                 stock_path = f'uploads/remix_overlays/stock_{output_id}_{scene_idx}.mp4'
-                                stock_response = requests.get(stock_url, timeout=30)
-                                with open(stock_path, 'wb') as f:
-                                    f.write(stock_response.content)
+                                MEDIA_MIRROR.fetch(stock_url, stock_path,
+                                                   asset_id=asset_id_for("pexels_videos", videos[0]))
 
                                 overlay_info['overlay_path'] = stock_path
                                 overlay_info['overlay_type'] = 'stock_video'
@@ -1257,9 +1239,7 @@ No text, no faces, no solid backgrounds."""
                 script_text = str(script_text) if script_text else ''
 
             if voiceover_path and os.path.exists(voiceover_path):
-                dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', voiceover_path]
-                dur_result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-                audio_duration = float(dur_result.stdout.strip()) if dur_result.stdout.strip() else source_duration
+                audio_duration = get_media_duration(voiceover_path, default=source_duration)
             else:
                 audio_duration = source_duration
 
@@ -1339,9 +1319,7 @@ No text, no faces, no solid backgrounds."""
                 except:
                     pass
 
-        dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', final_output]
-        dur_result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-        final_duration = float(dur_result.stdout.strip()) if dur_result.stdout.strip() else source_duration
+        final_duration = get_media_duration(final_output, default=source_duration)
 
         logging.info(f"AI Remix complete: {final_duration:.1f}s video created")
 
@@ -1389,9 +1367,7 @@ def ai_quality_review():
         frames_dir = os.path.join('uploads', 'review_frames')
         os.makedirs(frames_dir, exist_ok=True)
 
-        dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', actual_path]
-        result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-        duration = float(result.stdout.strip()) if result.stdout.strip() else 30
+        duration = get_media_duration(actual_path, default=30)
 
         frame_paths = []
         for i, timestamp in enumerate([2, duration/2, max(duration-2, 3)]):
@@ -1658,13 +1634,9 @@ def render_personalized_video():
         }
         width, height = format_dims.get(video_format, (1080, 1920))
 
-        dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', template_path]
-        dur_result = subprocess.run(dur_cmd, capture_output=True, text=True, timeout=30)
-        video_duration = float(dur_result.stdout.strip()) if dur_result.stdout.strip() else 30
+        video_duration = get_media_duration(template_path, default=30)
 
-        audio_dur_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', audio_path]
-        audio_result = subprocess.run(audio_dur_cmd, capture_output=True, text=True, timeout=30)
-        audio_duration = float(audio_result.stdout.strip()) if audio_result.stdout.strip() else 30
+        audio_duration = get_media_duration(audio_path, default=30)
 
         target_duration = max(audio_duration, video_duration)
 
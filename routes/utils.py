@@ -2,91 +2,47 @@
 Shared utilities for route blueprints.
 """
 import os
+import math
 import logging
 import requests
 from functools import wraps
 
-_rate_limit_table_created = False
-
-
-def _ensure_rate_limit_table():
-    """Create rate_limits table at startup (called once)."""
-    global _rate_limit_table_created
-    if _rate_limit_table_created:
-        return
-    import psycopg2
-    db_url = os.environ.get("DATABASE_URL")
-    if not db_url:
-        return
-    try:
-        conn = psycopg2.connect(db_url)
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS rate_limits (
-                    id SERIAL PRIMARY KEY,
-                    client_key VARCHAR(255) NOT NULL,
-                    request_time TIMESTAMP NOT NULL DEFAULT NOW()
-                )
-            """)
-            cur.execute("""
-                CREATE INDEX IF NOT EXISTS idx_rate_limits_key_time
-                ON rate_limits (client_key, request_time)
-            """)
-        conn.commit()
-        conn.close()
-        _rate_limit_table_created = True
-    except Exception as e:
-        logging.warning(f"Rate limit table creation failed: {e}")
-
 
 def rate_limit(limit=30, window=60):
-    """Database-backed rate limiting decorator. Default: 30 requests per 60 seconds."""
+    """Rate limiting decorator (backend per RATE_LIMIT_BACKEND). Default: 30 requests per 60 seconds."""
     def decorator(f):
         @wraps(f)
         def wrapped(*args, **kwargs):
-            import psycopg2
             from flask import request, jsonify
             from flask_login import current_user
-            from datetime import datetime, timedelta
+            from rate_limiter import RATE_LIMITER
+            from job_queue import PoolTimeout
 
             if current_user.is_authenticated:
                 key = f"user:{current_user.id}"
             else:
                 key = f"ip:{request.remote_addr}"
 
-            db_url = os.environ.get("DATABASE_URL")
-            if not db_url:
-                return f(*args, **kwargs)
-
-            _ensure_rate_limit_table()
-            cutoff = datetime.utcnow() - timedelta(seconds=window)
-
             try:
-                conn = psycopg2.connect(db_url)
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "DELETE FROM rate_limits WHERE request_time < %s",
-                        (cutoff,)
-                    )
-                    cur.execute(
-                        "SELECT COUNT(*) FROM rate_limits WHERE client_key = %s AND request_time > %s",
-                        (key, cutoff)
-                    )
-                    count = cur.fetchone()[0]
-
-                    if count >= limit:
-                        conn.commit()
-                        conn.close()
-                        return jsonify({'error': 'Rate limit exceeded. Please slow down.'}), 429
-
-                    cur.execute(
-                        "INSERT INTO rate_limits (client_key, request_time) VALUES (%s, NOW())",
-                        (key,)
-                    )
-                    conn.commit()
-                conn.close()
+                retry_after = RATE_LIMITER.hit(key, limit, window)
+            except PoolTimeout as e:
+                # Saturated limiter: letting the request through would defeat it
+                logging.warning(f"Rate limit check timed out: {e}")
+                return (
+                    jsonify({'error': 'Server is busy. Please try again shortly.'}),
+                    503,
+                    {'Retry-After': '1'}
+                )
             except Exception as e:
                 logging.warning(f"Rate limit check failed: {e}")
+                retry_after = 0.0
+
+            if retry_after > 0:
+                return (
+                    jsonify({'error': 'Rate limit exceeded. Please slow down.'}),
+                    429,
+                    {'Retry-After': str(max(1, math.ceil(retry_after)))}
+                )
 
             return f(*args, **kwargs)
         return wrapped
@@ -196,3 +152,30 @@ def get_user_id():
     if session.get('dev_mode'):
         return 'dev_user'
     return None
+
+
+RENDERED_OUTPUTS_KEPT = 20
+
+
+def remember_rendered_output(path):
+    """Record a file rendered in this session, so it can later be hosted (see routes/feed.host_video)."""
+    from flask import session
+    rel = path.lstrip('/')
+    outputs = [p for p in session.get('rendered_outputs', []) if p != rel]
+    session['rendered_outputs'] = (outputs + [rel])[-RENDERED_OUTPUTS_KEPT:]
+
+
+def user_owns_media(user_id, rel_path):
+    """True if rel_path ("output/x.mp4") was rendered in this session or is recorded for user_id."""
+    from flask import session
+    from models import Project, VideoHistory
+    if rel_path in session.get('rendered_outputs', []):
+        return True
+    if not user_id:
+        return False
+    if Project.query.filter(Project.user_id == user_id, Project.video_path.endswith(rel_path)).first():
+        return True
+    if VideoHistory.query.filter(VideoHistory.user_id == user_id, VideoHistory.video_path.endswith(rel_path)).first():
+        return True
+    from render_jobs import RENDER_JOBS
+    return any((job.video_url or '').endswith(rel_path) for job in RENDER_JOBS.list_by_user(user_id, limit=50))
@@ -5,7 +5,6 @@ import os
 import re
 import requests
 from flask import Blueprint, request, jsonify
-from sqlalchemy import or_
 from extensions import db
 from models import MediaAsset, KeywordAssetCache
 from visual_search import (
@@ -13,6 +12,10 @@ from visual_search import (
     ALLOWED_LICENSES, WIKIMEDIA_ALLOWED_LICENSES
 )
 from context_engine import call_ai
+from stock_search import fan_out
+from asset_index import search_assets as search_asset_index
+
+MAX_ASSET_PAGE_SIZE = 100
 
 visual_bp = Blueprint('visual', __name__)
 
@@ -275,11 +278,14 @@ def search_all_sources():
     all_results = []
     sources_searched = []
     
-    try:
-        wiki_headers = {'User-Agent': 'KrakdPostAssembler/1.0 (https://replit.com; contact@krakd.app)'}
-        search_url = 'https://commons.wikimedia.org/w/api.php'
-        
-        search_params = {
+    def wikimedia_pages(params, headers, timeout):
+        response = requests.get('https://commons.wikimedia.org/w/api.php', params=params, headers=headers, timeout=timeout)
+        return response.json().get('query', {}).get('pages', {})
+    
+    # The primary query and the simplified fallback query run concurrently;
+    # the fallback results are only used if the primary one comes up short
+    searches = {
+        'primary': lambda: wikimedia_pages({
             'action': 'query',
             'format': 'json',
             'generator': 'search',
@@ -289,10 +295,22 @@ def search_all_sources():
             'prop': 'imageinfo',
             'iiprop': 'url|extmetadata|size|mime|mediatype',
             'iiurlwidth': 640
-        }
-        
-        response = requests.get(search_url, params=search_params, headers=wiki_headers, timeout=15)
-        pages = response.json().get('query', {}).get('pages', {})
+        }, {'User-Agent': 'KrakdPostAssembler/1.0 (https://replit.com; contact@krakd.app)'}, 15)
+    }
+    if ' ' in query:
+        words = query.split()
+        simple_query = words[-1] if len(words) > 1 else query
+        searches['expanded'] = lambda: wikimedia_pages({
+            'action': 'query', 'format': 'json', 'generator': 'search',
+            'gsrnamespace': 6, 'gsrsearch': simple_query, 'gsrlimit': 5,
+            'prop': 'imageinfo', 'iiprop': 'url|extmetadata|mime', 'iiurlwidth': 640
+        }, {'User-Agent': 'KrakdPostAssembler/1.0'}, 10)
+    pages_by_search = fan_out(searches, deadline=15)
+    
+    try:
+        if 'primary' not in pages_by_search:
+            raise RuntimeError("primary query failed or timed out")
+        pages = pages_by_search['primary']
         
         for page_id, page in pages.items():
             if page_id == '-1':
@@ -343,19 +361,9 @@ def search_all_sources():
     except Exception as e:
         print(f"Wikimedia search error: {e}")
     
-    if len(all_results) < 4 and ' ' in query:
-        words = query.split()
-        simple_query = words[-1] if len(words) > 1 else query
-        
+    if len(all_results) < 4 and 'expanded' in pages_by_search:
         try:
-            wiki_headers = {'User-Agent': 'KrakdPostAssembler/1.0'}
-            response = requests.get('https://commons.wikimedia.org/w/api.php', params={
-                'action': 'query', 'format': 'json', 'generator': 'search',
-                'gsrnamespace': 6, 'gsrsearch': simple_query, 'gsrlimit': 5,
-                'prop': 'imageinfo', 'iiprop': 'url|extmetadata|mime', 'iiurlwidth': 640
-            }, headers=wiki_headers, timeout=10)
-            
-            pages = response.json().get('query', {}).get('pages', {})
+            pages = pages_by_search['expanded']
             for page_id, page in pages.items():
                 if page_id == '-1':
                     continue
@@ -436,44 +444,66 @@ def save_asset():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _flag(value):
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def _asset_filters(params):
+    """search_asset_index keyword arguments from request JSON or query args."""
+    limit = max(1, min(int(params.get('limit') or 20), MAX_ASSET_PAGE_SIZE))
+    offset = int(params.get('offset') or 0)
+    if params.get('page'):
+        offset = (max(1, int(params.get('page'))) - 1) * limit
+    return {
+        'content_type': params.get('content_type') or None,
+        'min_duration': float(params['min_duration']) if params.get('min_duration') else None,
+        'orientation': params.get('orientation') or None,
+        'commercial_only': _flag(params.get('commercial_only')),
+        'derivatives_only': _flag(params.get('derivatives_only')),
+        'no_attribution': _flag(params.get('no_attribution')),
+        'limit': limit,
+        'offset': max(0, offset),
+    }
+
+
 @visual_bp.route('/search-assets', methods=['POST'])
 def search_assets():
-    """Search the asset library by tags or description."""
-    data = request.get_json()
+    """Search the asset library by tags, with content type, duration, orientation and license filters."""
+    data = request.get_json() or {}
     tags = data.get('tags', [])
-    content_type = data.get('content_type')
-    limit = data.get('limit', 10)
-    
-    query = MediaAsset.query.filter(MediaAsset.status == 'safe')
-    
-    if content_type:
-        query = query.filter(MediaAsset.content_type == content_type)
+    try:
+        filters = _asset_filters({'limit': 10, **data})
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid limit, offset, page or min_duration'}), 400
     
-    assets = query.limit(100).all()
+    assets, has_more = search_asset_index(tags=tags, **filters)
     
     results = []
     for asset in assets:
-        asset_tags = asset.tags or []
-        if not tags or any(tag.lower() in [t.lower() for t in asset_tags] for tag in tags):
-            results.append({
-                'id': asset.id,
-                'source': asset.source,
-                'source_page': asset.source_page,
-                'download_url': asset.download_url,
-                'thumbnail': asset.download_url,
-                'content_type': asset.content_type,
-                'duration': asset.duration_sec,
-                'resolution': asset.resolution,
-                'description': asset.description,
-                'tags': asset.tags,
-                'license': asset.license,
-                'attribution_required': asset.attribution_required,
-                'attribution_text': asset.attribution_text
-            })
-            if len(results) >= limit:
-                break
+        results.append({
+            'id': asset.id,
+            'source': asset.source,
+            'source_page': asset.source_page,
+            'download_url': asset.download_url,
+            'thumbnail': asset.download_url,
+            'content_type': asset.content_type,
+            'duration': asset.duration_sec,
+            'resolution': asset.resolution,
+            'description': asset.description,
+            'tags': asset.tags,
+            'license': asset.license,
+            'attribution_required': asset.attribution_required,
+            'attribution_text': asset.attribution_text
+        })
     
-    return jsonify({'success': True, 'assets': results})
+    return jsonify({
+        'success': True,
+        'assets': results,
+        'has_more': has_more,
+        'next_offset': filters['offset'] + len(results) if has_more else None
+    })
 
 
 @visual_bp.route('/curate-visuals', methods=['POST'])
@@ -582,28 +612,23 @@ CRITICAL:
             mood = section.get('mood', '')
             
             cached_assets = []
-            for keyword in cache_keywords[:3]:
-                cache_entries = KeywordAssetCache.query.filter(
-                    KeywordAssetCache.keyword.ilike(f'%{keyword}%')
-                ).order_by(KeywordAssetCache.use_count.desc()).limit(2).all()
-                
-                for entry in cache_entries:
-                    asset = MediaAsset.query.get(entry.asset_id)
-                    if asset and asset.status == 'safe':
-                        use_count = asset.use_count or 0
-                        cached_assets.append({
-                            'id': asset.id,
-                            'source': asset.source,
-                            'thumbnail': asset.thumbnail_url,
-                            'download_url': asset.download_url,
-                            'duration': asset.duration_sec,
-                            'license': asset.license,
-                            'license_url': asset.license_url,
-                            'attribution': asset.attribution_text,
-                            'from_cache': True,
-                            'use_count': use_count,
-                            'is_popular': use_count >= 3
-                        })
+            if cache_keywords:
+                library_assets, _ = search_asset_index(tags=cache_keywords[:3], limit=6)
+                for asset in library_assets:
+                    use_count = asset.use_count or 0
+                    cached_assets.append({
+                        'id': asset.id,
+                        'source': asset.source,
+                        'thumbnail': asset.thumbnail_url,
+                        'download_url': asset.download_url,
+                        'duration': asset.duration_sec,
+                        'license': asset.license,
+                        'license_url': asset.license_url,
+                        'attribution': asset.attribution_text,
+                        'from_cache': True,
+                        'use_count': use_count,
+                        'is_popular': use_count >= 3
+                    })
             
             seen_ids = set()
             for asset in cached_assets:
@@ -777,6 +802,10 @@ def save_to_cache():
             db.session.commit()
         else:
             existing.use_count = (existing.use_count or 0) + 1
+            existing_tags = list(existing.tags or [])
+            new_tags = [k for k in keywords if k and k.strip() and k not in existing_tags]
+            if new_tags:
+                existing.tags = existing_tags + new_tags
             db.session.commit()
         
         for keyword in keywords:
@@ -897,26 +926,20 @@ def ingest_assets():
 
 @visual_bp.route('/assets', methods=['GET'])
 def query_assets():
-    """Query cached assets by tags and content type."""
+    """Query cached assets by tags, content type, duration, orientation and license flags."""
     tags = request.args.get('tags', '').split(',') if request.args.get('tags') else []
-    content_type = request.args.get('content_type', 'video')
-    limit = int(request.args.get('limit', 20))
-    
-    query = MediaAsset.query.filter(
-        MediaAsset.status == 'safe',
-        MediaAsset.content_type == content_type
-    )
-    
-    if tags:
-        tag_filters = [MediaAsset.tags.contains([tag]) for tag in tags if tag]
-        if tag_filters:
-            query = query.filter(or_(*tag_filters))
+    try:
+        filters = _asset_filters({'content_type': 'video', **request.args.to_dict()})
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Invalid limit, offset, page or min_duration'}), 400
     
-    assets = query.limit(limit).all()
+    assets, has_more = search_asset_index(tags=tags, **filters)
     
     return jsonify({
         'success': True,
         'count': len(assets),
+        'has_more': has_more,
+        'next_offset': filters['offset'] + len(assets) if has_more else None,
         'assets': [{
             'id': a.id,
             'source': a.source,
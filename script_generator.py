@@ -1,6 +1,7 @@
 import os
 import json
 from ai_client import call_ai, SYSTEM_GUARDRAILS
+from llm_cache import cached_call_ai
 from trend_research import research_topic_trends
 from stock_search import extract_keywords_from_script, search_stock_videos
 
@@ -708,7 +709,7 @@ Output JSON array:
 
 Only include TRUE anchors. A 60-second script might have 3-5 anchors, not 15."""
 
-    result = call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=2048)
+    result = cached_call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=2048, site="identify_anchors")
     if isinstance(result, dict):
         anchors = result.get('anchors', [])
         return anchors if isinstance(anchors, list) else []
@@ -751,7 +752,7 @@ Output JSON array:
 
 Be CONSERVATIVE. Don't over-clip. If the flow is good, keep it continuous."""
 
-    result = call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=2048)
+    result = cached_call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=2048, site="detect_thought_changes")
     if isinstance(result, dict):
         return result.get('thought_changes', result)
     return result if result else []
@@ -790,7 +791,7 @@ Output JSON:
     "composition_hints": ["specific visual ideas for this content"]
 }}"""
 
-    result = call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=1024)
+    result = cached_call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=1024, site="classify_content_type")
     if not result:
         return {"content_type": "informative", "confidence": 0.5}
     
@@ -2,6 +2,8 @@ import os
 import logging
 import assemblyai as aai
 
+from transcript_cache import TRANSCRIPT_CACHE
+
 logger = logging.getLogger(__name__)
 
 
@@ -83,11 +85,37 @@ def _get_assemblyai_client():
     return aai.Transcriber()
 
 
+ASSEMBLYAI_OPTIONS = {'speech_model': 'best', 'punctuate': True, 'format_text': True}
+WHISPER_OPTIONS = {'model': 'whisper-1', 'timestamp_granularities': ['word']}
+
+
 def transcribe_audio(audio_path):
+    if not os.environ.get('ASSEMBLYAI_API_KEY'):
+        logger.warning("AssemblyAI API key not set, falling back to Whisper")
+        return transcribe_with_whisper(audio_path)
+    result = TRANSCRIPT_CACHE.get_or_transcribe(
+        audio_path, 'assemblyai', ASSEMBLYAI_OPTIONS,
+        lambda: _assemblyai_transcribe(audio_path)
+    )
+    if result is None:
+        # Fallback runs outside the AssemblyAI entry so Whisper output is only cached under 'whisper'
+        logger.warning("AssemblyAI transcription unavailable, falling back to Whisper")
+        return transcribe_with_whisper(audio_path)
+    return result
+
+
+def transcribe_with_whisper(audio_path):
+    return TRANSCRIPT_CACHE.get_or_transcribe(
+        audio_path, 'whisper', WHISPER_OPTIONS,
+        lambda: _whisper_fallback(audio_path)
+    )
+
+
+def _assemblyai_transcribe(audio_path):
+    """AssemblyAI transcript, or None on any failure (never cached; transcribe_audio falls back)."""
     transcriber = _get_assemblyai_client()
     if not transcriber:
-        logger.warning("AssemblyAI API key not set, falling back to Whisper")
-        return _whisper_fallback(audio_path)
+        return None
 
     try:
         config = aai.TranscriptionConfig(
@@ -100,7 +128,7 @@ def transcribe_audio(audio_path):
 
         if transcript.status == aai.TranscriptStatus.error:
             logger.error(f"AssemblyAI transcription failed: {transcript.error}")
-            return _whisper_fallback(audio_path)
+            return None
 
         words = []
         if transcript.words:
@@ -125,7 +153,7 @@ def transcribe_audio(audio_path):
 
     except Exception as e:
         logger.error(f"AssemblyAI error: {e}")
-        return _whisper_fallback(audio_path)
+        return None
 
 
 def _whisper_fallback(audio_path):
@@ -0,0 +1,317 @@
+"""
+HLS Packaging for hosted videos
+
+When a video is hosted (/host-video) it is packaged in the background into
+an HLS ladder, so share-link viewers stream a rendition that fits their
+screen and connection instead of downloading the full 1080x1920 MP4:
+
+- Renditions from HLS_LADDER (short side / video kbps), skipping rungs
+  larger than the source; one ffmpeg pass splits and scales the decoded
+  video once for every rendition
+- HLS_SEGMENT_SECONDS segments with a keyframe forced at every segment
+  boundary, VOD playlists per rendition plus master.m3u8
+- A poster frame (poster.jpg), stored as HostedVideo.thumbnail_path
+- Output in HLS_OUTPUT_DIR/<public_id>/, served by /hls/<public_id>/...
+
+HostedVideo.hls_status goes processing -> ready | failed; the /v/ page
+streams from HostedVideo.hls_master_path once it is ready and plays the
+progressive MP4 until then. A process claims a video with a conditional
+UPDATE (hls_started_at, hls_attempts), and HLS_RECOVERY in the worker
+re-queues videos left processing by a restart, retries failures up to
+HLS_MAX_ATTEMPTS and backfills videos hosted before packaging existed.
+"""
+import os
+import shutil
+import subprocess
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+
+from urllib.parse import urlparse
+
+from sqlalchemy import func
+from werkzeug.security import safe_join
+
+from media_probe import probe_media
+
+
+HLS_OUTPUT_DIR = os.environ.get("HLS_OUTPUT_DIR", os.path.join("output", "hls"))
+HLS_SEGMENT_SECONDS = int(os.environ.get("HLS_SEGMENT_SECONDS", "4"))
+HLS_WORKERS = int(os.environ.get("HLS_WORKERS", "1"))
+HLS_TIMEOUT = int(os.environ.get("HLS_TIMEOUT", "900"))
+HLS_MAX_ATTEMPTS = int(os.environ.get("HLS_MAX_ATTEMPTS", "3"))
+HLS_RECOVERY_INTERVAL = float(os.environ.get("HLS_RECOVERY_INTERVAL", "600"))
+HLS_STALE_GRACE = 300
+
+# URL prefix -> folder for files a hosted video may be packaged from (app.py OUTPUT_FOLDER/UPLOAD_FOLDER)
+HOSTABLE_FOLDERS = {"output": "output", "uploads": "uploads"}
+
+# (name, short side in px, video kbps); audio is AAC at AUDIO_KBPS in every rendition
+HLS_LADDER = [
+    ("1080p", 1080, 5000),
+    ("720p", 720, 2800),
+    ("480p", 480, 1400),
+    ("360p", 360, 800),
+]
+AUDIO_KBPS = 128
+
+_executor = ThreadPoolExecutor(max_workers=HLS_WORKERS, thread_name_prefix="hls")
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _even(value: float) -> int:
+    return max(2, int(round(value / 2.0)) * 2)
+
+
+def plan_renditions(width: int, height: int) -> List[Dict[str, Any]]:
+    """Ladder rungs that fit the source, as output sizes keeping its aspect ratio."""
+    short_side = min(width, height)
+    rungs = [r for r in HLS_LADDER if r[1] <= short_side] or [HLS_LADDER[-1]]
+    renditions = []
+    for name, target_short, kbps in rungs:
+        scale = min(1.0, target_short / float(short_side))
+        renditions.append({
+            "name": name,
+            "width": _even(width * scale),
+            "height": _even(height * scale),
+            "video_kbps": kbps,
+        })
+    return renditions
+
+
+def build_hls_command(source_path: str, output_dir: str, renditions: List[Dict[str, Any]],
+                      has_audio: bool) -> List[str]:
+    count = len(renditions)
+    split_outputs = "".join(f"[v{i}]" for i in range(count))
+    filters = [f"[0:v]split={count}{split_outputs}"]
+    for i, r in enumerate(renditions):
+        filters.append(f"[v{i}]scale={r['width']}:{r['height']}[v{i}out]")
+
+    cmd = ["ffmpeg", "-y", "-i", source_path, "-filter_complex", ";".join(filters)]
+    stream_map = []
+    for i, r in enumerate(renditions):
+        cmd += [
+            "-map", f"[v{i}out]",
+            f"-c:v:{i}", "libx264",
+            f"-b:v:{i}", f"{r['video_kbps']}k",
+            f"-maxrate:v:{i}", f"{int(r['video_kbps'] * 1.1)}k",
+            f"-bufsize:v:{i}", f"{r['video_kbps'] * 2}k",
+        ]
+        if has_audio:
+            cmd += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", f"{AUDIO_KBPS}k"]
+            stream_map.append(f"v:{i},a:{i},name:{r['name']}")
+        else:
+            stream_map.append(f"v:{i},name:{r['name']}")
+
+    cmd += [
+        "-preset", "veryfast",
+        "-pix_fmt", "yuv420p",
+        "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+        "-sc_threshold", "0",
+        "-f", "hls",
+        "-hls_time", str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_flags", "independent_segments",
+        "-hls_segment_filename", os.path.join(output_dir, "%v", "seg_%04d.ts"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(stream_map),
+        os.path.join(output_dir, "%v", "index.m3u8"),
+    ]
+    return cmd
+
+
+def extract_poster(source_path: str, poster_path: str, duration: Optional[float]) -> bool:
+    offset = min(1.0, (duration or 0) / 2.0)
+    cmd = ["ffmpeg", "-y", "-ss", f"{offset:.2f}", "-i", source_path, "-frames:v", "1", "-q:v", "3", poster_path]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+    return result.returncode == 0 and os.path.exists(poster_path)
+
+
+def package_hls(source_path: str, output_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Package source_path into an HLS ladder in output_dir.
+
+    Returns {"master": path, "poster": path or None, "renditions": [...]},
+    or None if packaging failed.
+    """
+    info = probe_media(source_path)
+    if not info or not info.has_video or not info.width or not info.height:
+        print(f"[HLS] Cannot package {source_path}: no video stream")
+        return None
+
+    renditions = plan_renditions(info.width, info.height)
+    tmp_dir = f"{output_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    for r in renditions:
+        os.makedirs(os.path.join(tmp_dir, r["name"]), exist_ok=True)
+
+    cmd = build_hls_command(source_path, tmp_dir, renditions, info.has_audio)
+    print(f"[HLS] Packaging {source_path} -> {len(renditions)} renditions ({', '.join(r['name'] for r in renditions)})")
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=HLS_TIMEOUT)
+    if result.returncode != 0 or not os.path.exists(os.path.join(tmp_dir, "master.m3u8")):
+        print(f"[HLS] ffmpeg failed: {result.stderr[-500:]}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return None
+
+    poster_path = os.path.join(tmp_dir, "poster.jpg")
+    has_poster = extract_poster(source_path, poster_path, info.duration)
+
+    # Publish atomically so players never see a half-written ladder
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    return {
+        "master": os.path.join(output_dir, "master.m3u8"),
+        "poster": os.path.join(output_dir, "poster.jpg") if has_poster else None,
+        "renditions": renditions,
+    }
+
+
+def resolve_hosted_source(video_path: str) -> Optional[str]:
+    """
+    Local file for a HostedVideo.video_path, or None.
+
+    Only files served from /output/<name> or /uploads/<name> qualify
+    ("/output/x.mp4", "output/x.mp4" or a full URL to one of them); URLs are
+    never fetched and nothing outside those folders is ever packaged.
+    """
+    if not video_path:
+        return None
+    path = urlparse(video_path).path if video_path.startswith(("http://", "https://")) else video_path
+    parts = path.strip("/").split("/")
+    if len(parts) != 2 or parts[0] not in HOSTABLE_FOLDERS:
+        return None
+    local = safe_join(HOSTABLE_FOLDERS[parts[0]], parts[1])
+    return local if local and os.path.isfile(local) else None
+
+
+def _claimable():
+    """Filter for hosted videos that need (re)packaging: never started, stale or retryable."""
+    from sqlalchemy import or_, and_
+    from models import HostedVideo
+
+    stale_before = datetime.now() - timedelta(seconds=HLS_TIMEOUT + HLS_STALE_GRACE)
+    return or_(
+        HostedVideo.hls_status.is_(None),
+        and_(HostedVideo.hls_status == "processing", or_(
+            HostedVideo.hls_started_at.is_(None), HostedVideo.hls_started_at < stale_before)),
+        and_(HostedVideo.hls_status == "failed",
+             func.coalesce(HostedVideo.hls_attempts, 0) < HLS_MAX_ATTEMPTS),
+    )
+
+
+def _claim(hosted_id: int) -> bool:
+    """Mark a hosted video processing unless another process already holds it."""
+    from extensions import db
+    from models import HostedVideo
+
+    claimed = HostedVideo.query.filter(HostedVideo.id == hosted_id, _claimable()).update({
+        "hls_status": "processing",
+        "hls_started_at": datetime.now(),
+        "hls_attempts": func.coalesce(HostedVideo.hls_attempts, 0) + 1,
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def package_hosted_video(hosted_id: int):
+    """Background task: build the HLS ladder for one HostedVideo and record the result."""
+    from app import app
+    from extensions import db
+    from models import HostedVideo
+
+    try:
+        with app.app_context():
+            if not _claim(hosted_id):
+                return
+            hosted = HostedVideo.query.get(hosted_id)
+            public_id = hosted.public_id
+            video_path = hosted.video_path
+
+        result = None
+        try:
+            source = resolve_hosted_source(video_path)
+            if source:
+                result = package_hls(source, os.path.join(HLS_OUTPUT_DIR, public_id))
+            else:
+                print(f"[HLS] Source not found for hosted video {public_id}: {video_path}")
+        except Exception as e:
+            print(f"[HLS] Packaging error for {public_id}: {e}")
+            traceback.print_exc()
+
+        with app.app_context():
+            hosted = HostedVideo.query.get(hosted_id)
+            if not hosted:
+                return
+            if result:
+                hosted.hls_status = "ready"
+                hosted.hls_master_path = f"/hls/{public_id}/master.m3u8"
+                if result["poster"]:
+                    hosted.thumbnail_path = f"/hls/{public_id}/poster.jpg"
+                print(f"[HLS] Hosted video {public_id} ready")
+            else:
+                hosted.hls_status = "failed"
+            db.session.commit()
+    finally:
+        with _pending_lock:
+            _pending.discard(hosted_id)
+
+
+def submit_hosted_video(hosted_id: int) -> bool:
+    """Queue HLS packaging for a hosted video (no-op if it is already queued)."""
+    with _pending_lock:
+        if hosted_id in _pending:
+            return False
+        _pending.add(hosted_id)
+    _executor.submit(package_hosted_video, hosted_id)
+    return True
+
+
+def recover_hosted_videos(limit: int = 50) -> int:
+    """
+    Queue hosted videos whose packaging never ran, was interrupted by a
+    restart (processing for longer than HLS_TIMEOUT) or failed fewer than
+    HLS_MAX_ATTEMPTS times. Also backfills videos hosted before HLS existed.
+    """
+    from app import app
+    from models import HostedVideo
+
+    with app.app_context():
+        ids = [row.id for row in HostedVideo.query.with_entities(HostedVideo.id).filter(
+            _claimable()).order_by(HostedVideo.created_at.desc()).limit(limit).all()]
+    queued = sum(1 for hosted_id in ids if submit_hosted_video(hosted_id))
+    if queued:
+        print(f"[HLS] Recovery queued {queued} hosted videos")
+    return queued
+
+
+class HlsRecovery:
+    """Background thread that periodically runs recover_hosted_videos (started by worker.py)."""
+
+    def __init__(self, interval: float = HLS_RECOVERY_INTERVAL):
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="hls-recovery", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                recover_hosted_videos()
+            except Exception as e:
+                print(f"[HLS] Recovery sweep failed: {e}")
+            self._stop.wait(self.interval)
+
+
+HLS_RECOVERY = HlsRecovery()
@@ -4,28 +4,47 @@ import tempfile
 import threading
 import traceback
 import time
+import uuid
 import base64
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional
 
+from download_manager import DOWNLOADS, DownloadError
+from media_mirror import MEDIA_MIRROR
+
 
 PREVIEW_DIR = os.path.join(tempfile.gettempdir(), "framd_previews")
 os.makedirs(PREVIEW_DIR, exist_ok=True)
 
+# All-scenes renders run every scene concurrently. Threads mostly wait, so
+# the real limits are these process-wide slots: one for network-bound work
+# (Runway/DALL-E submits, stock search, downloads) and one for ffmpeg.
+PREVIEW_SCENE_WORKERS = int(os.environ.get("PREVIEW_SCENE_WORKERS", "8"))
+PREVIEW_NETWORK_CONCURRENCY = int(os.environ.get("PREVIEW_NETWORK_CONCURRENCY", "4"))
+PREVIEW_CPU_CONCURRENCY = int(os.environ.get("PREVIEW_CPU_CONCURRENCY", str(max(1, (os.cpu_count() or 2) // 2))))
+
+NETWORK_SLOTS = threading.BoundedSemaphore(PREVIEW_NETWORK_CONCURRENCY)
+CPU_SLOTS = threading.BoundedSemaphore(PREVIEW_CPU_CONCURRENCY)
+
 
 def _get_clip_duration(clip_path: str) -> float:
-    try:
-        result = subprocess.run(
-            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-             "-of", "default=noprint_wrappers=1:nokey=1", clip_path],
-            capture_output=True, text=True, timeout=10
-        )
-        return float(result.stdout.strip())
-    except Exception:
-        return 5.0
+    from media_probe import get_media_duration
+
+    return get_media_duration(clip_path, default=5.0)
 
 
 def _extract_segment(source_path: str, start_time: float, duration: float, output_path: str) -> bool:
+    from render_cache import RENDER_CACHE
+
+    return RENDER_CACHE.get_or_render(
+        [source_path],
+        {"op": "segment", "start": start_time, "duration": duration, "preset": "fast", "crf": 23},
+        output_path,
+        lambda out_path: _encode_segment(source_path, start_time, duration, out_path)
+    )
+
+
+def _encode_segment(source_path: str, start_time: float, duration: float, output_path: str) -> bool:
     try:
         cmd = [
             "ffmpeg", "-y",
@@ -37,7 +56,8 @@ def _extract_segment(source_path: str, start_time: float, duration: float, outpu
             "-an",
             output_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        with CPU_SLOTS:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
         if result.returncode == 0 and os.path.exists(output_path):
             print(f"[Preview] Extracted segment: {start_time}s +{duration}s -> {output_path}")
             return True
@@ -59,7 +79,8 @@ def _extract_frame(source_path: str, timestamp: float, output_path: str) -> bool
             "-q:v", "2",
             output_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+        with CPU_SLOTS:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
         if result.returncode == 0 and os.path.exists(output_path):
             print(f"[Preview] Extracted frame at {timestamp}s -> {output_path}")
             return True
@@ -84,18 +105,12 @@ def _frame_to_data_uri(frame_path: str) -> Optional[str]:
         return None
 
 
-def _download_video(url: str, output_path: str) -> bool:
+def _download_video(url: str, output_path: str, asset_id: Optional[str] = None) -> bool:
     try:
-        resp = requests.get(url, timeout=60, stream=True)
-        if resp.status_code == 200:
-            with open(output_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            print(f"[Preview] Downloaded Runway output -> {output_path}")
-            return True
-        else:
-            print(f"[Preview] Download failed: HTTP {resp.status_code}")
-            return False
+        with NETWORK_SLOTS:
+            MEDIA_MIRROR.fetch(url, output_path, asset_id=asset_id)
+        print(f"[Preview] Downloaded {url[:80]} -> {output_path}")
+        return True
     except Exception as e:
         print(f"[Preview] Download error: {e}")
         return False
@@ -108,8 +123,7 @@ def _generate_remix_clip(source_path: str, start_time: float, visual_description
         runway_generate_video, QualityTier
     )
 
-    ts = int(time.time())
-    frame_path = os.path.join(PREVIEW_DIR, f"frame_{ts}.jpg")
+    frame_path = os.path.join(PREVIEW_DIR, f"frame_{uuid.uuid4().hex[:12]}.jpg")
 
     if db_update_fn:
         db_update_fn("extracting_frame")
@@ -143,14 +157,15 @@ def _generate_remix_clip(source_path: str, start_time: float, visual_description
     print(f"[Preview] Sending frame to Runway: prompt='{prompt[:80]}...', tier={quality_tier}")
 
     try:
-        result = runway_generate_video(
-            prompt_image=data_uri,
-            prompt_text=prompt,
-            quality_tier=tier,
-            duration=5,
-            ratio="9:16",
-            wait_for_completion=False
-        )
+        with NETWORK_SLOTS:
+            result = runway_generate_video(
+                prompt_image=data_uri,
+                prompt_text=prompt,
+                quality_tier=tier,
+                duration=5,
+                ratio="9:16",
+                wait_for_completion=False
+            )
     except Exception as e:
         print(f"[Preview] Runway submit exception: {e}")
         return {"success": False, "error": f"Runway submission error: {str(e)}"}
@@ -166,9 +181,10 @@ def _generate_remix_clip(source_path: str, start_time: float, visual_description
     if db_update_fn:
         db_update_fn("generating_ai_visuals")
 
-    from remix_engine import runway_wait_for_completion, RunwayError
+    from remix_engine import RunwayError
+    from task_poller import TASK_POLLER
     try:
-        final = runway_wait_for_completion(task_id, max_wait_seconds=300, poll_interval=5)
+        final = TASK_POLLER.watch_runway(task_id, max_wait_seconds=300).result()
     except RunwayError as e:
         print(f"[Preview] Runway generation failed: {e.message}")
         return {"success": False, "error": f"Runway generation failed: {e.message}"}
@@ -190,56 +206,37 @@ def _generate_remix_clip(source_path: str, start_time: float, visual_description
 
 
 def _stitch_with_transition(clip1_path: str, clip2_path: str, transition: str, output_path: str) -> bool:
-    transition = (transition or "cut").lower()
+    from stitch_engine import stitch_clips
 
     try:
-        clip1_dur = _get_clip_duration(clip1_path)
-        overlap = min(1.0, clip1_dur * 0.2)
-        offset = max(0.5, clip1_dur - overlap)
-
-        if transition in ("crossfade", "dissolve", "fade"):
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", clip1_path,
-                "-i", clip2_path,
-                "-filter_complex",
-                f"[0:v]setpts=PTS-STARTPTS[v0];"
-                f"[1:v]setpts=PTS-STARTPTS[v1];"
-                f"[v0][v1]xfade=transition=fade:duration={overlap:.2f}:offset={offset:.2f}[outv]",
-                "-map", "[outv]",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                "-pix_fmt", "yuv420p",
-                "-an",
-                output_path
-            ]
-        else:
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", clip1_path,
-                "-i", clip2_path,
-                "-filter_complex",
-                "[0:v]setpts=PTS-STARTPTS[v0];"
-                "[1:v]setpts=PTS-STARTPTS[v1];"
-                "[v0][v1]concat=n=2:v=1:a=0[outv]",
-                "-map", "[outv]",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-                "-pix_fmt", "yuv420p",
-                "-an",
-                output_path
-            ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode == 0:
+        with CPU_SLOTS:
+            result = stitch_clips([clip1_path, clip2_path], [transition or "cut"], output_path, crf=23)
+        if result.get("success"):
             print(f"[Preview] Stitched transition preview: {output_path}")
             return True
         else:
-            print(f"[Preview] FFmpeg stitch failed: {result.stderr[:300]}")
+            print(f"[Preview] FFmpeg stitch failed: {result.get('error')}")
             return False
     except Exception as e:
         print(f"[Preview] Stitch error: {e}")
         return False
 
 
+def _publish_scene_status(project_id: int, scene_plan_id: int, render_status: str, **extra):
+    from progress_events import publish_progress, project_topic
+    publish_progress(project_topic(project_id), type="scene", scene_plan_id=scene_plan_id,
+                     render_status=render_status, **extra)
+
+
+def _run_with_finish_event(project_id: int, target, *args):
+    """Run a preview job and tell SSE subscribers when it is done (they re-fetch preview-status)."""
+    from progress_events import publish_progress, project_topic
+    try:
+        target(*args)
+    finally:
+        publish_progress(project_topic(project_id), type="preview", status="finished")
+
+
 def _find_source_video(project_id: int) -> Optional[str]:
     from models import ProjectSource
     sources = ProjectSource.query.filter_by(project_id=project_id).all()
@@ -255,6 +252,8 @@ def _is_remix_mode(scene_data: dict) -> bool:
 
 def _generate_stock_clip(visual_description: str, duration: float, output_path: str, db_update_fn=None) -> dict:
     from remix_engine import search_pexels_videos
+    from render_cache import RENDER_CACHE
+    from stock_cache import asset_id_for
 
     try:
         if db_update_fn:
@@ -265,7 +264,8 @@ def _generate_stock_clip(visual_description: str, duration: float, output_path:
             query = query[:200]
 
         print(f"[Preview] Searching Pexels for stock video: '{query[:80]}...'")
-        videos = search_pexels_videos(query=query, per_page=3, orientation="portrait")
+        with NETWORK_SLOTS:
+            videos = search_pexels_videos(query=query, per_page=3, orientation="portrait")
 
         if not videos:
             return {"success": False, "error": f"No stock videos found for: {query[:100]}"}
@@ -274,15 +274,20 @@ def _generate_stock_clip(visual_description: str, duration: float, output_path:
         video_url = best_video.get("video_url") or best_video.get("url")
         if not video_url:
             return {"success": False, "error": "Stock video result has no download URL"}
+        asset_id = asset_id_for("pexels_videos", best_video) if best_video.get("id") else None
+        source = {"source_url": video_url, "media_asset_id": asset_id}
+
+        cache_key = RENDER_CACHE.make_key([video_url], {"op": "stock_clip", "duration": duration, "crf": 23})
+        if RENDER_CACHE.fetch(cache_key, output_path):
+            return {"success": True, **source}
 
         if db_update_fn:
             db_update_fn("downloading_stock")
 
         print(f"[Preview] Downloading stock video: {video_url[:100]}...")
-        ts = int(time.time())
-        raw_path = os.path.join(PREVIEW_DIR, f"stock_raw_{ts}.mp4")
+        raw_path = os.path.join(PREVIEW_DIR, f"stock_raw_{uuid.uuid4().hex[:12]}.mp4")
 
-        if not _download_video(video_url, raw_path):
+        if not _download_video(video_url, raw_path, asset_id=asset_id):
             return {"success": False, "error": "Failed to download stock video"}
 
         raw_duration = _get_clip_duration(raw_path)
@@ -297,21 +302,24 @@ def _generate_stock_clip(visual_description: str, duration: float, output_path:
                 "-an",
                 output_path
             ]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            with CPU_SLOTS:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
             try:
                 os.remove(raw_path)
             except OSError:
                 pass
             if result.returncode == 0 and os.path.exists(output_path):
                 print(f"[Preview] Stock clip trimmed -> {output_path}")
-                return {"success": True}
+                RENDER_CACHE.store(cache_key, output_path)
+                return {"success": True, **source}
             else:
                 print(f"[Preview] Stock trim failed: {result.stderr[:300]}")
                 return {"success": False, "error": "Failed to trim stock video"}
         else:
             os.rename(raw_path, output_path)
             print(f"[Preview] Stock clip ready -> {output_path}")
-            return {"success": True}
+            RENDER_CACHE.store(cache_key, output_path)
+            return {"success": True, **source}
 
     except Exception as e:
         print(f"[Preview] Stock clip error: {e}")
@@ -332,28 +340,27 @@ def _generate_dalle_clip(visual_description: str, duration: float, output_path:
 
         from openai import OpenAI
         client = OpenAI()
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size="1024x1792",
-            quality="standard",
-            n=1
-        )
+        with NETWORK_SLOTS:
+            response = client.images.generate(
+                model="dall-e-3",
+                prompt=prompt,
+                size="1024x1792",
+                quality="standard",
+                n=1
+            )
 
         image_url = response.data[0].url
         if not image_url:
             return {"success": False, "error": "DALL-E returned no image URL"}
 
-        ts = int(time.time())
-        image_path = os.path.join(PREVIEW_DIR, f"dalle_img_{ts}.png")
+        image_path = os.path.join(PREVIEW_DIR, f"dalle_img_{uuid.uuid4().hex[:12]}.png")
 
         print(f"[Preview] Downloading DALL-E image...")
-        img_resp = requests.get(image_url, timeout=60)
-        if img_resp.status_code != 200:
-            return {"success": False, "error": f"Failed to download DALL-E image: HTTP {img_resp.status_code}"}
-
-        with open(image_path, "wb") as f:
-            f.write(img_resp.content)
+        try:
+            with NETWORK_SLOTS:
+                DOWNLOADS.download(image_url, image_path)
+        except DownloadError as e:
+            return {"success": False, "error": f"Failed to download DALL-E image: {e}"}
 
         if db_update_fn:
             db_update_fn("converting_to_video")
@@ -369,7 +376,8 @@ def _generate_dalle_clip(visual_description: str, duration: float, output_path:
             "-vf", "scale=1080:1920:force_original_aspect_ratio=decrease,pad=1080:1920:(ow-iw)/2:(oh-ih)/2",
             output_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        with CPU_SLOTS:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
 
         try:
             os.remove(image_path)
@@ -416,6 +424,7 @@ def _render_single_scene(scene_data: dict, scene_plan_id: int, project_id: int,
                 db.session.commit()
         except Exception:
             db.session.rollback()
+        _publish_scene_status(project_id, scene_plan_id, status)
 
     print(f"[Preview] Rendering scene {scene_data.get('scene_index', '?')} type={source_type} duration={duration}s")
 
@@ -465,7 +474,9 @@ def _render_single_scene(scene_data: dict, scene_plan_id: int, project_id: int,
         render_result = {"success": False, "error": f"Unknown source type: {source_type}"}
 
     try:
-        scene_plan = ScenePlan.query.get(scene_plan_id)
+        # Same row lock as update_all_scenes_progress: the first scene's source_config also
+        # carries the aggregate progress, so the merge must see the latest committed blob
+        scene_plan = ScenePlan.query.filter_by(id=scene_plan_id).with_for_update().populate_existing().first()
         if scene_plan:
             if render_result.get("success"):
                 scene_plan.rendered_path = output_path
@@ -475,6 +486,10 @@ def _render_single_scene(scene_data: dict, scene_plan_id: int, project_id: int,
                     "preview_local_path": output_path,
                     "preview_video_url": f"/api/project/{project_id}/scene/{scene_plan_id}/preview-video"
                 }
+                for field in ("source_url", "media_asset_id"):
+                    # Pins the source clip in MEDIA_MIRROR while the project is active
+                    if render_result.get(field):
+                        scene_plan.source_config[field] = render_result[field]
                 print(f"[Preview] Scene {scene_data.get('scene_index', '?')} rendered successfully")
             else:
                 scene_plan.render_status = "render_failed"
@@ -484,6 +499,8 @@ def _render_single_scene(scene_data: dict, scene_plan_id: int, project_id: int,
                 }
                 print(f"[Preview] Scene {scene_data.get('scene_index', '?')} render failed: {render_result.get('error')}")
             db.session.commit()
+            _publish_scene_status(project_id, scene_plan_id, scene_plan.render_status,
+                                  error=render_result.get("error"))
     except Exception as e:
         print(f"[Preview] DB update error for scene {scene_plan_id}: {e}")
         db.session.rollback()
@@ -497,14 +514,85 @@ def _render_single_scene(scene_data: dict, scene_plan_id: int, project_id: int,
 
 def generate_all_scenes_async(project_id: int, scene_plan_data: list, quality_tier: str = "good"):
     thread = threading.Thread(
-        target=_run_all_scenes_generation,
-        args=(project_id, scene_plan_data, quality_tier),
+        target=_run_with_finish_event,
+        args=(project_id, _run_all_scenes_generation, project_id, scene_plan_data, quality_tier),
         daemon=True
     )
     thread.start()
     return thread
 
 
+def _match_scene_data(scene_plan, scene_plan_data: list, position: int) -> dict:
+    for sd in scene_plan_data:
+        if sd.get("scene_index") == scene_plan.scene_index:
+            return sd
+    if position < len(scene_plan_data):
+        return scene_plan_data[position]
+    return {
+        "scene_index": scene_plan.scene_index,
+        "source_type": scene_plan.source_type or "clip",
+        "visual_description": (scene_plan.source_config or {}).get("visual_description", ""),
+        "duration": scene_plan.duration or 5.0,
+        "start_time": scene_plan.start_time or 0,
+        "transition_out": scene_plan.transition_out or "cut"
+    }
+
+
+def _render_scene_with_fallback(app, project_id: int, scene_plan_id: int, position: int,
+                                scene_data: dict, source_video: Optional[str], quality_tier: str) -> dict:
+    """Render one scene on a scheduler thread; a failed clip/remix scene falls back to clip extraction right away."""
+    with app.app_context():
+        from models import db, ScenePlan
+
+        _publish_scene_status(project_id, scene_plan_id, "rendering", scene_position=position + 1)
+        try:
+            result = _render_single_scene(
+                scene_data=scene_data,
+                scene_plan_id=scene_plan_id,
+                project_id=project_id,
+                source_video=source_video,
+                quality_tier=quality_tier
+            )
+        except Exception as e:
+            print(f"[Preview] Scene {position+1} render error: {e}")
+            traceback.print_exc()
+            result = {"success": False, "output_path": None, "error": str(e)}
+
+        if result.get("success") or scene_data.get("source_type", "").lower() not in ("clip", "remix") or not source_video:
+            return result
+
+        print(f"[Preview] Scene {position+1} failed ({scene_data.get('source_type')}), falling back to clip extraction")
+        try:
+            start_time = float(scene_data.get("start_time", 0) or 0)
+        except (TypeError, ValueError):
+            start_time = 0.0
+        try:
+            duration = float(scene_data.get("duration", 5.0) or 5.0)
+        except (TypeError, ValueError):
+            duration = 5.0
+
+        fallback_path = os.path.join(PREVIEW_DIR, f"scene_fallback_{project_id}_{scene_plan_id}_{int(time.time())}.mp4")
+        if not _extract_segment(source_video, start_time, duration, fallback_path):
+            return result
+
+        try:
+            sp = ScenePlan.query.filter_by(id=scene_plan_id).with_for_update().populate_existing().first()
+            if sp:
+                sp.rendered_path = fallback_path
+                sp.render_status = "rendered"
+                sp.source_config = {
+                    **(sp.source_config or {}),
+                    "preview_local_path": fallback_path,
+                    "preview_video_url": f"/api/project/{project_id}/scene/{scene_plan_id}/preview-video",
+                    "fallback_used": True
+                }
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+        _publish_scene_status(project_id, scene_plan_id, "rendered", fallback_used=True)
+        return {"success": True, "output_path": fallback_path}
+
+
 def _run_all_scenes_generation(project_id: int, scene_plan_data: list, quality_tier: str):
     from app import app
 
@@ -520,80 +608,51 @@ def _run_all_scenes_generation(project_id: int, scene_plan_data: list, quality_t
             source_video = _find_source_video(project_id)
             print(f"[Preview] Starting all-scenes render for project {project_id}: {len(scene_plans)} scenes, source_video={'found' if source_video else 'None'}")
 
-            rendered_paths = []
             total_scenes = len(scene_plans)
+            first_plan_id = scene_plans[0].id
+            rendered_paths = [{"success": False} for _ in scene_plans]
 
-            for i, scene_plan in enumerate(scene_plans):
+            def update_all_scenes_progress(completed: int):
+                # Row lock so this merge never overwrites a scene thread's committed source_config
                 try:
-                    first_sp = ScenePlan.query.get(scene_plans[0].id)
+                    first_sp = ScenePlan.query.filter_by(id=first_plan_id).with_for_update().populate_existing().first()
                     if first_sp:
                         first_sp.source_config = {
                             **(first_sp.source_config or {}),
                             "all_scenes_status": "rendering",
-                            "current_scene": i + 1,
+                            "current_scene": min(completed + 1, total_scenes),
                             "total_scenes": total_scenes
                         }
-                        db.session.commit()
+                    db.session.commit()
                 except Exception:
                     db.session.rollback()
-
-                matching_data = None
-                for sd in scene_plan_data:
-                    if sd.get("scene_index") == scene_plan.scene_index:
-                        matching_data = sd
-                        break
-
-                if not matching_data:
-                    if i < len(scene_plan_data):
-                        matching_data = scene_plan_data[i]
-                    else:
-                        matching_data = {
-                            "scene_index": scene_plan.scene_index,
-                            "source_type": scene_plan.source_type or "clip",
-                            "visual_description": (scene_plan.source_config or {}).get("visual_description", ""),
-                            "duration": scene_plan.duration or 5.0,
-                            "start_time": scene_plan.start_time or 0,
-                            "transition_out": scene_plan.transition_out or "cut"
-                        }
-
-                result = _render_single_scene(
-                    scene_data=matching_data,
-                    scene_plan_id=scene_plan.id,
-                    project_id=project_id,
-                    source_video=source_video,
-                    quality_tier=quality_tier
-                )
-
-                if not result.get("success") and matching_data.get("source_type", "").lower() in ("clip", "remix") and source_video:
-                    print(f"[Preview] Scene {i+1} failed ({matching_data.get('source_type')}), falling back to clip extraction")
-                    try:
-                        start_time = float(matching_data.get("start_time", 0) or 0)
-                    except (TypeError, ValueError):
-                        start_time = 0.0
+                _publish_scene_status(project_id, first_plan_id, "rendering",
+                                      current_scene=min(completed + 1, total_scenes), total_scenes=total_scenes)
+
+            update_all_scenes_progress(0)
+
+            workers = max(1, min(PREVIEW_SCENE_WORKERS, total_scenes))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"preview-{project_id}") as executor:
+                futures = {}
+                for i, scene_plan in enumerate(scene_plans):
+                    scene_data = _match_scene_data(scene_plan, scene_plan_data, i)
+                    future = executor.submit(
+                        _render_scene_with_fallback, app, project_id, scene_plan.id, i,
+                        scene_data, source_video, quality_tier
+                    )
+                    futures[future] = i
+
+                completed = 0
+                for future in as_completed(futures):
+                    i = futures[future]
                     try:
-                        duration = float(matching_data.get("duration", 5.0) or 5.0)
-                    except (TypeError, ValueError):
-                        duration = 5.0
-
-                    fallback_path = os.path.join(PREVIEW_DIR, f"scene_fallback_{project_id}_{scene_plan.id}_{int(time.time())}.mp4")
-                    if _extract_segment(source_video, start_time, duration, fallback_path):
-                        try:
-                            sp = ScenePlan.query.get(scene_plan.id)
-                            if sp:
-                                sp.rendered_path = fallback_path
-                                sp.render_status = "rendered"
-                                sp.source_config = {
-                                    **(sp.source_config or {}),
-                                    "preview_local_path": fallback_path,
-                                    "preview_video_url": f"/api/project/{project_id}/scene/{scene_plan.id}/preview-video",
-                                    "fallback_used": True
-                                }
-                                db.session.commit()
-                        except Exception:
-                            db.session.rollback()
-                        result = {"success": True, "output_path": fallback_path}
-
-                rendered_paths.append(result)
+                        rendered_paths[i] = future.result()
+                    except Exception as e:
+                        print(f"[Preview] Scene {i+1} scheduler error: {e}")
+                        rendered_paths[i] = {"success": False, "error": str(e)}
+                    completed += 1
+                    if completed < total_scenes:
+                        update_all_scenes_progress(completed)
 
             successful_paths = [r["output_path"] for r in rendered_paths if r.get("success") and r.get("output_path")]
 
@@ -614,7 +673,7 @@ def _run_all_scenes_generation(project_id: int, scene_plan_data: list, quality_t
 
                 if stitched and os.path.exists(transition_output):
                     try:
-                        first_sp = ScenePlan.query.get(scene_plans[0].id)
+                        first_sp = ScenePlan.query.filter_by(id=scene_plans[0].id).with_for_update().populate_existing().first()
                         if first_sp:
                             first_sp.rendered_path = transition_output
                             first_sp.source_config = {
@@ -629,7 +688,7 @@ def _run_all_scenes_generation(project_id: int, scene_plan_data: list, quality_t
                         db.session.rollback()
 
             try:
-                first_sp = ScenePlan.query.get(scene_plans[0].id)
+                first_sp = ScenePlan.query.filter_by(id=scene_plans[0].id).with_for_update().populate_existing().first()
                 if first_sp:
                     first_sp.source_config = {
                         **(first_sp.source_config or {}),
@@ -671,8 +730,9 @@ def generate_scene_preview_async(
     quality_tier: str = "good"
 ):
     thread = threading.Thread(
-        target=_run_preview_generation,
-        args=(project_id, scene1_plan_id, scene1_data, scene2_data, scene2_plan_id, quality_tier),
+        target=_run_with_finish_event,
+        args=(project_id, _run_preview_generation, project_id, scene1_plan_id, scene1_data,
+              scene2_data, scene2_plan_id, quality_tier),
         daemon=True
     )
     thread.start()
@@ -745,6 +805,7 @@ def _run_preview_generation(
                         db.session.commit()
                 except Exception:
                     db.session.rollback()
+                _publish_scene_status(project_id, scene1_plan_id, status)
 
             if is_remix:
                 visual_desc = scene1_data.get("visual_description", "")
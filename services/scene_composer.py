@@ -4,6 +4,7 @@ Handles gap-filling, ordering by brief structure, and consistent post-processing
 """
 import json
 from context_engine import call_ai, SYSTEM_GUARDRAILS
+from llm_cache import cached_call_ai
 
 ANCHOR_ORDER = ['hook', 'claim', 'evidence', 'pivot', 'counter', 'closer']
 
@@ -31,7 +32,7 @@ Unplaced scenes: {json.dumps([{'index': i, 'text': s.get('script_text', '')[:50]
 
 Return a JSON array of indices in the order they should be inserted, and where:
 {{"placements": [{{"scene_index": 0, "insert_after": 2}}]}}"""
-            result = call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=200)
+            result = cached_call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=200, site="order_scenes_by_structure")
             if isinstance(result, dict) and 'placements' in result:
                 for p in result['placements']:
                     idx = p.get('scene_index', 0)
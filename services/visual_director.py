@@ -5,7 +5,8 @@ ALL sources (stock, user clips, AI-generated) conform to the same design languag
 Stock footage is NEVER raw — it's always placed INSIDE the video's visual containers.
 """
 import json
-from context_engine import call_ai, SYSTEM_GUARDRAILS
+from context_engine import SYSTEM_GUARDRAILS
+from llm_cache import cached_call_ai
 
 
 def analyze_visual_structure(brief, template_data=None, source_count=0):
@@ -51,7 +52,7 @@ Guidelines:
 - Color palette should match the mood (warm for motivational, cool for tech, etc.)
 - If multiple sources, prefer layouts that can showcase variety (cards, collage)"""
 
-    result = call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=400)
+    result = cached_call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=400, site="analyze_visual_structure")
 
     if isinstance(result, dict) and result:
         return result
@@ -99,7 +100,7 @@ Return a JSON object:
 The stock footage will be placed INSIDE a '{visual_structure.get("layout_type", "fullscreen")}' container.
 It must look like it was always part of the design, not dropped in as a separate clip."""
 
-    result = call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=300)
+    result = cached_call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=300, site="get_stock_search_context")
 
     if isinstance(result, dict) and result:
         return result
@@ -135,7 +136,7 @@ Return JSON:
     "suggestions": ["list of improvements"]
 }}"""
 
-    result = call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=300)
+    result = cached_call_ai(prompt=prompt, system_prompt=SYSTEM_GUARDRAILS, json_output=True, max_tokens=300, site="validate_source_coherence")
 
     if isinstance(result, dict) and result:
         return result
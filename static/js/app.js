@@ -9681,15 +9681,36 @@ document.addEventListener('DOMContentLoaded', () => {
 // ===== DISCOVER FEED FUNCTIONALITY =====
 let feedItems = [];
 let currentCardIndex = 0;
+let feedNextCursor = null;
+let feedLoadingMore = false;
 let isDragging = false;
 let startX = 0;
 let currentX = 0;
 
+async function loadMoreFeedItems() {
+    if (!feedNextCursor || feedLoadingMore) return;
+    feedLoadingMore = true;
+    try {
+        const response = await fetch('/feed/items?cursor=' + encodeURIComponent(feedNextCursor));
+        const data = await response.json();
+        const seen = new Set(feedItems.map(item => item.id));
+        const wasEmpty = currentCardIndex >= feedItems.length;
+        feedItems = feedItems.concat((data.items || []).filter(item => !seen.has(item.id)));
+        feedNextCursor = data.next_cursor || null;
+        if (wasEmpty) renderCards();
+    } catch (error) {
+        console.error('Error loading more feed items:', error);
+    } finally {
+        feedLoadingMore = false;
+    }
+}
+
 async function loadFeedItems() {
     try {
         const response = await fetch('/feed/items');
         const data = await response.json();
         feedItems = data.items || [];
+        feedNextCursor = data.next_cursor || null;
         currentCardIndex = 0;
         renderCards();
     } catch (error) {
@@ -9838,6 +9859,7 @@ async function swipeCard(action, feedback = '') {
     setTimeout(() => {
         currentCardIndex++;
         renderCards();
+        if (feedItems.length - currentCardIndex <= 3) loadMoreFeedItems();
     }, 300);
 }
 
@@ -253,37 +253,78 @@ async function createVideoJob(projectId, qualityTier, jobData) {
     }
 }
 
+function stopJobTracking(jobId) {
+    const tracker = activeJobPolls.get(jobId);
+    if (tracker && typeof tracker.close === 'function') {
+        tracker.close();
+    } else if (tracker) {
+        clearInterval(tracker);
+    }
+    activeJobPolls.delete(jobId);
+}
+
+function applyJobUpdate(jobId, projectId, job) {
+    if (job.status === 'completed') {
+        stopJobTracking(jobId);
+        onVideoGenerationComplete(projectId, job.result_url);
+    } else if (job.status === 'failed') {
+        stopJobTracking(jobId);
+        setGeneratingState(false, projectId);
+        showToast('Generation Failed', job.error_message || 'Please try again.', null, null, true);
+    } else if (job.status === 'processing') {
+        const progress = job.progress;
+        if (progress && progress.message) {
+            updateProgressDisplay(projectId, progress.current, progress.total, progress.message);
+        }
+    }
+}
+
 function startJobPolling(jobId, projectId) {
     if (activeJobPolls.has(jobId)) return;
     
+    if (window.EventSource) {
+        // Server pushes progress; fall back to polling if the stream drops
+        const source = new EventSource(`/api/progress/job/${jobId}/stream`);
+        source.onmessage = (e) => {
+            const event = JSON.parse(e.data);
+            if (event.type === 'timeout') {
+                stopJobTracking(jobId);
+                startIntervalJobPolling(jobId, projectId);
+                return;
+            }
+            const job = event.type === 'snapshot' ? event.job : {
+                status: event.status,
+                result_url: event.result_url,
+                error_message: event.error,
+                progress: { current: event.current, total: event.total, message: event.message }
+            };
+            applyJobUpdate(jobId, projectId, job);
+        };
+        source.onerror = () => {
+            stopJobTracking(jobId);
+            startIntervalJobPolling(jobId, projectId);
+        };
+        activeJobPolls.set(jobId, source);
+        return;
+    }
+    
+    startIntervalJobPolling(jobId, projectId);
+}
+
+function startIntervalJobPolling(jobId, projectId) {
+    if (activeJobPolls.has(jobId)) return;
+    
     const pollInterval = setInterval(async () => {
         try {
             const response = await fetch(`/api/jobs/${jobId}`);
             const data = await response.json();
             
             if (!data.ok) {
-                clearInterval(pollInterval);
-                activeJobPolls.delete(jobId);
+                stopJobTracking(jobId);
                 return;
             }
             
-            const job = data.job;
-            
-            if (job.status === 'completed') {
-                clearInterval(pollInterval);
-                activeJobPolls.delete(jobId);
-                onVideoGenerationComplete(projectId, job.result_url);
-            } else if (job.status === 'failed') {
-                clearInterval(pollInterval);
-                activeJobPolls.delete(jobId);
-                setGeneratingState(false, projectId);
-                showToast('Generation Failed', job.error_message || 'Please try again.', null, null, true);
-            } else if (job.status === 'processing') {
-                const progress = job.progress;
-                if (progress && progress.message) {
-                    updateProgressDisplay(projectId, progress.current, progress.total, progress.message);
-                }
-            }
+            applyJobUpdate(jobId, projectId, data.job);
         } catch (err) {
             console.error('Job polling error:', err);
         }
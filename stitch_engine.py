@@ -0,0 +1,230 @@
+"""
+Stitch Engine: Single-Pass N-Way Scene Assembly
+
+Joins N pre-rendered scene clips into one video with a single ffmpeg
+invocation instead of stitching pairs and re-encoding the accumulated
+output at every step.
+
+Strategy:
+- Probe every clip once up front (duration + video stream parameters)
+- All-cut timelines whose clips share codec parameters are joined with the
+  concat demuxer and stream copy (no re-encode at all)
+- Everything else is built as one filter graph: each input is normalized
+  to the first clip's geometry/fps, then chained with xfade for
+  dissolve/fade transitions and concat for cuts, and encoded once
+- If the transition graph fails, a cuts-only graph is tried before giving up
+"""
+
+import os
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
+
+from media_probe import probe_media
+
+
+FADE_TRANSITIONS = ('crossfade', 'dissolve', 'fade')
+DEFAULT_CLIP_DURATION = 5.0
+MAX_FADE_OVERLAP = 1.0
+
+# Stream-copied output must still play in browsers, so only accept
+# H.264/yuv420p sources on the copy path.
+COPY_SAFE_CODECS = ('h264',)
+COPY_SAFE_PIX_FMTS = ('yuv420p',)
+
+
+@dataclass
+class ClipInfo:
+    """Probed parameters for one input clip."""
+    path: str
+    duration: float
+    codec_name: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pix_fmt: Optional[str] = None
+    frame_rate: Optional[str] = None
+    time_base: Optional[str] = None
+
+    def copy_signature(self) -> tuple:
+        return (self.codec_name, self.width, self.height, self.pix_fmt, self.frame_rate, self.time_base)
+
+
+def probe_clip(path: str) -> ClipInfo:
+    """Duration and first video stream parameters, via the shared media probe."""
+    info = probe_media(path)
+    if info is None:
+        print(f"[Stitch] Probe failed for {path}")
+        return ClipInfo(path=path, duration=DEFAULT_CLIP_DURATION)
+
+    return ClipInfo(
+        path=path,
+        duration=info.duration if info.duration is not None else DEFAULT_CLIP_DURATION,
+        codec_name=info.video_codec,
+        width=info.width,
+        height=info.height,
+        pix_fmt=info.pix_fmt,
+        frame_rate=info.frame_rate,
+        time_base=info.time_base,
+    )
+
+
+def _is_fade(transition: Optional[str]) -> bool:
+    return (transition or "cut").lower() in FADE_TRANSITIONS
+
+
+def _fade_overlap(prev_duration: float) -> float:
+    return min(MAX_FADE_OVERLAP, prev_duration * 0.2)
+
+
+def can_stream_copy(clips: List[ClipInfo], transitions: List[str]) -> bool:
+    """True when every join is a cut and all clips share copy-safe codec parameters."""
+    if any(_is_fade(t) for t in transitions):
+        return False
+    first = clips[0]
+    if first.codec_name not in COPY_SAFE_CODECS or first.pix_fmt not in COPY_SAFE_PIX_FMTS:
+        return False
+    signature = first.copy_signature()
+    if None in signature:
+        return False
+    return all(c.copy_signature() == signature for c in clips[1:])
+
+
+def build_stitch_filter(clips: List[ClipInfo], transitions: List[str],
+                        fps: int = 30) -> Dict[str, Any]:
+    """
+    Build a single filter_complex joining every clip.
+
+    transitions[i] is the transition between clips[i] and clips[i+1].
+    Returns {'filter': str, 'output_label': str, 'duration': float}.
+    """
+    width = clips[0].width or 1080
+    height = clips[0].height or 1920
+
+    parts = []
+    for i in range(len(clips)):
+        parts.append(
+            f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},"
+            f"format=yuv420p,settb=AVTB,setpts=PTS-STARTPTS[v{i}]"
+        )
+
+    current = "v0"
+    timeline = clips[0].duration
+    for i in range(1, len(clips)):
+        label = f"j{i}"
+        transition = transitions[i - 1] if i - 1 < len(transitions) else "cut"
+        if _is_fade(transition):
+            overlap = _fade_overlap(clips[i - 1].duration)
+            offset = max(0.0, timeline - overlap)
+            parts.append(
+                f"[{current}][v{i}]xfade=transition=fade:duration={overlap:.2f}:offset={offset:.2f}[{label}]"
+            )
+            timeline = offset + clips[i].duration
+        else:
+            parts.append(f"[{current}][v{i}]concat=n=2:v=1:a=0[{label}]")
+            timeline += clips[i].duration
+        current = label
+
+    return {"filter": ";".join(parts), "output_label": current, "duration": timeline}
+
+
+def _write_concat_list(paths: List[str]) -> str:
+    fd, list_path = tempfile.mkstemp(prefix="stitch_", suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        for p in paths:
+            escaped = os.path.abspath(p).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    return list_path
+
+
+def _stream_copy_concat(clips: List[ClipInfo], output_path: str, timeout: int) -> bool:
+    list_path = _write_concat_list([c.path for c in clips])
+    try:
+        cmd = [
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+            "-map", "0:v:0", "-c", "copy", "-an", "-movflags", "+faststart",
+            output_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode == 0 and os.path.exists(output_path):
+            return True
+        print(f"[Stitch] Stream-copy concat failed: {result.stderr[:300]}")
+        return False
+    except Exception as e:
+        print(f"[Stitch] Stream-copy concat error: {e}")
+        return False
+    finally:
+        try:
+            os.remove(list_path)
+        except OSError:
+            pass
+
+
+def _encode_graph(clips: List[ClipInfo], transitions: List[str], output_path: str,
+                  crf: int, preset: str, timeout: int) -> bool:
+    graph = build_stitch_filter(clips, transitions)
+    cmd = ["ffmpeg", "-y"]
+    for c in clips:
+        cmd += ["-i", c.path]
+    cmd += [
+        "-filter_complex", graph["filter"],
+        "-map", f"[{graph['output_label']}]",
+        "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+        "-pix_fmt", "yuv420p", "-an", "-movflags", "+faststart",
+        output_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode == 0 and os.path.exists(output_path):
+            return True
+        print(f"[Stitch] Filter graph encode failed: {result.stderr[-300:]}")
+        return False
+    except Exception as e:
+        print(f"[Stitch] Filter graph encode error: {e}")
+        return False
+
+
+def stitch_clips(
+    paths: List[str],
+    transitions: List[str],
+    output_path: str,
+    crf: int = 22,
+    preset: str = "fast",
+    allow_stream_copy: bool = True
+) -> Dict[str, Any]:
+    """
+    Stitch N clips into output_path in a single pass.
+
+    transitions[i] is the transition between paths[i] and paths[i+1]
+    ('cut', 'fade', 'dissolve', 'crossfade').
+
+    Returns dict with 'success', 'mode' ('copy', 'graph', 'cuts_only')
+    and 'duration' of the stitched timeline.
+    """
+    if not paths:
+        return {"success": False, "error": "No clips to stitch"}
+
+    started = time.time()
+    clips = [probe_clip(p) for p in paths]
+    transitions = list(transitions or [])
+    timeout = 60 + 30 * len(clips)
+
+    if allow_stream_copy and can_stream_copy(clips, transitions):
+        if _stream_copy_concat(clips, output_path, timeout):
+            print(f"[Stitch] Stream-copied {len(clips)} clips in {time.time() - started:.1f}s -> {output_path}")
+            return {"success": True, "mode": "copy", "duration": sum(c.duration for c in clips)}
+
+    if _encode_graph(clips, transitions, output_path, crf, preset, timeout):
+        duration = build_stitch_filter(clips, transitions)["duration"]
+        print(f"[Stitch] Encoded {len(clips)} clips in one pass ({time.time() - started:.1f}s) -> {output_path}")
+        return {"success": True, "mode": "graph", "duration": duration}
+
+    if any(_is_fade(t) for t in transitions):
+        print("[Stitch] Retrying with cuts only")
+        cuts = ["cut"] * (len(clips) - 1)
+        if _encode_graph(clips, cuts, output_path, crf, preset, timeout):
+            return {"success": True, "mode": "cuts_only", "duration": sum(c.duration for c in clips)}
+
+    return {"success": False, "error": "ffmpeg stitch failed"}
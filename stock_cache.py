@@ -0,0 +1,289 @@
+"""
+Stock Search Query Cache
+
+Read-through cache in front of the stock provider searches (Unsplash,
+Pixabay, Pexels photos and videos, Wikimedia Commons). Users keep coming
+back to the same topics, so most scene searches can be answered locally,
+which also keeps us clear of provider 429s.
+
+- Key: (provider, normalized query, orientation, per_page and any other
+  search arguments)
+- Front tier: bounded in-memory LRU with a TTL (STOCK_CACHE_MAX_ENTRIES,
+  STOCK_CACHE_TTL_HOURS)
+- Persistent tier: results are written as MediaAsset rows (status
+  'search_cache', so the curated visual board never picks them up) plus one
+  KeywordAssetCache row per result, keyword = the cache key, context =
+  'stock_search', relevance_score = rank; rows older than the TTL are
+  ignored and replaced on the next fetch
+- Empty results are never cached (providers return [] on errors too)
+
+Usage:
+    @cached_search("unsplash", orientation="landscape")
+    def search_unsplash(query, per_page=6): ...
+"""
+
+import os
+import re
+import time
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Optional, List, Dict, Any, Callable
+
+
+STOCK_CACHE_TTL_HOURS = float(os.environ.get("STOCK_CACHE_TTL_HOURS", "24"))
+STOCK_CACHE_MAX_ENTRIES = int(os.environ.get("STOCK_CACHE_MAX_ENTRIES", "512"))
+STOCK_CACHE_PERSIST = os.environ.get("STOCK_CACHE_PERSIST", "true").lower() != "false"
+
+CACHE_CONTEXT = "stock_search"
+CACHED_ASSET_STATUS = "search_cache"
+
+# Providers whose results are video objects (see remix_engine.search_pexels_videos)
+VIDEO_PROVIDERS = ("pexels_videos",)
+
+PROVIDER_LICENSES = {
+    "unsplash": "Unsplash License",
+    "pixabay": "Pixabay Content License",
+    "pexels": "Pexels License",
+    "pexels_videos": "Pexels License",
+    "wikimedia": "Unknown",
+}
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", (query or "").lower()))
+
+
+def asset_id_for(provider: str, result: Dict[str, Any]) -> str:
+    """MediaAsset.id a search result is persisted under."""
+    if provider in VIDEO_PROVIDERS:
+        return f"{provider}_{result.get('id')}"
+    return str(result.get("id"))
+
+
+def _to_asset_fields(provider: str, result: Dict[str, Any], query: str) -> Dict[str, Any]:
+    """MediaAsset columns for one search result."""
+    if provider in VIDEO_PROVIDERS:
+        width, height = result.get("width"), result.get("height")
+        return {
+            "id": asset_id_for(provider, result),
+            "download_url": result.get("url"),
+            "thumbnail_url": None,
+            "content_type": "video",
+            "duration_sec": result.get("duration"),
+            "resolution": f"{width}x{height}" if width and height else None,
+            "description": result.get("query") or query,
+            "attribution_text": result.get("attribution"),
+        }
+    return {
+        "id": asset_id_for(provider, result),
+        "download_url": result.get("url"),
+        "thumbnail_url": result.get("thumbnail"),
+        "content_type": "image",
+        "duration_sec": None,
+        "resolution": None,
+        "description": result.get("alt") or query,
+        "attribution_text": None,
+    }
+
+
+def _from_asset(provider: str, asset, query: str) -> Dict[str, Any]:
+    """Rebuild the provider's result dict from a MediaAsset row."""
+    if provider in VIDEO_PROVIDERS:
+        width = height = None
+        if asset.resolution and "x" in asset.resolution:
+            w, h = asset.resolution.split("x", 1)
+            width, height = int(w), int(h)
+        raw_id = asset.id[len(provider) + 1:]
+        return {
+            "id": int(raw_id) if raw_id.isdigit() else raw_id,
+            "url": asset.download_url,
+            "duration": asset.duration_sec,
+            "width": width,
+            "height": height,
+            "query": query,
+            "source": "pexels",
+            "attribution": asset.attribution_text,
+        }
+    return {
+        "id": asset.id,
+        "url": asset.download_url,
+        "thumbnail": asset.thumbnail_url or asset.download_url,
+        "alt": asset.description or query,
+    }
+
+
+class StockQueryCache:
+    """TTL'd LRU of stock search results with a MediaAsset/KeywordAssetCache tier."""
+
+    def __init__(self, ttl_hours: float = STOCK_CACHE_TTL_HOURS, max_entries: int = STOCK_CACHE_MAX_ENTRIES,
+                 persist: bool = STOCK_CACHE_PERSIST):
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0}
+
+    @staticmethod
+    def make_key(provider: str, query: str, params: Dict[str, Any]) -> str:
+        """KeywordAssetCache.keyword for a search (fits the 255-char column)."""
+        canonical = repr(sorted((k, params[k]) for k in params))
+        digest = hashlib.sha1(canonical.encode()).hexdigest()[:12]
+        return f"stock:{provider}:{digest}:{normalize_query(query)[:200]}"
+
+    def get_or_fetch(self, provider: str, query: str, params: Dict[str, Any],
+                     fetch: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        key = self.make_key(provider, query, params)
+
+        results = self._get_memory(key)
+        if results is not None:
+            self._stats["hits"] += 1
+            return [dict(r) for r in results]
+
+        results = self._load_persistent(key, provider, query) if self.persist else None
+        if results:
+            self._stats["persistent_hits"] += 1
+            self._put_memory(key, results)
+            return [dict(r) for r in results]
+
+        self._stats["misses"] += 1
+        results = fetch()
+        if results:
+            self._put_memory(key, results)
+            if self.persist:
+                self._save_persistent(key, provider, query, results)
+            self._stats["stores"] += 1
+        return results
+
+    def _get_memory(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return results
+
+    def _put_memory(self, key: str, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, [dict(r) for r in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def _db_session(self):
+        """db.session inside an app context (search calls often run on pool threads)."""
+        from flask import has_app_context
+        from extensions import db
+        if has_app_context():
+            yield db.session
+            return
+        from app import app
+        with app.app_context():
+            yield db.session
+
+    def _load_persistent(self, key: str, provider: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            from models import MediaAsset, KeywordAssetCache
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            with self._db_session():
+                entries = KeywordAssetCache.query.filter(
+                    KeywordAssetCache.keyword == key,
+                    KeywordAssetCache.context == CACHE_CONTEXT,
+                    KeywordAssetCache.created_at >= cutoff
+                ).order_by(KeywordAssetCache.relevance_score.desc()).all()
+                if not entries:
+                    return None
+                assets = {a.id: a for a in MediaAsset.query.filter(
+                    MediaAsset.id.in_([e.asset_id for e in entries])
+                ).all()}
+                return [_from_asset(provider, assets[e.asset_id], query) for e in entries
+                        if e.asset_id in assets and assets[e.asset_id].source == provider]
+        except Exception as e:
+            print(f"[StockCache] Persistent lookup failed: {e}")
+            return None
+
+    def _save_persistent(self, key: str, provider: str, query: str, results: List[Dict[str, Any]]):
+        try:
+            from models import MediaAsset, KeywordAssetCache
+            with self._db_session() as session:
+                try:
+                    KeywordAssetCache.query.filter_by(keyword=key, context=CACHE_CONTEXT).delete()
+                    for rank, result in enumerate(results):
+                        fields = _to_asset_fields(provider, result, query)
+                        if not fields["download_url"]:
+                            continue
+                        existing = session.get(MediaAsset, fields["id"])
+                        if existing is not None:
+                            if existing.source != provider:
+                                # Same id from another provider (image ids are bare); never serve its URL
+                                continue
+                            # Provider URLs rotate/expire; keep the row pointing at what was just returned
+                            existing.download_url = fields["download_url"]
+                            existing.thumbnail_url = fields["thumbnail_url"] or existing.thumbnail_url
+                        else:
+                            session.add(MediaAsset(
+                                source=provider,
+                                license=PROVIDER_LICENSES.get(provider, "Unknown"),
+                                status=CACHED_ASSET_STATUS,
+                                use_count=0,
+                                **fields
+                            ))
+                        session.add(KeywordAssetCache(
+                            keyword=key,
+                            context=CACHE_CONTEXT,
+                            asset_id=fields["id"],
+                            relevance_score=float(len(results) - rank),
+                            use_count=0
+                        ))
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    raise
+        except Exception as e:
+            print(f"[StockCache] Persistent store failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+        return {**self._stats, "entries": entries}
+
+
+STOCK_QUERY_CACHE = StockQueryCache()
+
+
+def cached_search(provider: str, **fixed_params):
+    """
+    Route a provider search function through STOCK_QUERY_CACHE.
+
+    Every bound argument except `query` is part of the key, together with
+    fixed_params (e.g. the orientation a function hardcodes).
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @wraps(fn)
+        def wrapped(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            query = bound.arguments.get("query") or ""
+            params = {k: v for k, v in bound.arguments.items() if k != "query"}
+            params.update(fixed_params)
+            if not normalize_query(query):
+                return fn(*args, **kwargs)
+            return STOCK_QUERY_CACHE.get_or_fetch(provider, query, params, lambda: fn(*args, **kwargs))
+        return wrapped
+    return decorator
@@ -1,11 +1,24 @@
 import os
+import re
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures, FIRST_COMPLETED
 from ai_client import call_ai, SYSTEM_GUARDRAILS
+from llm_cache import cached_call_ai
+from stock_cache import cached_search
 
 UNSPLASH_ACCESS_KEY = os.environ.get("UNSPLASH_ACCESS_KEY")
 PIXABAY_API_KEY = os.environ.get("PIXABAY_API_KEY")
 PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
 
+# Provider fan-out: one global deadline per search; abandoned calls finish
+# in the background on this shared pool (each is bounded by its own timeout)
+STOCK_SEARCH_DEADLINE = float(os.environ.get("STOCK_SEARCH_DEADLINE", "4.0"))
+_SEARCH_POOL = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("STOCK_SEARCH_WORKERS", "16")),
+    thread_name_prefix="stock-search"
+)
+
 
 def extract_keywords_from_script(script: str) -> dict:
     prompt = f"""Analyze this script/pitch and extract keywords that capture the NUANCE of what they're trying to say.
@@ -29,7 +42,7 @@ Output JSON with:
     "hook_summary": "one sentence capturing the core message"
 }}"""
 
-    result = call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=1024)
+    result = cached_call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=1024, site="extract_keywords_from_script")
     if not result:
         return {
             "primary_keywords": [],
@@ -106,10 +119,11 @@ For generic references like "a leader", use "leader silhouette professional".
 If no people/characters mentioned, return empty array."""
     
     system = "Analyze text and identify any people, characters, or figures mentioned."
-    result = call_ai(prompt, system, json_output=True, max_tokens=512)
+    result = cached_call_ai(prompt, system, json_output=True, max_tokens=512, site="detect_characters_in_scene")
     return result if result else {"characters": [], "has_people": False}
 
 
+@cached_search("unsplash", orientation="landscape")
 def search_unsplash(query: str, per_page: int = 6) -> list[dict]:
     if not UNSPLASH_ACCESS_KEY:
         return []
@@ -141,6 +155,7 @@ def search_unsplash(query: str, per_page: int = 6) -> list[dict]:
     return []
 
 
+@cached_search("pixabay", orientation="horizontal")
 def search_pixabay(query: str, per_page: int = 6) -> list[dict]:
     if not PIXABAY_API_KEY:
         return []
@@ -208,6 +223,7 @@ def search_pixabay_videos(query: str, per_page: int = 4) -> list[dict]:
     return []
 
 
+@cached_search("pexels", orientation="landscape")
 def search_pexels(query: str, per_page: int = 6) -> list[dict]:
     if not PEXELS_API_KEY:
         return []
@@ -239,6 +255,7 @@ def search_pexels(query: str, per_page: int = 6) -> list[dict]:
     return []
 
 
+@cached_search("wikimedia")
 def search_wikimedia_images(query: str, per_page: int = 4) -> list[dict]:
     try:
         search_url = 'https://commons.wikimedia.org/w/api.php'
@@ -294,32 +311,155 @@ def search_wikimedia_images(query: str, per_page: int = 4) -> list[dict]:
         return []
 
 
-def search_visuals_unified(query: str, per_page: int = 6) -> list[dict]:
-    all_results = []
-    
-    print(f"[Unified Search] Starting search for: '{query}'")
-    
-    unsplash_results = search_unsplash(query, per_page=2)
-    all_results.extend(unsplash_results)
-    print(f"[Unified Search] Unsplash: {len(unsplash_results)} results")
-    
-    if len(all_results) < per_page:
-        wiki_results = search_wikimedia_images(query, per_page=3)
-        all_results.extend(wiki_results)
-        print(f"[Unified Search] Wikimedia: {len(wiki_results)} results")
-    
-    if len(all_results) < per_page:
-        pixabay_results = search_pixabay(query, per_page=2)
-        all_results.extend(pixabay_results)
-        print(f"[Unified Search] Pixabay: {len(pixabay_results)} results")
-    
-    if len(all_results) < per_page:
-        pexels_results = search_pexels(query, per_page=per_page - len(all_results))
-        all_results.extend(pexels_results)
-        print(f"[Unified Search] Pexels: {len(pexels_results)} results")
-    
-    print(f"[Unified Search] Total: {len(all_results)} results for '{query}'")
-    return all_results[:per_page]
+def _unsplash_enabled() -> bool:
+    return bool(UNSPLASH_ACCESS_KEY)
+
+
+def _pixabay_enabled() -> bool:
+    return bool(PIXABAY_API_KEY)
+
+
+def _pexels_enabled() -> bool:
+    return bool(PEXELS_API_KEY)
+
+
+# Preference order of the original sequential search: (name, search fn,
+# results taken from this provider, enabled check). Pexels fills whatever
+# the others leave, so it is asked for a full page.
+UNIFIED_PROVIDERS = (
+    ("unsplash", search_unsplash, lambda per_page: 2, _unsplash_enabled),
+    ("wikimedia", search_wikimedia_images, lambda per_page: 3, lambda: True),
+    ("pixabay", search_pixabay, lambda per_page: 2, _pixabay_enabled),
+    ("pexels", search_pexels, lambda per_page: per_page, _pexels_enabled),
+)
+
+
+def fan_out(tasks: dict, deadline: float = STOCK_SEARCH_DEADLINE, enough=None) -> dict:
+    """
+    Run independent search calls concurrently on the shared search pool.
+
+    Args:
+        tasks: {key: zero-argument callable}
+        deadline: seconds to wait overall; calls still running are abandoned
+        enough: optional check on the results so far, to return early
+
+    Returns:
+        {key: result} for every call that finished in time without raising
+    """
+    futures = {_SEARCH_POOL.submit(fn): key for key, fn in tasks.items()}
+    results = {}
+    pending = set(futures)
+    stop_at = time.monotonic() + deadline
+    while pending:
+        remaining = stop_at - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait_futures(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"[Unified Search] {key} failed: {e}")
+        if enough and enough(results):
+            break
+    else:
+        return results
+
+    for future in pending:
+        future.cancel()
+    if time.monotonic() >= stop_at:
+        print(f"[Unified Search] Deadline hit, {len(pending)} provider calls skipped")
+    return results
+
+
+def _dedupe_keys(item: dict, query: str) -> list:
+    keys = []
+    url = item.get("url") or item.get("download_url") or ""
+    if url:
+        keys.append("url:" + url.split("?")[0].rstrip("/").lower())
+        stem = re.sub(r"[^a-z0-9]+", "", os.path.splitext(url.split("?")[0].rsplit("/", 1)[-1].lower())[0])
+        if len(stem) >= 12:
+            keys.append("file:" + stem)
+    alt = " ".join(re.findall(r"[a-z0-9]+", (item.get("alt") or "").lower()))
+    if alt and alt != " ".join(re.findall(r"[a-z0-9]+", query.lower())) and len(alt.split()) >= 3:
+        keys.append("alt:" + alt)
+    return keys
+
+
+def _merge_ranked(results_by_provider: dict, providers, query: str, per_page: int) -> list:
+    merged = []
+    seen = set()
+    for name, _, quota, _ in providers:
+        taken = 0
+        for item in results_by_provider.get(name) or []:
+            if taken >= quota(per_page):
+                break
+            keys = _dedupe_keys(item, query)
+            if any(k in seen for k in keys):
+                continue
+            seen.update(keys)
+            merged.append(item)
+            taken += 1
+    return merged[:per_page]
+
+
+def _configured_providers():
+    return [p for p in UNIFIED_PROVIDERS if p[3]()]
+
+
+def _provider_tasks(query: str, per_page: int, providers) -> dict:
+    return {
+        (query, name): (lambda fn=fn, n=quota(per_page): fn(query, per_page=n))
+        for name, fn, quota, _ in providers
+    }
+
+
+def _settled(queries: list, per_page: int, providers):
+    """Early-exit check: each query's providers, in rank order, already fill its page."""
+    def check(results: dict) -> bool:
+        for query in queries:
+            available = 0
+            for name, _, quota, _ in providers:
+                if (query, name) not in results:
+                    return False
+                available += min(quota(per_page), len(results[(query, name)] or []))
+                if available >= per_page:
+                    break
+        return True
+    return check
+
+
+def search_visuals_unified(query: str, per_page: int = 6, deadline: float = STOCK_SEARCH_DEADLINE) -> list[dict]:
+    """
+    Search every configured image provider concurrently and merge the results.
+
+    Ranking keeps the old sequential preference (Unsplash, Wikimedia,
+    Pixabay, then Pexels as filler); duplicates across providers are
+    dropped. Returns whatever has arrived when the deadline hits.
+    """
+    return search_visuals_many([query], per_page=per_page, deadline=deadline).get(query, [])
+
+
+def search_visuals_many(queries: list, per_page: int = 6, deadline: float = STOCK_SEARCH_DEADLINE) -> dict:
+    """search_visuals_unified for several queries under one shared deadline. Returns {query: results}."""
+    queries = list(dict.fromkeys(q for q in queries if q))
+    providers = _configured_providers()
+    tasks = {}
+    for query in queries:
+        print(f"[Unified Search] Starting search for: '{query}' ({len(providers)} providers)")
+        tasks.update(_provider_tasks(query, per_page, providers))
+
+    results = fan_out(tasks, deadline=deadline, enough=_settled(queries, per_page, providers))
+
+    merged = {}
+    for query in queries:
+        by_provider = {name: results[(query, name)] for name, _, _, _ in providers if (query, name) in results}
+        for name, items in by_provider.items():
+            print(f"[Unified Search] {name.capitalize()}: {len(items or [])} results")
+        merged[query] = _merge_ranked(by_provider, providers, query, per_page)
+        print(f"[Unified Search] Total: {len(merged[query])} results for '{query}'")
+    return merged
 
 
 def search_pexels_safe(query: str, per_page: int = 6) -> list[dict]:
@@ -397,7 +537,7 @@ Output JSON:
 
 Think like a music video director: What B-ROLL represents this feeling?"""
 
-    result = call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=512)
+    result = cached_call_ai(prompt, SYSTEM_GUARDRAILS, json_output=True, max_tokens=512, site="get_scene_visuals")
     if not result:
         return {
             "visual_concept": "Supportive visual for this scene",
@@ -0,0 +1,267 @@
+"""
+Shared Task Poller for Runway Tasks and Shotstack Renders
+
+One background thread tracks every outstanding Runway task ID and Shotstack
+render ID in the process and resolves a Future per task, instead of each
+caller owning a thread that sleeps 5 seconds between status checks.
+
+Scheduling (per task):
+- Fast polling while a task is young (most failures and short jobs show up early)
+- Backs off as the task ages, up to MAX_POLL_INTERVAL
+- Uses the reported progress to estimate time remaining, and polls quickly
+  again once a task is nearly done so completion is detected promptly
+
+Usage:
+    future = TASK_POLLER.watch_runway(task_id)
+    result = future.result()          # RunwayTaskResult, or raises RunwayError
+
+    future = TASK_POLLER.watch_shotstack(render_id)
+    status = future.result()          # same dict shotstack_wait_for_completion returns
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Callable
+
+
+MIN_POLL_INTERVAL = 2.0
+MAX_POLL_INTERVAL = 20.0
+YOUNG_TASK_SECONDS = 20.0
+NEARLY_DONE_PROGRESS = 0.9
+STATUS_WORKERS = 4
+
+RUNWAY = "runway"
+SHOTSTACK = "shotstack"
+
+
+@dataclass
+class _WatchedTask:
+    kind: str
+    task_id: str
+    deadline: float
+    created_at: float = field(default_factory=time.time)
+    next_poll_at: float = 0.0
+    progress: Optional[float] = None
+    polls: int = 0
+    in_progress: bool = False
+    futures: List[Future] = field(default_factory=list)
+    progress_callbacks: List[Callable[[Optional[float]], None]] = field(default_factory=list)
+
+
+def _normalize_progress(value: Any) -> Optional[float]:
+    try:
+        progress = float(value)
+    except (TypeError, ValueError):
+        return None
+    if progress > 1.0:
+        progress /= 100.0
+    return max(0.0, min(1.0, progress))
+
+
+def next_poll_interval(age: float, progress: Optional[float]) -> float:
+    """Seconds until the next status check for a task of this age/progress."""
+    if age < YOUNG_TASK_SECONDS:
+        return MIN_POLL_INTERVAL
+    if progress is not None and progress >= NEARLY_DONE_PROGRESS:
+        return MIN_POLL_INTERVAL
+    interval = MIN_POLL_INTERVAL + (age - YOUNG_TASK_SECONDS) * 0.15
+    if progress is not None and progress > 0.05:
+        remaining = age * (1.0 - progress) / progress
+        interval = min(interval, remaining * 0.5)
+    return max(MIN_POLL_INTERVAL, min(MAX_POLL_INTERVAL, interval))
+
+
+class TaskPoller:
+    """Background poller resolving one Future per Runway task / Shotstack render."""
+
+    def __init__(self, status_workers: int = STATUS_WORKERS):
+        self._tasks: Dict[tuple, _WatchedTask] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=status_workers, thread_name_prefix="task-poller")
+        self.stats = {"polls": 0, "resolved": 0, "watched": 0}
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="task-poller", daemon=True)
+            self._thread.start()
+
+    def watch(
+        self,
+        kind: str,
+        task_id: str,
+        max_wait_seconds: int = 300,
+        on_progress: Optional[Callable[[Optional[float]], None]] = None
+    ) -> Future:
+        """
+        Start tracking a task. Watching the same task twice shares one poll schedule.
+
+        Args:
+            kind: RUNWAY or SHOTSTACK
+            task_id: Runway task ID or Shotstack render ID
+            max_wait_seconds: Give up (timeout result/exception) after this long
+            on_progress: Optional callback(progress 0..1 or None) after each poll
+        """
+        future: Future = Future()
+        key = (kind, task_id)
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = _WatchedTask(kind=kind, task_id=task_id, deadline=time.time() + max_wait_seconds)
+                self._tasks[key] = task
+                self.stats["watched"] += 1
+            else:
+                task.deadline = max(task.deadline, time.time() + max_wait_seconds)
+            task.futures.append(future)
+            if on_progress:
+                task.progress_callbacks.append(on_progress)
+            self._ensure_thread()
+        self._wakeup.set()
+        return future
+
+    def watch_runway(self, task_id: str, max_wait_seconds: int = 300,
+                     on_progress: Optional[Callable[[Optional[float]], None]] = None) -> Future:
+        return self.watch(RUNWAY, task_id, max_wait_seconds, on_progress)
+
+    def watch_shotstack(self, render_id: str, max_wait_seconds: int = 300,
+                        on_progress: Optional[Callable[[Optional[float]], None]] = None) -> Future:
+        return self.watch(SHOTSTACK, render_id, max_wait_seconds, on_progress)
+
+    def outstanding(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+    def _run(self):
+        while True:
+            now = time.time()
+            due = []
+            next_wake = now + MAX_POLL_INTERVAL
+            with self._lock:
+                for task in self._tasks.values():
+                    if task.in_progress:
+                        continue
+                    if task.next_poll_at <= now:
+                        task.in_progress = True
+                        due.append(task)
+                    else:
+                        next_wake = min(next_wake, task.next_poll_at)
+
+            for task in due:
+                self._executor.submit(self._poll_task, task)
+
+            self._wakeup.wait(timeout=max(0.1, next_wake - time.time()))
+            self._wakeup.clear()
+
+    def _resolve(self, task: _WatchedTask, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self._tasks.pop((task.kind, task.task_id), None)
+            futures = list(task.futures)
+            self.stats["resolved"] += 1
+        for future in futures:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _reschedule(self, task: _WatchedTask):
+        now = time.time()
+        with self._lock:
+            task.next_poll_at = now + next_poll_interval(now - task.created_at, task.progress)
+            task.in_progress = False
+        self._wakeup.set()
+
+    def _poll_task(self, task: _WatchedTask):
+        try:
+            task.polls += 1
+            self.stats["polls"] += 1
+            if task.kind == RUNWAY:
+                finished = self._poll_runway(task)
+            else:
+                finished = self._poll_shotstack(task)
+        except Exception as e:
+            print(f"[TaskPoller] Unexpected error polling {task.kind} {task.task_id[:8]}...: {e}")
+            finished = False
+
+        if finished:
+            return
+
+        for callback in list(task.progress_callbacks):
+            try:
+                callback(task.progress)
+            except Exception as e:
+                print(f"[TaskPoller] Progress callback error: {e}")
+
+        if time.time() >= task.deadline:
+            self._expire(task)
+        else:
+            self._reschedule(task)
+
+    def _expire(self, task: _WatchedTask):
+        waited = int(time.time() - task.created_at)
+        if task.kind == RUNWAY:
+            from remix_engine import RunwayError
+            self._resolve(task, error=RunwayError(f"Task timed out after {waited}s", code="TIMEOUT"))
+        else:
+            self._resolve(task, result={"status": "timeout", "error": f"Render timed out after {waited}s"})
+
+    def _poll_runway(self, task: _WatchedTask) -> bool:
+        from remix_engine import runway_get_task_status, RunwayTaskStatus, RunwayError
+
+        try:
+            result = runway_get_task_status(task.task_id)
+        except RunwayError as e:
+            if e.code in ("TIMEOUT", "NETWORK_ERROR") or (e.status_code or 0) >= 500:
+                return False
+            self._resolve(task, error=e)
+            return True
+
+        task.progress = _normalize_progress(result.progress)
+        print(f"[Runway API] Task {task.task_id[:8]}... status={result.status.value}, progress={result.progress}")
+
+        if result.status == RunwayTaskStatus.SUCCEEDED:
+            print(f"[Runway API] Task completed after {task.polls} polls! Output URLs: {result.output_urls}")
+            self._resolve(task, result=result)
+            return True
+        if result.status == RunwayTaskStatus.FAILED:
+            self._resolve(task, error=RunwayError(
+                result.error_message or "Task failed",
+                code=result.error_code or "TASK_FAILED"
+            ))
+            return True
+        if result.status == RunwayTaskStatus.CANCELLED:
+            self._resolve(task, error=RunwayError("Task was cancelled", code="CANCELLED"))
+            return True
+        return False
+
+    def _poll_shotstack(self, task: _WatchedTask) -> bool:
+        from remix_engine import check_shotstack_status
+
+        status = check_shotstack_status(task.task_id)
+        print(f"[Shotstack] Render {task.task_id[:8]}... status={status.get('status')}")
+
+        if status.get("status") == "done":
+            self._resolve(task, result={
+                "status": "done",
+                "url": status.get("url"),
+                "render_time": status.get("render_time")
+            })
+            return True
+        if status.get("status") == "failed":
+            self._resolve(task, result={"status": "failed", "error": status.get("error", "Render failed")})
+            return True
+        if status.get("error"):
+            self._resolve(task, result=status)
+            return True
+
+        task.progress = _normalize_progress(status.get("progress"))
+        if status.get("status") == "saving":
+            task.progress = max(task.progress or 0.0, NEARLY_DONE_PROGRESS)
+        return False
+
+
+TASK_POLLER = TaskPoller()
@@ -11,6 +11,8 @@ import base64
 import tempfile
 from typing import List, Dict, Any, Optional
 
+from media_probe import probe_media
+
 ELEMENT_GROUPS = {
     'branding': ['logo_main', 'logo_secondary', 'watermark', 'brand_colors', 'brand_font'],
     'text': ['headline', 'subheadline', 'body_text', 'caption', 'label', 'cta_text', 'stat_number', 'quote', 'hashtag'],
@@ -39,19 +41,12 @@ def extract_frames_for_analysis(video_path: str, num_frames: int = 10) -> List[D
     temp_dir = tempfile.mkdtemp()
     
     try:
-        probe_cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', video_path]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        probe_data = json.loads(result.stdout)
+        info = probe_media(video_path)
+        if info is None or info.duration is None:
+            raise ValueError(f"Could not probe {video_path}")
         
-        duration = float(probe_data['format']['duration'])
-        fps = 30
-        for stream in probe_data.get('streams', []):
-            if stream.get('codec_type') == 'video':
-                fps_str = stream.get('r_frame_rate', '30/1')
-                if '/' in fps_str:
-                    num, den = fps_str.split('/')
-                    fps = float(num) / float(den) if float(den) > 0 else 30
-                break
+        duration = info.duration
+        fps = info.fps or 30
         
         interval = duration / (num_frames + 1)
         
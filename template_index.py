@@ -0,0 +1,98 @@
+"""
+Community Template Matching Index
+
+/api/community/match-templates sits on the project-creation path. It used
+to run up to three sequential ILIKE scans over the JSON tag columns cast
+to text. Matching is now one ranked full-text query:
+
+- TEMPLATE_SEARCH_VECTOR is a weighted tsvector over name and topic tags
+  (A), tone tags (B) and description (C). app.py creates a GIN expression
+  index on exactly this expression, ix_community_templates_search
+- Topic and tone words become OR'ed tsqueries. A template matches if it
+  hits any of them, and topic relevance counts double tone relevance
+- Score = text rank + TEMPLATE_POPULARITY_WEIGHT * ln(1 + usage_count +
+  2 * like_count), so among equally relevant templates the proven ones
+  come first
+- Results for a (topic, tone) pair are cached in memory for
+  TEMPLATE_MATCH_CACHE_TTL seconds. Empty results are not cached, so a
+  template generated for a new topic shows up on the next request
+
+Usage:
+    templates = match_community_templates("personal finance", "calm")
+"""
+
+import os
+import re
+from typing import List, Dict, Any
+
+from sqlalchemy import text
+
+from ttl_cache import TTLCache
+
+
+TEMPLATE_MATCH_CACHE_TTL = float(os.environ.get("TEMPLATE_MATCH_CACHE_TTL", "300"))
+TEMPLATE_MATCH_CACHE_MAX_ENTRIES = int(os.environ.get("TEMPLATE_MATCH_CACHE_MAX_ENTRIES", "512"))
+TEMPLATE_POPULARITY_WEIGHT = float(os.environ.get("TEMPLATE_POPULARITY_WEIGHT", "0.05"))
+TEMPLATE_MATCH_LIMIT = 6
+MAX_QUERY_WORDS = 12
+
+TEMPLATE_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(topic_tags::text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(tone_tags::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C'))"
+)
+
+_POPULARITY = "ln(1 + coalesce(usage_count, 0) + 2 * coalesce(like_count, 0))"
+
+_match_cache = TTLCache(
+    "template_matches",
+    ttl_seconds=TEMPLATE_MATCH_CACHE_TTL,
+    max_entries=TEMPLATE_MATCH_CACHE_MAX_ENTRIES
+)
+
+
+def _words(value: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", (value or "").lower())[:MAX_QUERY_WORDS]
+
+
+def _or_query(words: List[str]) -> str:
+    """to_tsquery source matching any of the words ('' when there are none)."""
+    return " | ".join(dict.fromkeys(words))
+
+
+def _ranked_templates(topic: str, tone: str, limit: int) -> List[Dict[str, Any]]:
+    from models import CommunityTemplate
+
+    topic_q = _or_query(_words(topic))
+    tone_q = _or_query(_words(tone))
+    query = CommunityTemplate.query.filter(CommunityTemplate.is_public == True)
+
+    if not topic_q and not tone_q:
+        rows = query.order_by(CommunityTemplate.usage_count.desc()).limit(limit).all()
+        return [t.to_dict() for t in rows]
+
+    # An empty tsquery matches nothing, which keeps either side optional
+    rank = (f"2 * ts_rank({TEMPLATE_SEARCH_VECTOR}, to_tsquery('english', :topic_q)) + "
+            f"ts_rank({TEMPLATE_SEARCH_VECTOR}, to_tsquery('english', :tone_q))")
+    rows = query.filter(
+        text(f"{TEMPLATE_SEARCH_VECTOR} @@ (to_tsquery('english', :topic_q) || to_tsquery('english', :tone_q))")
+    ).order_by(
+        text(f"({rank}) + {TEMPLATE_POPULARITY_WEIGHT} * {_POPULARITY} DESC"),
+        CommunityTemplate.id.desc()
+    ).params(topic_q=topic_q, tone_q=tone_q).limit(limit).all()
+    return [t.to_dict() for t in rows]
+
+
+def match_community_templates(topic: str, tone: str, limit: int = TEMPLATE_MATCH_LIMIT) -> List[Dict[str, Any]]:
+    """Best public templates for a topic/tone pair, as to_dict() payloads."""
+    key = f"{' '.join(_words(topic))}|{' '.join(_words(tone))}|{limit}"
+    return _match_cache.get_or_compute(
+        key,
+        lambda: _ranked_templates(topic, tone, limit),
+        cacheable=lambda value: bool(value)
+    )
+
+
+def template_match_stats() -> Dict[str, Any]:
+    return _match_cache.stats()
@@ -0,0 +1,121 @@
+"""
+Transcription Cache keyed by audio content
+
+Preview, final render, caption refresh and platform export all transcribe
+the same voiceover. Transcripts are a pure function of the audio bytes and
+the provider settings, so they are cached under
+
+    sha256(audio bytes) + provider + normalized options
+
+and changing caption style or re-rendering never re-transcribes unchanged
+audio.
+
+- Stored form is compact: {"t": text, "d": duration, "c": confidence,
+  "p": provider, "w": [[word, start, end, confidence], ...]} with times
+  rounded to milliseconds
+- Memory tier: TTLCache LRU with single-flight, so a preview and a render
+  racing on the same audio make one provider call
+- Shared tier: PostgresCacheStore("transcripts") when DATABASE_URL is set
+  (TRANSCRIPT_CACHE_SHARED), so the web workers and the video worker share
+  results
+- Only transcripts with word timestamps are cached
+
+Usage:
+    result = TRANSCRIPT_CACHE.get_or_transcribe(
+        audio_path, "assemblyai", {"speech_model": "best"},
+        lambda: transcribe_uncached(audio_path))
+"""
+
+import os
+import json
+import hashlib
+from typing import Optional, Dict, Any, Callable
+
+from ttl_cache import TTLCache, PostgresCacheStore
+
+
+TRANSCRIPT_CACHE_ENABLED = os.environ.get("TRANSCRIPT_CACHE_ENABLED", "true").lower() != "false"
+TRANSCRIPT_CACHE_TTL_DAYS = float(os.environ.get("TRANSCRIPT_CACHE_TTL_DAYS", "30"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.environ.get("TRANSCRIPT_CACHE_MAX_ENTRIES", "256"))
+TRANSCRIPT_CACHE_SHARED = (os.environ.get("TRANSCRIPT_CACHE_SHARED", "true").lower() != "false"
+                           and bool(os.environ.get("DATABASE_URL")))
+
+
+def _ms(value) -> float:
+    try:
+        return round(float(value), 3)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def encode_transcript(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Normalized transcription dict -> compact cache form."""
+    if not result:
+        return None
+    return {
+        "t": result.get("text") or "",
+        "d": result.get("duration"),
+        "c": result.get("confidence"),
+        "p": result.get("provider", "unknown"),
+        "w": [[w.get("text", ""), _ms(w.get("start")), _ms(w.get("end")), w.get("confidence")]
+              for w in result.get("words") or []],
+    }
+
+
+def decode_transcript(entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Compact cache form -> the dict caption_service.transcribe_audio returns."""
+    if not entry:
+        return None
+    return {
+        "text": entry["t"],
+        "words": [{"text": text, "start": start, "end": end, "confidence": confidence}
+                  for text, start, end, confidence in entry["w"]],
+        "duration": entry["d"],
+        "confidence": entry["c"],
+        "provider": entry["p"],
+    }
+
+
+class TranscriptCache:
+    """Content-addressed cache of normalized word-timestamp transcripts."""
+
+    def __init__(self, enabled: bool = TRANSCRIPT_CACHE_ENABLED):
+        self.enabled = enabled
+        self._cache = TTLCache(
+            "transcripts",
+            ttl_seconds=TRANSCRIPT_CACHE_TTL_DAYS * 86400,
+            max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES,
+            store=PostgresCacheStore("transcripts") if TRANSCRIPT_CACHE_SHARED else None
+        )
+
+    @staticmethod
+    def make_key(audio_path: str, provider: str, options: Dict[str, Any]) -> str:
+        from render_cache import RENDER_CACHE
+        audio_digest = RENDER_CACHE.file_digest(audio_path)
+        payload = json.dumps({"audio": audio_digest, "provider": provider, "options": options}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_or_transcribe(self, audio_path: str, provider: str, options: Dict[str, Any],
+                          transcribe: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return transcribe()
+        try:
+            key = self.make_key(audio_path, provider, options)
+        except OSError as e:
+            print(f"[TranscriptCache] Could not hash {audio_path}: {e}")
+            return transcribe()
+
+        if key in self._cache:
+            print(f"[TranscriptCache] Hit {key[:12]} ({provider})")
+        entry = self._cache.get_or_compute(
+            key,
+            lambda: encode_transcript(transcribe()),
+            cacheable=lambda value: bool(value and value["w"])
+        )
+        return decode_transcript(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+TRANSCRIPT_CACHE = TranscriptCache()
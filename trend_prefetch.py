@@ -0,0 +1,154 @@
+"""
+Background Trending-Topics Prefetcher
+
+Keeps trend research warm for the topics users actually ask about, so
+/research-trends and script generation are normally answered from the
+trend cache instead of waiting on live web search and an LLM call.
+
+Each round (every TREND_PREFETCH_INTERVAL seconds):
+- Ranks topics by demand: every GeneratorSettings.enabled_topics entry and
+  every recent Project brief (the same brief[:50] the community flow
+  researches) counts once
+- Re-researches the top TREND_PREFETCH_TOPICS topics whose cached entry is
+  missing or would stop being fresh before the next round
+- Takes a short lease row in cache_entries first, so with several web
+  workers plus the video worker only one process does the work per round
+
+Usage:
+    TREND_PREFETCHER.start()    # from the video worker's main loop
+"""
+
+import os
+import json
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional, List
+
+
+TREND_PREFETCH_ENABLED = os.environ.get("TREND_PREFETCH_ENABLED", "true").lower() != "false"
+TREND_PREFETCH_INTERVAL = float(os.environ.get("TREND_PREFETCH_INTERVAL", "1800"))
+TREND_PREFETCH_TOPICS = int(os.environ.get("TREND_PREFETCH_TOPICS", "20"))
+TREND_PREFETCH_LOOKBACK_DAYS = int(os.environ.get("TREND_PREFETCH_LOOKBACK_DAYS", "7"))
+RECENT_PROJECT_LIMIT = 200
+STARTUP_DELAY = 30.0
+
+LEASE_NAMESPACE = "trend_prefetch"
+LEASE_KEY = "lease"
+
+
+def _clean_topic(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    topic = " ".join(value.split())
+    return topic if len(topic) >= 3 else None
+
+
+class TrendPrefetcher:
+    """Daemon thread that refreshes trend research for the most requested topics."""
+
+    def __init__(self, interval: float = TREND_PREFETCH_INTERVAL, max_topics: int = TREND_PREFETCH_TOPICS):
+        self.interval = interval
+        self.max_topics = max_topics
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        if not TREND_PREFETCH_ENABLED or not os.environ.get("DATABASE_URL"):
+            print("[TrendPrefetch] Disabled")
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="trend-prefetch", daemon=True)
+            self._thread.start()
+        print(f"[TrendPrefetch] Started (every {self.interval:.0f}s, top {self.max_topics} topics)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        if self._stop.wait(STARTUP_DELAY):
+            return
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[TrendPrefetch] Round failed: {e}")
+            self._stop.wait(self.interval)
+
+    def hot_topics(self) -> List[str]:
+        """Most requested topics, most popular first."""
+        from app import app
+        from models import GeneratorSettings, Project
+
+        counts = Counter()
+        display = {}
+
+        def count(value):
+            topic = _clean_topic(value)
+            if topic:
+                key = topic.lower()
+                counts[key] += 1
+                display.setdefault(key, topic)
+
+        with app.app_context():
+            for (topics,) in GeneratorSettings.query.with_entities(GeneratorSettings.enabled_topics).all():
+                for topic in topics or []:
+                    count(topic)
+
+            since = datetime.now() - timedelta(days=TREND_PREFETCH_LOOKBACK_DAYS)
+            briefs = Project.query.with_entities(Project.brief).filter(
+                Project.brief.isnot(None),
+                Project.created_at >= since
+            ).order_by(Project.created_at.desc()).limit(RECENT_PROJECT_LIMIT).all()
+            for (brief,) in briefs:
+                count(brief[:50])
+
+        return [display[key] for key, _ in counts.most_common(self.max_topics)]
+
+    def _acquire_lease(self) -> bool:
+        """True if this process owns the current round (lease lasts most of an interval)."""
+        from job_queue import JOB_QUEUE
+        lease_seconds = max(60.0, self.interval * 0.9)
+        with JOB_QUEUE._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO cache_entries (namespace, cache_key, value, fresh_until, expires_at, updated_at)
+                    VALUES (%s, %s, %s, NOW(), NOW() + %s * INTERVAL '1 second', NOW())
+                    ON CONFLICT (namespace, cache_key) DO UPDATE
+                    SET value = EXCLUDED.value, fresh_until = EXCLUDED.fresh_until,
+                        expires_at = EXCLUDED.expires_at, updated_at = NOW()
+                    WHERE cache_entries.expires_at <= NOW()
+                    RETURNING cache_key
+                """, (LEASE_NAMESPACE, LEASE_KEY, json.dumps({"pid": os.getpid()}), lease_seconds))
+                acquired = cur.fetchone() is not None
+            conn.commit()
+        return acquired
+
+    def run_once(self) -> int:
+        """Run one prefetch round; returns the number of topics researched live."""
+        from trend_research import prefetch_topic_trends
+
+        if not self._acquire_lease():
+            return 0
+
+        started = time.time()
+        topics = self.hot_topics()
+        refreshed = 0
+        for topic in topics:
+            if self._stop.is_set():
+                break
+            try:
+                if prefetch_topic_trends(topic, "all", min_fresh_seconds=self.interval):
+                    refreshed += 1
+            except Exception as e:
+                print(f"[TrendPrefetch] Failed to prefetch '{topic}': {e}")
+        print(f"[TrendPrefetch] Refreshed {refreshed}/{len(topics)} hot topics in {time.time() - started:.1f}s")
+        return refreshed
+
+
+TREND_PREFETCHER = TrendPrefetcher()
@@ -1,47 +1,116 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from duckduckgo_search import DDGS
 from ai_client import call_ai, SYSTEM_GUARDRAILS
+from ttl_cache import TTLCache, PostgresCacheStore
 
-_trend_cache = {}
+TREND_CACHE_TTL_HOURS = float(os.environ.get("TREND_CACHE_TTL_HOURS", "6"))
+TREND_CACHE_STALE_HOURS = float(os.environ.get("TREND_CACHE_STALE_HOURS", "18"))
+TREND_CACHE_MAX_ENTRIES = int(os.environ.get("TREND_CACHE_MAX_ENTRIES", "256"))
+TREND_CACHE_SHARED = os.environ.get("TREND_CACHE_SHARED", "true").lower() != "false" and bool(os.environ.get("DATABASE_URL"))
+TREND_SEARCH_TIMEOUT = float(os.environ.get("TREND_SEARCH_TIMEOUT", "6"))
+TREND_SEARCH_WORKERS = int(os.environ.get("TREND_SEARCH_WORKERS", "8"))
 
+# Results are fresh for TTL hours, then served stale (and refreshed in the
+# background) for another STALE hours. Only researched results are cached,
+# never the fallback defaults.
+_trend_cache = TTLCache(
+    "trends",
+    ttl_seconds=TREND_CACHE_TTL_HOURS * 3600,
+    stale_seconds=TREND_CACHE_STALE_HOURS * 3600,
+    max_entries=TREND_CACHE_MAX_ENTRIES,
+    store=PostgresCacheStore("trends") if TREND_CACHE_SHARED else None
+)
 
-def research_topic_trends(topic: str, target_platform: str = "all") -> dict:
-    global _trend_cache
+
+# Web searches run here concurrently; each query gets its own DDGS session.
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=TREND_SEARCH_WORKERS, thread_name_prefix="trend-search")
+
+
+def _cache_key(topic: str, target_platform: str) -> str:
+    return f"{' '.join(topic.lower().split())}:{target_platform}"
+
+
+def _ddg_text(query: str, max_results: int) -> list:
+    with DDGS(timeout=int(max(1, TREND_SEARCH_TIMEOUT))) as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+
+def _search_all(queries: list, timeout: float = TREND_SEARCH_TIMEOUT) -> list:
+    """
+    Run (platform, query, max_results) searches in parallel.
+
+    Results keep the order of `queries`. A query that fails or is still
+    running when the timeout expires contributes nothing.
+    """
+    started = time.time()
+    futures = [(platform, _SEARCH_POOL.submit(_ddg_text, query, max_results))
+               for platform, query, max_results in queries]
+    wait([future for _, future in futures], timeout=timeout)
     
-    cache_key = f"{topic}:{target_platform}"
+    search_results = []
+    for platform, future in futures:
+        if not future.done():
+            future.cancel()
+            print(f"[TrendIntel] Web search timed out after {timeout}s ({platform})")
+            continue
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"[TrendIntel] Web search error ({platform}): {e}")
+            continue
+        for r in results:
+            search_results.append({
+                "platform": platform,
+                "title": r.get("title", ""),
+                "snippet": r.get("body", ""),
+                "source": r.get("href", "")
+            })
+    print(f"[TrendIntel] {len(queries)} web searches finished in {time.time() - started:.1f}s")
+    return search_results
+
+
+def _is_researched(result: dict) -> bool:
+    return bool(result and result.get("sources"))
+
+
+def prefetch_topic_trends(topic: str, target_platform: str = "all", min_fresh_seconds: float = 0.0) -> bool:
+    """
+    Research topic ahead of time unless the cache stays fresh for min_fresh_seconds.
+
+    Returns True when a live research run happened.
+    """
+    cache_key = _cache_key(topic, target_platform)
+    if _trend_cache.fresh_for(cache_key) > min_fresh_seconds:
+        return False
+    _trend_cache.refresh(
+        cache_key,
+        lambda: _research_topic_trends(topic, target_platform),
+        cacheable=_is_researched
+    )
+    return True
+
+
+def research_topic_trends(topic: str, target_platform: str = "all") -> dict:
+    cache_key = _cache_key(topic, target_platform)
     if cache_key in _trend_cache:
         print(f"[TrendIntel] Using cached research for: {topic}")
-        return _trend_cache[cache_key]
-    
+    return _trend_cache.get_or_compute(
+        cache_key,
+        lambda: _research_topic_trends(topic, target_platform),
+        cacheable=_is_researched
+    )
+
+
+def _research_topic_trends(topic: str, target_platform: str) -> dict:
     print(f"[TrendIntel] Researching trends for: {topic}")
     
     platforms = ["Twitter", "Instagram Reels", "TikTok", "YouTube Shorts"] if target_platform == "all" else [target_platform]
     
-    search_results = []
-    try:
-        with DDGS() as ddgs:
-            for platform in platforms:
-                query = f"{topic} {platform} viral video format 2025"
-                results = list(ddgs.text(query, max_results=3))
-                for r in results:
-                    search_results.append({
-                        "platform": platform,
-                        "title": r.get("title", ""),
-                        "snippet": r.get("body", ""),
-                        "source": r.get("href", "")
-                    })
-                    
-            general_query = f"{topic} short form video trends hooks what works"
-            general_results = list(ddgs.text(general_query, max_results=5))
-            for r in general_results:
-                search_results.append({
-                    "platform": "general",
-                    "title": r.get("title", ""),
-                    "snippet": r.get("body", ""),
-                    "source": r.get("href", "")
-                })
-    except Exception as e:
-        print(f"[TrendIntel] Web search error: {e}")
-        search_results = []
+    queries = [(platform, f"{topic} {platform} viral video format 2025", 3) for platform in platforms]
+    queries.append(("general", f"{topic} short form video trends hooks what works", 5))
+    search_results = _search_all(queries)
     
     if not search_results:
         default_result = {
@@ -102,7 +171,6 @@ Focus on ACTIONABLE patterns that can inform content creation."""
         result["topic"] = topic
         result["sources"] = [{"title": r["title"], "url": r["source"]} for r in search_results[:5]]
         result["cached"] = False
-        _trend_cache[cache_key] = result
         print(f"[TrendIntel] Research complete for: {topic}")
         return result
     
@@ -0,0 +1,264 @@
+"""
+TTL Cache with single-flight and stale-while-revalidate
+
+In-process cache for expensive, slowly changing results (web research, LLM
+calls). Every entry has two deadlines:
+
+- fresh_until: served directly
+- stale_until: still served, but the first reader after fresh_until starts
+  one background refresh; after stale_until the entry is a plain miss
+
+Concurrent misses for the same key are collapsed: one caller computes, the
+others wait for its result (single-flight). The in-memory tier is an LRU
+bounded by max_entries, so long-lived web workers do not grow without
+limit.
+
+An optional persistent tier (PostgresCacheStore, the cache_entries table)
+lets every gunicorn worker and the video worker reuse one result. Values
+stored there must be JSON-serializable.
+
+Usage:
+    cache = TTLCache("trends", ttl_seconds=6 * 3600, stale_seconds=18 * 3600,
+                     max_entries=256, store=PostgresCacheStore("trends"))
+    value = cache.get_or_compute(key, lambda: expensive(), cacheable=bool)
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable, Tuple
+
+
+PRUNE_EVERY_SECONDS = 600
+
+
+class PostgresCacheStore:
+    """Shared cache tier: one cache_entries row per (namespace, key), JSON values."""
+
+    def __init__(self, namespace: str, queue=None):
+        self.namespace = namespace
+        self._queue = queue
+        self._last_prune = 0.0
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            from job_queue import JOB_QUEUE
+            self._queue = JOB_QUEUE
+        return self._queue
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """(value, fresh_until, stale_until) as epoch seconds, or None."""
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT value, fresh_until, expires_at FROM cache_entries
+                    WHERE namespace = %s AND cache_key = %s AND expires_at > NOW()
+                """, (self.namespace, key))
+                row = cur.fetchone()
+        if not row:
+            return None
+        value = row["value"]
+        if isinstance(value, str):
+            value = json.loads(value)
+        return value, row["fresh_until"].timestamp(), row["expires_at"].timestamp()
+
+    def set(self, key: str, value: Any, fresh_until: float, stale_until: float):
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO cache_entries (namespace, cache_key, value, fresh_until, expires_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, NOW())
+                    ON CONFLICT (namespace, cache_key) DO UPDATE
+                    SET value = EXCLUDED.value, fresh_until = EXCLUDED.fresh_until,
+                        expires_at = EXCLUDED.expires_at, updated_at = NOW()
+                """, (self.namespace, key, json.dumps(value, default=str),
+                      datetime.fromtimestamp(fresh_until, tz=timezone.utc),
+                      datetime.fromtimestamp(stale_until, tz=timezone.utc)))
+                if time.time() - self._last_prune > PRUNE_EVERY_SECONDS:
+                    self._last_prune = time.time()
+                    cur.execute("DELETE FROM cache_entries WHERE namespace = %s AND expires_at <= NOW()",
+                                (self.namespace,))
+                conn.commit()
+
+    def delete(self, key: str):
+        with self.queue._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM cache_entries WHERE namespace = %s AND cache_key = %s",
+                            (self.namespace, key))
+                conn.commit()
+
+
+class TTLCache:
+    """Bounded LRU with TTL, stale-while-revalidate, single-flight and an optional shared tier."""
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 256,
+                 stale_seconds: float = 0.0, store: Optional[PostgresCacheStore] = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "shared_hits": 0, "misses": 0,
+                       "coalesced": 0, "refreshes": 0, "errors": 0}
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_local(key) is not None
+
+    def _get_local(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_local(self, key: str, entry: Tuple[Any, float, float]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        if not self.store:
+            return None
+        try:
+            return self.store.get(key)
+        except Exception as e:
+            print(f"[Cache:{self.name}] Shared lookup failed: {e}")
+            return None
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        entry = (value, now + self.ttl_seconds, now + self.ttl_seconds + self.stale_seconds)
+        self._put_local(key, entry)
+        if self.store:
+            try:
+                self.store.set(key, value, entry[1], entry[2])
+            except Exception as e:
+                print(f"[Cache:{self.name}] Shared store failed: {e}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value (fresh or stale) without computing anything."""
+        entry = self._get_local(key) or self._get_shared(key)
+        return entry[0] if entry else None
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.store:
+            try:
+                self.store.delete(key)
+            except Exception as e:
+                print(f"[Cache:{self.name}] Shared delete failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def fresh_for(self, key: str) -> float:
+        """Seconds until key stops being fresh (0 when missing or already stale)."""
+        entry = self._get_local(key)
+        if entry is None:
+            entry = self._get_shared(key)
+            if entry is not None:
+                self._put_local(key, entry)
+        return max(0.0, entry[1] - time.time()) if entry else 0.0
+
+    def refresh(self, key: str, compute: Callable[[], Any],
+                cacheable: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """Recompute key now, replacing any cached value; joins a refresh already in flight."""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._stats["coalesced"] += 1
+            return future.result()
+        self._stats["refreshes"] += 1
+        self._run(key, future, compute, cacheable)
+        return future.result()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       cacheable: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        Return the cached value for key, computing it at most once per process at a time.
+
+        Values for which cacheable(value) is False are returned but not stored.
+        """
+        entry = self._get_local(key)
+        if entry is None:
+            entry = self._get_shared(key)
+            if entry is not None:
+                self._stats["shared_hits"] += 1
+                self._put_local(key, entry)
+
+        if entry is not None:
+            value, fresh_until, _ = entry
+            if fresh_until > time.time():
+                self._stats["hits"] += 1
+            else:
+                self._stats["stale_hits"] += 1
+                self._refresh_in_background(key, compute, cacheable)
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._stats["coalesced"] += 1
+            return future.result()
+
+        self._stats["misses"] += 1
+        self._run(key, future, compute, cacheable)
+        return future.result()
+
+    def _run(self, key: str, future: Future, compute: Callable[[], Any], cacheable: Callable[[Any], bool]):
+        try:
+            value = compute()
+            if cacheable(value):
+                self.set(key, value)
+            future.set_result(value)
+        except BaseException as e:
+            self._stats["errors"] += 1
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any], cacheable: Callable[[Any], bool]):
+        with self._lock:
+            if key in self._inflight:
+                return
+            future = Future()
+            self._inflight[key] = future
+        self._stats["refreshes"] += 1
+
+        def refresh():
+            self._run(key, future, compute, cacheable)
+            if future.exception() is not None:
+                print(f"[Cache:{self.name}] Background refresh failed for {key}: {future.exception()}")
+
+        threading.Thread(target=refresh, name=f"cache-refresh-{self.name}", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            inflight = len(self._inflight)
+        return {**self._stats, "entries": entries, "inflight": inflight}
@@ -114,26 +114,15 @@ def create_whisper_synced_captions(audio_path, output_path, template='bold_pop',
     Create ASS subtitle file with word-by-word captions synced to actual voiceover audio using Whisper.
     Returns (output_path, success) tuple.
     """
-    from openai import OpenAI
+    from services.caption_service import transcribe_with_whisper
     
     try:
-        whisper_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        
-        with open(audio_path, 'rb') as audio_file:
-            transcription = whisper_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["word"]
-            )
-        
-        words = []
-        if hasattr(transcription, 'words') and transcription.words:
-            words = transcription.words
-        elif hasattr(transcription, 'segments'):
-            for segment in transcription.segments:
-                if hasattr(segment, 'words'):
-                    words.extend(segment.words)
+        # Cached by audio content, so re-styling captions never re-transcribes
+        transcription = transcribe_with_whisper(audio_path)
+        words = [
+            {'word': w['text'], 'start': w['start'], 'end': w['end']}
+            for w in (transcription or {}).get('words', [])
+        ]
         
         if not words:
             print("Whisper returned no word timestamps, falling back to estimated timing")
@@ -460,11 +449,12 @@ def background_render_task(job_id, render_params, user_id, app_context):
     Background renders focus on quick assembly with FX for users who close their tab.
     """
     import uuid
-    from app import background_render_jobs
+    from render_cache import RENDER_CACHE
+    from render_jobs import RENDER_JOBS
     
     try:
-        background_render_jobs[job_id]['status'] = 'rendering'
-        background_render_jobs[job_id]['progress'] = 5
+        RENDER_JOBS.create(job_id, user_id)
+        RENDER_JOBS.update(job_id, status='rendering', progress=5)
         
         with app_context:
             scenes = render_params.get('scenes', [])
@@ -485,8 +475,7 @@ def background_render_task(job_id, render_params, user_id, app_context):
             }
             width, height = format_dims.get(video_format, (1080, 1920))
             
-            background_render_jobs[job_id]['progress'] = 20
-            background_render_jobs[job_id]['status'] = 'processing_scenes'
+            RENDER_JOBS.update(job_id, status='processing_scenes', progress=20)
             
             clip_paths = []
             for i, scene in enumerate(scenes):
@@ -496,23 +485,30 @@ def background_render_task(job_id, render_params, user_id, app_context):
                 
                 if scene_path and os.path.exists(scene_path):
                     clip_path = f'output/bg_clip_{output_id}_{i}.mp4'
-                    cmd = [
-                        'ffmpeg', '-y', '-loop', '1', '-i', scene_path,
-                        '-t', str(scene_duration), '-c:v', 'libx264', '-preset', 'fast',
-                        '-vf', f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}',
-                        clip_path
-                    ]
-                    result = subprocess.run(cmd, capture_output=True, timeout=120)
-                    if result.returncode == 0 and os.path.exists(clip_path):
+                    
+                    def render_still(out_path, scene_path=scene_path, scene_duration=scene_duration):
+                        cmd = [
+                            'ffmpeg', '-y', '-loop', '1', '-i', scene_path,
+                            '-t', str(scene_duration), '-c:v', 'libx264', '-preset', 'fast',
+                            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}',
+                            out_path
+                        ]
+                        result = subprocess.run(cmd, capture_output=True, timeout=120)
+                        return result.returncode == 0
+                    
+                    if RENDER_CACHE.get_or_render(
+                        [scene_path],
+                        {'op': 'still_to_video', 'size': [width, height], 'duration': scene_duration, 'preset': 'fast'},
+                        clip_path,
+                        render_still
+                    ):
                         clip_paths.append(clip_path)
             
             if not clip_paths:
-                background_render_jobs[job_id]['status'] = 'error'
-                background_render_jobs[job_id]['error'] = 'No valid scenes to render'
+                RENDER_JOBS.update(job_id, status='error', error='No valid scenes to render')
                 return
             
-            background_render_jobs[job_id]['progress'] = 40
-            background_render_jobs[job_id]['status'] = 'concatenating'
+            RENDER_JOBS.update(job_id, status='concatenating', progress=40)
             
             concat_file = f'output/bg_concat_{output_id}.txt'
             with open(concat_file, 'w') as f:
@@ -526,8 +522,7 @@ def background_render_task(job_id, render_params, user_id, app_context):
             ]
             subprocess.run(concat_cmd, capture_output=True, timeout=120)
             
-            background_render_jobs[job_id]['progress'] = 60
-            background_render_jobs[job_id]['status'] = 'adding_audio'
+            RENDER_JOBS.update(job_id, status='adding_audio', progress=60)
             
             video_with_audio = concat_output
             if audio_path and os.path.exists(audio_path):
@@ -540,8 +535,7 @@ def background_render_task(job_id, render_params, user_id, app_context):
                 if result.returncode != 0:
                     video_with_audio = concat_output
             
-            background_render_jobs[job_id]['progress'] = 80
-            background_render_jobs[job_id]['status'] = 'applying_fx'
+            RENDER_JOBS.update(job_id, status='applying_fx', progress=80)
             
             try:
                 from context_engine import build_visual_fx_filter
@@ -593,20 +587,17 @@ def background_render_task(job_id, render_params, user_id, app_context):
                 if os.path.exists(video_with_audio):
                     os.remove(video_with_audio)
             
-            background_render_jobs[job_id]['progress'] = 100
+            RENDER_JOBS.update(job_id, progress=100)
             
             if os.path.exists(output_path):
-                background_render_jobs[job_id]['status'] = 'complete'
-                background_render_jobs[job_id]['video_url'] = '/' + output_path
+                RENDER_JOBS.update(job_id, status='complete', video_url='/' + output_path)
                 
                 send_render_complete_email(user_id, '/' + output_path, project_name)
             else:
-                background_render_jobs[job_id]['status'] = 'error'
-                background_render_jobs[job_id]['error'] = 'Final render failed'
+                RENDER_JOBS.update(job_id, status='error', error='Final render failed')
                 
     except Exception as e:
-        background_render_jobs[job_id]['status'] = 'error'
-        background_render_jobs[job_id]['error'] = str(e)
+        RENDER_JOBS.update(job_id, status='error', error=str(e))
         print(f"[Background Render] Error: {e}")
         import traceback
         traceback.print_exc()
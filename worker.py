@@ -1,7 +1,9 @@
 """
 Background Worker for Video Generation Jobs
 
-This worker polls the job queue and processes video generation requests.
+This worker waits on the job queue and processes video generation requests.
+With the pooled backend it is woken by Postgres NOTIFY as soon as a job is
+enqueued; polling is only a slow fallback.
 It runs independently from the main web server and can be scaled by
 running multiple worker instances.
 
@@ -19,6 +21,8 @@ import traceback
 from typing import Optional
 
 from job_queue import JOB_QUEUE, VideoJob, JobStatus
+from trend_prefetch import TREND_PREFETCHER
+from services.hls_service import HLS_RECOVERY
 from remix_engine import (
     QualityTier,
     RUNWAY_QUEUE,
@@ -29,6 +33,7 @@ from remix_engine import (
 
 
 POLL_INTERVAL = 2.0
+NOTIFY_FALLBACK_INTERVAL = 15.0
 SHUTDOWN_REQUESTED = False
 
 
@@ -52,10 +57,10 @@ def get_quality_tier(tier_str: str) -> QualityTier:
 def stitch_pre_rendered_scenes(job_id: int, job_data: dict) -> bool:
     """
     Stitch pre-rendered scene clips into a final video.
-    Uses the clips already generated during the preview phase.
+    Uses the clips already generated during the preview phase and joins
+    them in a single ffmpeg pass (see stitch_engine).
     """
-    import subprocess
-    import tempfile
+    from stitch_engine import stitch_clips
     
     pre_rendered = job_data.get('pre_rendered_scenes', [])
     project_id = job_data.get('project_id', 0)
@@ -73,125 +78,27 @@ def stitch_pre_rendered_scenes(job_id: int, job_data: dict) -> bool:
         return False
     
     total = len(valid_clips)
-    JOB_QUEUE.update_progress(job_id, 0, total, "Assembling final video...")
+    JOB_QUEUE.update_progress(job_id, 0, total, f"Assembling {total} scenes into final video...")
     
-    if total == 1:
-        output_path = os.path.join('output', f"final_{project_id}_{int(time.time())}.mp4")
-        clip = valid_clips[0]
-        try:
-            cmd = [
-                "ffmpeg", "-y", "-i", clip['rendered_path'],
-                "-c:v", "libx264", "-preset", "medium", "-crf", "20",
-                "-pix_fmt", "yuv420p", "-an", output_path
-            ]
-            subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if os.path.exists(output_path):
-                JOB_QUEUE.complete_job(job_id, output_path)
-                print(f"[Worker] Single scene final video: {output_path}")
-                return True
-        except Exception as e:
-            print(f"[Worker] Single scene stitch error: {e}")
-        JOB_QUEUE.fail_job(job_id, "Failed to create final video")
-        return False
-    
-    current_output = valid_clips[0]['rendered_path']
-    temp_files = []
-    
-    for i in range(1, total):
-        JOB_QUEUE.update_progress(job_id, i, total, f"Stitching scene {i} → {i+1}...")
-        
-        next_clip = valid_clips[i]
-        transition = valid_clips[i-1].get('transition_out', 'cut')
-        
-        temp_output = os.path.join(tempfile.gettempdir(), f"stitch_{project_id}_{i}_{int(time.time())}.mp4")
-        temp_files.append(temp_output)
-        
-        try:
-            probe = subprocess.run(
-                ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-                 "-of", "default=noprint_wrappers=1:nokey=1", current_output],
-                capture_output=True, text=True, timeout=10
-            )
-            dur = float(probe.stdout.strip())
-        except Exception:
-            dur = 5.0
-        
-        if transition in ('crossfade', 'dissolve', 'fade'):
-            overlap = min(1.0, dur * 0.2)
-            offset = max(0.5, dur - overlap)
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", current_output,
-                "-i", next_clip['rendered_path'],
-                "-filter_complex",
-                f"[0:v]setpts=PTS-STARTPTS[v0];"
-                f"[1:v]setpts=PTS-STARTPTS[v1];"
-                f"[v0][v1]xfade=transition=fade:duration={overlap:.2f}:offset={offset:.2f}[outv]",
-                "-map", "[outv]",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "22",
-                "-pix_fmt", "yuv420p", "-an", temp_output
-            ]
-        else:
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", current_output,
-                "-i", next_clip['rendered_path'],
-                "-filter_complex",
-                "[0:v]setpts=PTS-STARTPTS[v0];"
-                "[1:v]setpts=PTS-STARTPTS[v1];"
-                "[v0][v1]concat=n=2:v=1:a=0[outv]",
-                "-map", "[outv]",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "22",
-                "-pix_fmt", "yuv420p", "-an", temp_output
-            ]
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-            if result.returncode == 0 and os.path.exists(temp_output):
-                current_output = temp_output
-            else:
-                print(f"[Worker] Stitch {i}→{i+1} failed: {result.stderr[:300]}")
-                cmd_fallback = [
-                    "ffmpeg", "-y",
-                    "-i", current_output,
-                    "-i", next_clip['rendered_path'],
-                    "-filter_complex",
-                    "[0:v]setpts=PTS-STARTPTS[v0];"
-                    "[1:v]setpts=PTS-STARTPTS[v1];"
-                    "[v0][v1]concat=n=2:v=1:a=0[outv]",
-                    "-map", "[outv]",
-                    "-c:v", "libx264", "-preset", "fast", "-crf", "22",
-                    "-pix_fmt", "yuv420p", "-an", temp_output
-                ]
-                result2 = subprocess.run(cmd_fallback, capture_output=True, text=True, timeout=120)
-                if result2.returncode == 0 and os.path.exists(temp_output):
-                    current_output = temp_output
-                else:
-                    print(f"[Worker] Concat fallback also failed")
-        except Exception as e:
-            print(f"[Worker] Stitch error: {e}")
-    
-    output_path = os.path.join('output', f"final_{project_id}_{int(time.time())}.mp4")
     os.makedirs('output', exist_ok=True)
+    output_path = os.path.join('output', f"final_{project_id}_{int(time.time())}.mp4")
+    transitions = [clip.get('transition_out', 'cut') for clip in valid_clips[:-1]]
     
     try:
-        import shutil
-        shutil.copy2(current_output, output_path)
+        result = stitch_clips(
+            [clip['rendered_path'] for clip in valid_clips],
+            transitions,
+            output_path,
+            crf=20 if total == 1 else 22
+        )
     except Exception as e:
-        print(f"[Worker] Copy error: {e}")
-        output_path = current_output
+        print(f"[Worker] Stitch error: {e}")
+        result = {"success": False, "error": str(e)}
     
-    for f in temp_files:
-        try:
-            if f != output_path and os.path.exists(f):
-                os.remove(f)
-        except OSError:
-            pass
-    
-    if os.path.exists(output_path):
+    if result.get('success') and os.path.exists(output_path):
         JOB_QUEUE.update_progress(job_id, total, total, "Final video ready!")
         JOB_QUEUE.complete_job(job_id, output_path)
-        print(f"[Worker] Final video assembled: {output_path}")
+        print(f"[Worker] Final video assembled ({result.get('mode')}): {output_path}")
         return True
     
     JOB_QUEUE.fail_job(job_id, "Failed to assemble final video")
@@ -300,14 +207,26 @@ def process_job(job: VideoJob) -> bool:
 
 def run_worker():
     """
-    Main worker loop. Polls for jobs and processes them.
+    Main worker loop. Waits for jobs (NOTIFY wake-ups or polling) and processes them.
     """
+    idle_wait = NOTIFY_FALLBACK_INTERVAL if JOB_QUEUE.supports_notify else POLL_INTERVAL
     print("[Worker] Starting video generation worker...")
-    print(f"[Worker] Poll interval: {POLL_INTERVAL}s")
+    if JOB_QUEUE.supports_notify:
+        print(f"[Worker] Waiting on job notifications (fallback poll: {idle_wait}s)")
+    else:
+        print(f"[Worker] Poll interval: {idle_wait}s")
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    try:
+        JOB_QUEUE.start_listening()
+    except Exception as e:
+        print(f"[Worker] Could not start job listener, polling instead: {e}")
+    
+    TREND_PREFETCHER.start()
+    HLS_RECOVERY.start()
+    
     jobs_processed = 0
     
     while not SHUTDOWN_REQUESTED:
@@ -319,7 +238,7 @@ def run_worker():
                 jobs_processed += 1
                 print(f"[Worker] Total jobs processed: {jobs_processed}")
             else:
-                time.sleep(POLL_INTERVAL)
+                JOB_QUEUE.wait_for_job(idle_wait)
                 
         except KeyboardInterrupt:
             print("\n[Worker] Interrupted")
@@ -329,6 +248,8 @@ def run_worker():
             traceback.print_exc()
             time.sleep(POLL_INTERVAL)
     
+    TREND_PREFETCHER.stop()
+    HLS_RECOVERY.stop()
     print(f"[Worker] Shutting down. Total jobs processed: {jobs_processed}")
 
 